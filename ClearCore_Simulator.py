@@ -0,0 +1,715 @@
+#!/usr/bin/env python3
+"""
+=============================================================================
+ClearCore 8-Axis Controller Simulator
+=============================================================================
+
+PURPOSE:
+    Stand-in for one or more ClearCore boards running
+    Clearcore_8_Axis_Program.c, so Servo_Control_8_Axis.py can be developed,
+    load-tested and benchmarked without hardware. Speaks the real UDP protocol:
+
+    - "BOARD:n;CMD:..." commands (handleCommand): REQUEST_VALUES,
+      REQUEST_BUTTON_STATES, REQUEST_SETPOINTS, REQUEST_STATE_ENGINE,
+      SUBSCRIBE_VALUES / UNSUBSCRIBE_VALUES, VALUES_FORMAT:BINARY|TEXT, PING,
+      Mode/Repeat/Start, SnB1/SnB2, Sn_Parameters:v,a,p, ALL_Parameters (x12),
+      Sn_ClearPosition,
+      CLEAR_ALL_FAULTS, RECIPE_BEGIN/RECIPE_ROWS/RECIPE_COMMIT/RECIPE_CLEAR,
+      REQUEST_RECIPE, COMMAND_ACKS, ESTOP:<token> / ESTOP_RESET
+    - Tracked commands ("...;ID:<id>") answered with ACK/NAK, retransmissions
+      answered from the id history without executing again
+    - Replies and pushes with the ";SEQ:n;T:ms" trailer, binary VALUES frames
+    - Auto mode state engine (steps 0-10) with the motor setpoint tables and
+      gains from the firmware, manual mode absolute moves to the setpoints
+    - Trapezoidal motion (velocity/acceleration limited) integrated at a
+      configurable tick rate - kHz rates are fine on a laptop
+
+NETWORK:
+    Board n listens on port 8888 + 2*(n-1) (8888, 8890, 8892, ...) like the
+    firmware and sends everything to the host address (default 127.0.0.1:8889).
+    Point the GUI at the simulator with environment variables, e.g.:
+
+        SERVO_CLEARCORE1_IP=127.0.0.1 SERVO_CLEARCORE2_IP=127.0.0.1 python3 Servo_Control_8_Axis.py
+
+USAGE:
+    python3 ClearCore_Simulator.py                     # 2 boards, 1 kHz tick
+    python3 ClearCore_Simulator.py --boards 4 --tick-hz 5000
+    python3 ClearCore_Simulator.py --command-loss 0.2    # drop 20% of received datagrams
+    python3 ClearCore_Simulator.py --host 192.168.1.100 --bind 0.0.0.0
+
+    The simulator can also be imported (ClearCoreSimulator.start()/stop())
+    to run inside benchmarks and tests.
+
+AUTHOR: Greg Skovira
+DATE: October 2026
+=============================================================================
+"""
+
+import argparse
+import collections
+import math
+import random
+import select
+import socket
+import struct
+import sys
+import threading
+import time
+
+# ============================================================================
+#                         FIRMWARE CONSTANTS (Clearcore_8_Axis_Program.c)
+# ============================================================================
+
+BASE_PORT = 8888                                # Board 1 port; board n uses BASE_PORT + 2*(n-1)
+HOST_PORT = 8889                                # remotePort - host GUI listening port
+MAX_PACKET_LENGTH = 512                         # Firmware receive buffer (incl. terminator)
+RECIPE_STEPS = 11                               # Uploaded recipe rows (auto sequence steps)
+RECIPE_NAME_LENGTH = 24                         # Recipe name buffer (incl. terminator)
+MAX_SUBSCRIPTION_RATE_HZ = 500                  # Push rate ceiling
+SUBSCRIPTION_LEASE_MS = 3000                    # Push lease renewed by SUBSCRIBE_VALUES
+STATE_ENGINE_INTERVAL_MS = 3000                 # Periodic STATE_ENGINE report
+COMMAND_ID_HISTORY = 16                         # Executed command ids remembered for deduplication
+VALUES_FRAME_MAGIC = 0xC5
+VALUES_FRAME = struct.Struct('<BBII12i')        # magic, board, seq, millis, 12 x int32
+
+# Power-on setpoints (V, A, P) per servo
+DEFAULT_SETPOINTS = [(250, 2000, 0), (250, 2000, 0), (250, 2000, 0), (500, 250, 0)]
+
+# Auto mode step tables: [step] = (velocity, acceleration, position), 11 steps
+MOTOR_SETPOINTS = [
+    [(10, 8000, 2000), (10, 8000, 2000), (10, 8000, 1500), (10, 8000, 1000), (10, 8000, 500),
+     (10, 8000, 0), (100, 8000, 500), (100, 8000, 1000), (100, 8000, 2000), (100, 8000, 2500),
+     (100, 8000, 4000)],
+    [(12, 8000, 2000), (12, 8000, 2000), (12, 8000, 2000), (12, 8000, 2000), (12, 8000, 0),
+     (12, 8000, 0), (102, 8000, 0), (102, 8000, 500), (102, 8000, 2000), (102, 8000, 3000),
+     (102, 8000, 4000)],
+    [(1003, 8000, 0), (2003, 8000, 900), (2003, 8000, 800), (2003, 8000, 700), (2003, 8000, 600),
+     (2003, 8000, 500), (2003, 8000, 600), (2003, 8000, 700), (2003, 8000, 800), (2003, 8000, 900),
+     (2003, 8000, 1000)],
+    [(500, 2000, 0), (500, 5000, 400), (500, 5000, 400), (500, 5000, 270), (500, 5000, 125),
+     (500, 5000, 0), (500, 5000, 300), (500, 5000, 356), (500, 5000, 390), (500, 5000, 415),
+     (500, 5000, 623)],
+]
+GAINS = [(100, 1, 1), (100, 1, 1), (1, 1, 1), (1, 1, 1)]   # (KV, KA, KP) per servo
+
+# Auto mode move targets for motors 1/2
+PRIMARY_ADDRESS, SECONDARY_ADDRESS = 2000, 2000
+PRIMARY_TOS, SECONDARY_TOS = 0, 0
+PRIMARY_FINISH, SECONDARY_FINISH = 4000, 4000
+
+MOVE_IDLE, MOVE_WAIT, MOVE_DONE = 0, 1, 2        # MoveAbsolutePosition() states
+
+# ============================================================================
+#                         SIMULATED MOTOR
+# ============================================================================
+
+class SimulatedMotor:
+    """
+    Step/direction axis with a trapezoidal move profile.
+
+    Mirrors the ClearCore MotorDriver calls the firmware uses: VelMax/AccelMax
+    limits latched when a move starts, absolute Move(), PositionRefSet() and
+    the commanded velocity/position read back as V and P.
+    """
+
+    def __init__(self):
+        self.position = 0.0                     # Commanded position (steps)
+        self.velocity = 0.0                     # Commanded velocity (steps/s, signed)
+        self.acceleration = 0.0                 # Last applied acceleration (steps/s², signed)
+        self.vel_max = 1000.0
+        self.accel_max = 100000.0
+        self.target = 0.0
+        self.move_vel = 1000.0                  # Limits latched at Move()
+        self.move_accel = 100000.0
+        self.move_state = MOVE_IDLE
+
+    def move(self, target):
+        """Start an absolute move using the current VelMax/AccelMax."""
+        self.target = float(target)
+        self.move_vel = self.vel_max
+        self.move_accel = self.accel_max
+
+    def steps_complete(self):
+        return self.position == self.target and self.velocity == 0.0
+
+    def step(self, dt):
+        """Integrate the trapezoidal profile over dt seconds."""
+        distance = self.target - self.position
+        if dt <= 0.0:
+            return
+        if distance == 0.0 and self.velocity == 0.0:
+            self.acceleration = 0.0
+            return
+        direction = 1.0 if distance > 0 else -1.0
+        accel = self.move_accel
+        stopping = self.velocity * self.velocity / (2.0 * accel)
+        if self.velocity * direction < 0 or stopping >= abs(distance):
+            # Moving away from the target, or inside the braking distance
+            new_velocity = self.velocity - math.copysign(accel * dt, self.velocity)
+            if self.velocity * new_velocity < 0:
+                new_velocity = 0.0
+        else:
+            new_velocity = self.velocity + direction * accel * dt
+            if abs(new_velocity) > self.move_vel:
+                new_velocity = direction * self.move_vel
+        self.acceleration = (new_velocity - self.velocity) / dt
+        new_position = self.position + 0.5 * (self.velocity + new_velocity) * dt
+        # Arrival: snap when the target is crossed or reached at crawl speed
+        if (self.target - new_position) * direction <= 0 or (
+                abs(self.target - new_position) < 0.5 and abs(new_velocity) <= accel * dt):
+            new_position = self.target
+            new_velocity = 0.0
+        self.position = new_position
+        self.velocity = new_velocity
+
+    def move_absolute(self, target):
+        """
+        MoveAbsolutePosition() state machine from the firmware.
+
+        Returns:
+            bool: True when the move has completed (WAIT->DONE and DONE->IDLE)
+        """
+        if self.move_state == MOVE_IDLE:
+            self.move(target)
+            self.move_state = MOVE_WAIT
+        elif self.move_state == MOVE_WAIT:
+            if self.steps_complete():
+                self.move_state = MOVE_DONE
+                return True
+        elif self.move_state == MOVE_DONE:
+            self.move_state = MOVE_IDLE
+            return True
+        return False
+
+# ============================================================================
+#                         SIMULATED BOARD
+# ============================================================================
+
+class SimulatedClearCore:
+    """
+    One ClearCore board: command handling, state engine and telemetry.
+
+    Args:
+        board_id (int): BOARD_ID (1 = servos 1-4, 2 = servos 5-8, ...)
+        sock: Bound UDP socket for this board
+        host (tuple): (ip, port) all frames are sent to (remoteIp:remotePort)
+    """
+
+    def __init__(self, board_id, sock, host):
+        self.board_id = board_id
+        self.sock = sock
+        self.host = host
+        self.prefix = f"BOARD:{board_id};"
+        self.start_time = time.monotonic()
+        self.motors = [SimulatedMotor() for _ in range(4)]
+        self.setpoints = [list(sp) for sp in DEFAULT_SETPOINTS]   # [V, A, P] per servo
+        self.mode = False
+        self.repeat = False
+        self.start = False
+        self.estop = False                       # EStop latch - no motion until ESTOP_RESET
+        self.enable = [True] * 4                 # SnB1
+        self.run = [False] * 4                   # SnB2
+        self.next_step = 0
+        self.next_step_last = 0
+        self.motor_done = [False] * 4
+        self.binary_values = False
+        self.frame_sequence = 0
+        self.stream_interval = 0.0               # Seconds between pushes, 0 = not subscribed
+        self.subscription_rate = 0
+        self.subscription_expiry = 0.0
+        self.last_push = 0.0
+        self.last_state_report = 0.0
+        self.commands_handled = 0
+        self.recipe = None                       # Active uploaded table [step][servo] = [V, A, P]
+        self.recipe_name = "NONE"
+        self.recipe_checksum = 0
+        self.recipe_staging = [[[0, 0, 0] for _ in range(4)] for _ in range(RECIPE_STEPS)]
+        self.recipe_rows = [False] * RECIPE_STEPS
+        self.recipe_staging_name = ""
+        self.recipe_staging_open = False         # RECIPE_BEGIN seen, no COMMIT yet
+        self.command_ids = collections.OrderedDict()  # Recent command id -> ACK (True) / NAK (False)
+
+    # ---------------------------------------------------------------- timing
+    def millis(self):
+        """Board uptime in ms, wrapping like the 32-bit firmware counter."""
+        return int((time.monotonic() - self.start_time) * 1000) & 0xFFFFFFFF
+
+    # ---------------------------------------------------------------- output
+    def send_frame(self, msg):
+        """Append the SEQ/T trailer and transmit a text frame (sendFrame)."""
+        msg += f";SEQ:{self.frame_sequence};T:{self.millis()}"
+        self.frame_sequence = (self.frame_sequence + 1) & 0xFFFFFFFF
+        self.sock.sendto(msg.encode('utf-8'), self.host)
+
+    def values(self):
+        out = []
+        for motor in self.motors:
+            out += [int(motor.velocity), int(motor.acceleration), int(round(motor.position))]
+        return out
+
+    def send_current_values(self):
+        if self.binary_values:
+            frame = VALUES_FRAME.pack(VALUES_FRAME_MAGIC, self.board_id & 0xFF,
+                                      self.frame_sequence, self.millis(), *self.values())
+            self.frame_sequence = (self.frame_sequence + 1) & 0xFFFFFFFF
+            self.sock.sendto(frame, self.host)
+        else:
+            self.send_frame(self.prefix + "VALUES:" + ",".join(str(v) for v in self.values()))
+
+    def send_button_states(self):
+        states = [self.mode, self.repeat, self.start]
+        for servo in range(4):
+            states += [self.enable[servo], self.run[servo]]
+        self.send_frame(self.prefix + "BUTTON_STATES:" + ",".join('1' if s else '0' for s in states))
+
+    def send_setpoints(self):
+        flat = [v for sp in self.setpoints for v in sp]
+        self.send_frame(self.prefix + "SETPOINTS:" + ",".join(str(int(v)) for v in flat))
+
+    def send_state_engine_step(self):
+        self.send_frame(self.prefix + f"STATE_ENGINE:{self.next_step}")
+
+    def send_subscription_status(self):
+        self.send_frame(self.prefix + f"SUBSCRIBED:{self.subscription_rate}")
+
+    def send_values_format(self):
+        self.send_frame(self.prefix + "VALUES_FORMAT:" + ("BINARY" if self.binary_values else "TEXT"))
+
+    def send_recipe_status(self):
+        self.send_frame(self.prefix + f"RECIPE:{self.recipe_name},{self.recipe_checksum}")
+
+    # ---------------------------------------------------------------- input
+    def receive(self, data):
+        """ReadUdpData(): truncate like the firmware buffer, check the board prefix."""
+        text = data[:MAX_PACKET_LENGTH - 1].decode('utf-8', errors='replace')
+        if not text.startswith(self.prefix):
+            return
+        text = text[len(self.prefix):]
+        command, sep, tag = text.rpartition(";ID:")
+        if not sep:
+            self.handle_command(text)            # Untracked: polls, keepalives, older hosts
+            return
+        command_id = self.parse_data(tag)[0] & 0xFFFFFFFF
+        ok = self.command_ids.get(command_id)
+        if ok is None:
+            ok = self.handle_command(command)
+            self.command_ids[command_id] = ok
+            if len(self.command_ids) > COMMAND_ID_HISTORY:
+                self.command_ids.popitem(last=False)
+        # else: retransmission - answer again without executing twice
+        self.send_frame(self.prefix + ("ACK:" if ok else "NAK:") + str(command_id))
+
+    def set_subscription(self, rate_hz):
+        if rate_hz <= 0:
+            self.stream_interval = 0.0
+            self.subscription_rate = 0
+            return
+        rate_hz = min(rate_hz, MAX_SUBSCRIPTION_RATE_HZ)
+        self.subscription_rate = rate_hz
+        self.stream_interval = 1.0 / rate_hz
+        self.subscription_expiry = time.monotonic() + SUBSCRIPTION_LEASE_MS / 1000.0
+
+    def handle_command(self, text):
+        """handleCommand(): same commands and replies as the firmware; False for unknown / malformed."""
+        text = text.strip()
+        self.commands_handled += 1
+        if text == "CMD:REQUEST_VALUES":
+            self.send_current_values()
+            return True
+        if text == "CMD:REQUEST_BUTTON_STATES":
+            self.send_button_states()
+            return True
+        if text == "CMD:REQUEST_SETPOINTS":
+            self.send_setpoints()
+            return True
+        if text == "CMD:REQUEST_STATE_ENGINE":
+            self.send_state_engine_step()
+            return True
+        if text.startswith("CMD:PING:"):
+            self.send_frame(self.prefix + "PONG:" + text[9:])
+            return True
+        if text.startswith("CMD:SUBSCRIBE_VALUES:"):
+            try:
+                rate = int(text[21:])
+            except ValueError:
+                rate = 0                         # String.toInt() returns 0 on garbage
+            self.set_subscription(rate)
+            self.send_subscription_status()
+            return True
+        if text == "CMD:UNSUBSCRIBE_VALUES":
+            self.set_subscription(0)
+            self.send_subscription_status()
+            return True
+        if text in ("CMD:VALUES_FORMAT:BINARY", "CMD:VALUES_FORMAT:TEXT"):
+            self.binary_values = text.endswith("BINARY")
+            self.send_values_format()
+            return True
+        if text.startswith("CMD:RECIPE_BEGIN:"):
+            self.recipe_staging_name = text[17:][:RECIPE_NAME_LENGTH - 1]
+            self.recipe_rows = [False] * RECIPE_STEPS
+            self.recipe_staging_open = True
+            return True
+        if text.startswith("CMD:RECIPE_ROWS:"):
+            if not self.recipe_staging_open:
+                self.send_frame(self.prefix + "RECIPE_ERROR:NO_BEGIN")
+                return False
+            self.parse_recipe_rows(text[16:])
+            return True
+        if text.startswith("CMD:RECIPE_COMMIT:"):
+            return self.commit_recipe(text[18:])
+        if text == "CMD:RECIPE_CLEAR":
+            self.recipe, self.recipe_name, self.recipe_checksum = None, "NONE", 0
+            self.send_recipe_status()
+            return True
+        if text == "CMD:REQUEST_RECIPE":
+            self.send_recipe_status()
+            return True
+        if text.startswith("CMD:ESTOP:"):
+            self.emergency_stop()
+            self.send_frame(self.prefix + "ESTOP:ACTIVE:" + text[10:])
+            return True
+        if text == "CMD:ESTOP_RESET":
+            self.estop = False
+            for motor in self.motors:
+                motor.move_state = MOVE_IDLE
+            self.send_frame(self.prefix + "ESTOP:CLEAR")
+            return True
+        if text == "CMD:COMMAND_ACKS":
+            self.send_frame(self.prefix + "COMMAND_ACKS:ON")
+            return True
+
+        command = text[4:] if text.startswith("CMD:") else text
+        if command == "Mode AUTO":
+            self.mode = True
+        elif command == "Mode MANUAL":
+            self.mode = False
+        elif command == "Repeat ENABLE":
+            self.repeat = True
+        elif command == "Repeat DISABLE":
+            self.repeat = False
+        elif command == "Start ENABLE":
+            self.start = True
+        elif command == "Start DISABLE":
+            self.start = False
+        elif command == "CLEAR_ALL_FAULTS":
+            pass                                 # Simulated drives never fault
+        elif command.startswith("ALL_Parameters:"):
+            if not self.parse_all_parameters(command[15:]):
+                print(f"Board {self.board_id}: ERR:Malformed ALL_Parameters - {command}")
+                return False
+        elif len(command) > 4 and command[0] == 'S' and command[1] in "1234":
+            servo = int(command[1]) - 1
+            rest = command[2:]
+            if rest == "B1 ENABLE":
+                self.enable[servo] = True
+            elif rest == "B1 DISABLE":
+                self.enable[servo] = False
+            elif rest == "B2 Start":
+                self.run[servo] = True
+            elif rest == "B2 STOP":
+                self.run[servo] = False
+            elif rest.startswith("_Parameters:"):
+                self.setpoints[servo] = self.parse_data(rest[12:])
+            elif rest == "_ClearPosition":
+                self.motors[servo].position = 0.0
+            else:
+                print(f"Board {self.board_id}: ERR:Unknown command - {command}")
+                return False
+        else:
+            print(f"Board {self.board_id}: ERR:Unknown command - {command}")
+            return False
+        return True
+
+    def emergency_stop(self):
+        """emergencyStop(): MoveStopAbrupt() every motor and latch the stop."""
+        for motor in self.motors:
+            motor.target = motor.position
+            motor.velocity = 0.0
+            motor.acceleration = 0.0
+        if not self.estop:
+            self.estop = True
+            self.start = False
+            self.run = [False] * 4
+            self.next_step = 0
+            self.send_button_states()
+
+    @staticmethod
+    def parse_data(data):
+        """parseData(): "v,a,p" with String.toInt() semantics (garbage -> 0)."""
+        values = []
+        for field in (data.split(",") + ["", ""])[:3]:
+            digits = ""
+            for ch in field.strip():
+                if ch.isdigit() or (ch == '-' and not digits):
+                    digits += ch
+                else:
+                    break
+            try:
+                values.append(int(digits))
+            except ValueError:
+                values.append(0)
+        return values
+
+    def parse_all_parameters(self, data):
+        """parseAllParameters(): 12 values for servos 1-4, applied only if all are present."""
+        fields = data.split(",")
+        if len(fields) != 12:
+            return False
+        values = [self.parse_data(field)[0] for field in fields]
+        self.setpoints = [values[i:i + 3] for i in range(0, 12, 3)]
+        return True
+
+    def parse_recipe_rows(self, data):
+        """parseRecipeRows(): "<first>:<12 values>|<12 values>|..." into the staging table."""
+        first, _, rows = data.partition(":")
+        step = self.parse_data(first)[0]
+        for row in rows.split("|") if rows else []:
+            if not 0 <= step < RECIPE_STEPS:
+                break
+            fields = row.split(",")
+            for i in range(12):
+                self.recipe_staging[step][i // 3][i % 3] = self.parse_data(fields[i] if i < len(fields) else "")[0]
+            self.recipe_rows[step] = True
+            step += 1
+
+    def commit_recipe(self, checksum_text):
+        """commitRecipe(): activate the complete staging table if the checksum matches (False = NAK)."""
+        if not self.recipe_staging_open:
+            self.send_frame(self.prefix + "RECIPE_ERROR:NO_BEGIN")
+            return False
+        self.recipe_staging_open = False
+        if not all(self.recipe_rows):
+            self.send_frame(self.prefix + "RECIPE_ERROR:MISSING_ROWS")
+            return False
+        checksum = 0
+        for step in self.recipe_staging:
+            for values in step:
+                for value in values:
+                    checksum = (checksum * 31 + (value & 0xFFFFFFFF)) & 0xFFFFFFFF
+        try:
+            expected = int(checksum_text)
+        except ValueError:
+            expected = -1
+        if checksum != expected:
+            self.send_frame(self.prefix + "RECIPE_ERROR:CHECKSUM")
+            return False
+        self.recipe = [[list(values) for values in step] for step in self.recipe_staging]
+        self.recipe_name, self.recipe_checksum = self.recipe_staging_name, checksum
+        if self.mode:
+            self.load_setpoints(self.next_step)
+        self.send_recipe_status()
+        return True
+
+    # ---------------------------------------------------------------- loop
+    def load_setpoints(self, step):
+        """loadSetpoints(): uploaded recipe, or step table × gains, into the setpoints, then report them."""
+        if 0 <= step < RECIPE_STEPS and self.recipe is not None:
+            self.setpoints = [list(values) for values in self.recipe[step]]
+        elif 0 <= step <= 10:
+            for servo in range(4):
+                v, a, p = MOTOR_SETPOINTS[servo][step]
+                kv, ka, kp = GAINS[servo]
+                self.setpoints[servo] = [int(v * kv), int(a * ka), int(p * kp)]
+        self.send_setpoints()
+
+    def load_motor_setpoints(self):
+        # Non-positive limits (e.g. step 1's S2V_SPT = 0) are rejected, keeping the previous limit
+        for servo, motor in enumerate(self.motors):
+            if self.setpoints[servo][0] > 0:
+                motor.vel_max = self.setpoints[servo][0]
+            if self.setpoints[servo][1] > 0:
+                motor.accel_max = self.setpoints[servo][1]
+
+    def auto_move(self, targets):
+        """Move motors 1/2 (when enabled) as the state engine cases do."""
+        for servo, target in enumerate(targets):
+            if self.enable[servo]:
+                self.motor_done[servo] = self.motors[servo].move_absolute(target)
+
+    def reset_moves(self):
+        self.motors[0].move_state = MOVE_IDLE
+        self.motors[1].move_state = MOVE_IDLE
+
+    def state_engine(self):
+        """Auto mode switch(next_step) from loop()."""
+        s1p, s2p = int(round(self.motors[0].position)), int(round(self.motors[1].position))
+        s1p_spt, s2p_spt = self.setpoints[0][2], self.setpoints[1][2]
+        step = self.next_step
+        if step == 0:
+            self.setpoints[0][0] = 500
+            self.setpoints[1][0] = 500
+            self.auto_move((PRIMARY_ADDRESS, SECONDARY_ADDRESS))
+            if self.start:
+                self.next_step = 1
+        elif step == 1:
+            self.setpoints[1][0] = 0
+            self.auto_move((PRIMARY_ADDRESS, SECONDARY_ADDRESS))
+            if self.motor_done[0] and self.motor_done[1]:
+                self.next_step = 2
+                self.reset_moves()
+        elif step in (2, 3, 4):
+            self.auto_move((PRIMARY_TOS, SECONDARY_TOS))
+            if s1p <= s1p_spt and s2p <= s2p_spt:
+                self.next_step = step + 1
+        elif step == 5:
+            self.auto_move((PRIMARY_TOS, SECONDARY_TOS))
+            if self.motor_done[0] and self.motor_done[1]:
+                self.next_step = 6
+                self.reset_moves()
+        elif step in (6, 7, 8, 9):
+            self.auto_move((PRIMARY_FINISH, SECONDARY_FINISH))
+            if s1p >= s1p_spt and s2p >= s2p_spt:
+                self.next_step = step + 1
+        elif step == 10:
+            self.auto_move((PRIMARY_FINISH, SECONDARY_FINISH))
+            if self.motor_done[0] and self.motor_done[1]:
+                self.reset_moves()
+                self.next_step = 1 if self.repeat else 0
+                self.start = False
+                self.send_button_states()
+
+    def tick(self, now, dt):
+        """One pass of loop() followed by dt seconds of motion."""
+        if self.next_step != self.next_step_last:
+            self.send_state_engine_step()
+            self.next_step_last = self.next_step
+            if self.mode:
+                self.load_setpoints(self.next_step)
+
+        self.load_motor_setpoints()
+        if self.estop:
+            pass                                 # Latched E-stop: loop() skips all motion
+        elif not self.mode:
+            for servo, motor in enumerate(self.motors):
+                motor.move_absolute(self.setpoints[servo][2])
+        else:
+            self.state_engine()
+
+        for motor in self.motors:
+            motor.step(dt)
+
+        # Telemetry push (subscription mode)
+        if self.stream_interval > 0:
+            if now >= self.subscription_expiry:
+                self.set_subscription(0)
+                self.send_subscription_status()
+            elif now - self.last_push >= self.stream_interval:
+                self.last_push = now
+                self.send_current_values()
+
+        if now - self.last_state_report > STATE_ENGINE_INTERVAL_MS / 1000.0:
+            self.last_state_report = now
+            self.send_state_engine_step()
+
+# ============================================================================
+#                         SIMULATOR (ONE OR MANY BOARDS)
+# ============================================================================
+
+def board_port(board_id):
+    """Firmware port convention: 8888 for board 1, 8890 for board 2, ..."""
+    return BASE_PORT + 2 * (board_id - 1)
+
+class ClearCoreSimulator:
+    """
+    Runs any number of simulated boards on one thread at a fixed tick rate.
+
+    Args:
+        boards (int): Number of boards (ids 1..boards)
+        bind_ip (str): Address the board sockets bind to
+        host (tuple): (ip, port) of the host GUI
+        tick_hz (float): Motion integration / loop rate
+        command_loss (float): Fraction of received datagrams dropped (simulated packet loss)
+    """
+
+    def __init__(self, boards=2, bind_ip='127.0.0.1', host=('127.0.0.1', HOST_PORT), tick_hz=1000.0,
+                 command_loss=0.0):
+        self.tick = 1.0 / tick_hz
+        self.command_loss = command_loss
+        self.boards = {}
+        self.sockets = {}
+        for board_id in range(1, boards + 1):
+            sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            sock.bind((bind_ip, board_port(board_id)))
+            sock.setblocking(False)
+            board = SimulatedClearCore(board_id, sock, host)
+            self.boards[board_id] = board
+            self.sockets[sock] = board
+        self.running = False
+        self.thread = None
+        self.ticks = 0
+
+    def run(self):
+        """Simulation loop: service sockets until the next tick, then advance every board."""
+        self.running = True
+        next_tick = time.monotonic()
+        last = next_tick
+        sockets = list(self.sockets)
+        while self.running:
+            timeout = max(0.0, next_tick - time.monotonic())
+            readable, _, _ = select.select(sockets, [], [], timeout)
+            for sock in readable:
+                while True:
+                    try:
+                        data, _ = sock.recvfrom(2048)
+                    except (BlockingIOError, InterruptedError):
+                        break
+                    except OSError:
+                        break                    # e.g. ICMP port unreachable from a closed host
+                    if self.command_loss and random.random() < self.command_loss:
+                        continue                 # Lost on the wire
+                    self.sockets[sock].receive(data)
+            now = time.monotonic()
+            if now >= next_tick:
+                dt = now - last
+                last = now
+                for board in self.boards.values():
+                    board.tick(now, dt)
+                self.ticks += 1
+                next_tick += self.tick
+                if next_tick < now:
+                    next_tick = now + self.tick  # Overran - keep the rate, drop missed ticks
+        for sock in sockets:
+            sock.close()
+
+    def start(self):
+        """Run the simulation on a background thread."""
+        self.thread = threading.Thread(target=self.run, name="ClearCore-Simulator", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.running = False
+        if self.thread is not None:
+            self.thread.join()
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulate ClearCore boards speaking the servo UDP protocol")
+    parser.add_argument('--boards', type=int, default=2, help="number of boards (default 2)")
+    parser.add_argument('--bind', default='127.0.0.1', help="address the boards listen on")
+    parser.add_argument('--host', default='127.0.0.1', help="host GUI address (firmware remoteIp)")
+    parser.add_argument('--host-port', type=int, default=HOST_PORT, help="host GUI port (default 8889)")
+    parser.add_argument('--tick-hz', type=float, default=1000.0, help="loop/motion rate in Hz (default 1000)")
+    parser.add_argument('--command-loss', type=float, default=0.0,
+                        help="fraction of received datagrams to drop, e.g. 0.2 (default 0)")
+    args = parser.parse_args()
+
+    simulator = ClearCoreSimulator(args.boards, args.bind, (args.host, args.host_port), args.tick_hz,
+                                   args.command_loss)
+    print("=" * 50)
+    print("ClearCore Simulator")
+    print("=" * 50)
+    for board_id in simulator.boards:
+        print(f"Board {board_id}: {args.bind}:{board_port(board_id)} -> {args.host}:{args.host_port}")
+    print(f"Tick rate: {args.tick_hz:.0f} Hz  (Ctrl+C to stop)")
+    start = time.monotonic()
+    try:
+        simulator.run()
+    except KeyboardInterrupt:
+        simulator.running = False
+    elapsed = time.monotonic() - start
+    print(f"\nStopped after {elapsed:.1f} s, {simulator.ticks} ticks "
+          f"({simulator.ticks / max(elapsed, 1e-9):.0f} Hz achieved)")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
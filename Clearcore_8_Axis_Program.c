@@ -189,6 +189,38 @@ COMMUNICATION PROTOCOL:
     Command Format: "CMD:COMMAND_TYPE:PARAMETERS\n"
     Status Format:  "STATUS:V1,A1,P1,V2,A2,P2,V3,A3,P3,V4,A4,P4\n" 
     Button Format:  "BUTTON_STATES:M,R,S,S1E,S1R,S2E,S2R,S3E,S3R,S4E,S4R\n"
+    Subscribe:      "CMD:SUBSCRIBE_VALUES:<rate_hz>" -> "BOARD:n;SUBSCRIBED:<rate_hz>"
+                    Board pushes VALUES frames at <rate_hz> (max 500) for a 3 s lease;
+                    host re-sends the command as a keepalive. Rate 0 or
+                    "CMD:UNSUBSCRIBE_VALUES" cancels.
+    Format:         "CMD:VALUES_FORMAT:BINARY|TEXT" -> "BOARD:n;VALUES_FORMAT:BINARY|TEXT"
+                    Binary VALUES frame (58 bytes, little-endian): uint8 0xC5, uint8 board,
+                    uint32 sequence, uint32 millis(), int32[12] V,A,P x 4
+    Ping:           "CMD:PING:<token>" -> "BOARD:n;PONG:<token>" - application-level echo
+                    used by the host's startup reachability probe (round-trip time)
+    Recipe:         "CMD:RECIPE_BEGIN:<name>", "CMD:RECIPE_ROWS:<first step>:<row>|<row>...",
+                    "CMD:RECIPE_COMMIT:<checksum>" -> "BOARD:n;RECIPE:<name>,<checksum>" or
+                    "BOARD:n;RECIPE_ERROR:<reason>". A row is the 12 V,A,P values of one auto
+                    step for motors 1-4; the committed table replaces motor1-4_setpoints
+                    (no KV/KA/KP gains). ROWS and COMMIT are only accepted after a BEGIN
+                    (RECIPE_ERROR:NO_BEGIN otherwise) and a COMMIT closes the upload; a
+                    tracked ROWS/COMMIT that is rejected is answered NAK, not ACK.
+                    "CMD:RECIPE_CLEAR" returns to the compiled-in tables,
+                    "CMD:REQUEST_RECIPE" reports the active recipe (name NONE when cleared).
+    Bulk setpoints: "CMD:ALL_Parameters:V1,A1,P1,V2,A2,P2,V3,A3,P3,V4,A4,P4" - all four
+                    servos' setpoints in one datagram, applied together in one loop pass;
+                    anything but exactly 12 fields is rejected and changes nothing
+    Tracked:        "BOARD:n;CMD:<command>;ID:<id>" -> "BOARD:n;ACK:<id>" or "BOARD:n;NAK:<id>";
+                    retransmissions reuse the id and are answered again without executing
+                    (last 16 ids remembered). "CMD:COMMAND_ACKS" -> "BOARD:n;COMMAND_ACKS:ON"
+                    tells the host the board understands ids. Commands without ";ID:"
+                    (polls, keepalives) are executed as before without a reply.
+    E-stop:         "CMD:ESTOP:<token>" -> "BOARD:n;ESTOP:ACTIVE:<token>" - every motor is
+                    stopped abruptly, Start and the SnB2 run flags are cleared and motion
+                    stays suppressed until "CMD:ESTOP_RESET" -> "BOARD:n;ESTOP:CLEAR".
+                    The host sends each E-stop several times; every copy is answered.
+    Trailer:        Every text frame ends with ";SEQ:<sequence>;T:<millis>" - one
+                    sequence counter per board shared by text and binary frames
 
 ================================================================================
                                REVISION HISTORY
@@ -274,7 +306,7 @@ IPAddress ip1(192, 168, 1, 171);
 IPAddress ip2(192, 168, 1, 172);
 unsigned int localPort1 = 8888;
 unsigned int localPort2 = 8890;
-#define MAX_PACKET_LENGTH 100
+#define MAX_PACKET_LENGTH 512   // Room for bulk RECIPE_ROWS uploads (several steps per datagram)
 // Buffer for holding received packets.
 char packetReceived[MAX_PACKET_LENGTH];
 
@@ -411,6 +443,7 @@ int accelerationLimit4 = 100000;     // Maximum acceleration: 100000 pulses per
 bool Mode = 0;      // 0 = Manual Mode, 1 = Auto Mode
 bool Start = 0;     // 0 = Disabled, 1 = Enabled  
 bool Repeat = 0;    // 0 = Single, 1 = Repeat
+bool EStop = 0;     // 1 = Emergency stop latched, no motion until ESTOP_RESET
 
 // Servo control buttons (4 servos per ClearCore board)
 // Board 1: Controls GUI Servos 1-4, Board 2: Controls GUI Servos 5-8
@@ -603,15 +636,91 @@ const unsigned long stateEngineStepInterval = 3000; // 1 second interval
 unsigned long lastReportDataTime = 0;
 const unsigned long ReportDataInterval = 3000; // 3 second interval
 
+// ============================================================================
+//                    HOST-UPLOADED MOTION RECIPE
+// ============================================================================
+
+// The host streams a whole step table (RECIPE_BEGIN / RECIPE_ROWS / RECIPE_COMMIT)
+// into a staging buffer; COMMIT copies it over the active table in one go, so a
+// running sequence never sees a half-written recipe. While a recipe is active
+// loadSetpoints() reads it instead of motor1_setpoints..motor4_setpoints.
+#define RECIPE_STEPS 11                              // Auto sequence steps (Idle .. Finish)
+#define RECIPE_NAME_LENGTH 24                        // Including terminator
+int recipeTable[RECIPE_STEPS][4][3];                 // Active table: [step][motor][V, A, P]
+int recipeStaging[RECIPE_STEPS][4][3];               // Upload in progress
+bool recipeRowReceived[RECIPE_STEPS];                // Staging rows seen since RECIPE_BEGIN
+bool recipeStagingOpen = false;                      // RECIPE_BEGIN seen, no COMMIT yet
+bool recipeActive = false;                           // false = compiled-in tables
+char recipeName[RECIPE_NAME_LENGTH] = "NONE";        // Active recipe name
+char recipeStagingName[RECIPE_NAME_LENGTH] = "";     // Name given by RECIPE_BEGIN
+uint32_t recipeActiveChecksum = 0;                   // Checksum of the active table
+
+// ============================================================================
+//                    TELEMETRY SUBSCRIPTION (PUSH MODE)
+// ============================================================================
+
+// Host sends "CMD:SUBSCRIBE_VALUES:<rate_hz>" and this board pushes VALUES
+// frames at that rate instead of answering one REQUEST_VALUES per sample.
+// The subscription is a lease: it expires unless the host renews it.
+#define MAX_SUBSCRIPTION_RATE_HZ 500                 // Upper bound on push rate
+const unsigned long subscriptionLeaseMs = 3000;      // Lease length per SUBSCRIBE_VALUES
+unsigned long valuesStreamIntervalUs = 0;            // Push interval, 0 = not subscribed
+unsigned long lastValuesPushMicros = 0;              // Time of last pushed VALUES frame
+unsigned long subscriptionExpiry = 0;                // millis() when the lease runs out
+int subscriptionRateHz = 0;                          // Currently granted rate (Hz)
+
+// ============================================================================
+//                    BINARY VALUES FRAME (OPTIONAL FORMAT)
+// ============================================================================
+
+// Fixed-layout little-endian frame selected by "CMD:VALUES_FORMAT:BINARY":
+//   uint8 magic | uint8 board id | uint32 sequence | uint32 millis() | int32[12] V,A,P x 4
+// Avoids String concatenation per sample; text stays the default for older hosts.
+#define VALUES_FRAME_MAGIC 0xC5                      // Never a valid first byte of a text frame
+#define VALUES_FRAME_LENGTH 58                       // 1 + 1 + 4 + 4 + 12 * 4 bytes
+bool binaryValuesFormat = false;                     // false = "BOARD:n;VALUES:" text
+uint32_t frameSequence = 0;                          // Incremented for every frame sent
+
+// Every text frame ends with ";SEQ:<sequence>;T:<millis>" (see sendFrame()) and the
+// binary frame carries the same two fields, so the host can detect lost, duplicated
+// and reordered frames and measure jitter / one-way delay drift.
+
+// Tracked commands: "BOARD:n;CMD:...;ID:<id>" is answered with "BOARD:n;ACK:<id>"
+// (executed) or "BOARD:n;NAK:<id>" (unknown / malformed). The host retransmits
+// with the same id until answered; the last COMMAND_ID_HISTORY ids and their
+// results are kept so a retransmission is answered again without executing twice.
+#define COMMAND_ID_HISTORY 16
+uint32_t commandIds[COMMAND_ID_HISTORY];             // Recently executed command ids (ring)
+bool commandIdResults[COMMAND_ID_HISTORY];           // ACK (true) / NAK (false) sent for each
+int commandIdCount = 0;                              // Ids stored so far (saturates at history size)
+int commandIdNext = 0;                               // Ring slot for the next id
+
 //***********************************************************************
 
 void parseData(String data, int &V, int &A, int &P);
-void handleCommand(String command);
+bool parseAllParameters(String data);
+bool handleCommand(String command);
 void sendCurrentValues();
+void sendCurrentValuesBinary();
+void sendValuesFormat();
+void sendFrame(String &msg);
 void sendButtonStates();
 void sendSetpoints();
 void CalculateAcceleration(MotorDriver &motor, int &acceleration, unsigned long &lastMillis, int &lastVelocity);
 void sendStateEngineStep();
+void sendSubscriptionStatus();
+void sendPong(String token);
+void sendRecipeStatus();
+void sendRecipeError(const char *reason);
+void parseRecipeRows(String data);
+void sendCommandAck(uint32_t id, bool ok);
+void emergencyStop();
+void sendEStopStatus(String token);
+int findCommandId(uint32_t id);
+void rememberCommandId(uint32_t id, bool ok);
+uint32_t recipeChecksum(int table[RECIPE_STEPS][4][3]);
+bool commitRecipe(uint32_t checksum);
+void setValuesSubscription(int rateHz);
 void loadMotorSetpoints();
 void loadSetpoints(int step);
 
@@ -1028,17 +1137,35 @@ void loop() {
     // NETWORK PACKET PROCESSING
     // ========================================================================
 
-    // Check for incoming UDP packets from Python GUI
-    int packetSize = Udp.parsePacket();    // Parse any available UDP packets
-    IPAddress remote = Udp.remoteIP();     // Get sender's IP address for response routing
+    // Incoming packets are read only by ReadUdpData() above - a second
+    // Udp.parsePacket() here would silently discard the next command
     
     // Maintain Ethernet connection health and process any DHCP renewals
     Ethernet.maintain();    // Keep network connection active
-    delay(10);              // Small delay to prevent excessive CPU usage
+    if (valuesStreamIntervalUs == 0) {
+        delay(10);          // Idle pacing - skipped while streaming so pushes keep their rate
+    }
     
     // Update motor parameters based on any received commands
     // This function applies new setpoints received via UDP
     UpdateMotorParameters();
+
+    // ========================================================================
+    // TELEMETRY PUSH (SUBSCRIPTION MODE)
+    // ========================================================================
+
+    // Push fresh VALUES frames at the subscribed rate while the lease is valid
+    if (valuesStreamIntervalUs > 0) {
+        if ((long)(currentMillis - subscriptionExpiry) >= 0) {
+            // Host stopped renewing - fall back to request/response only
+            setValuesSubscription(0);
+            sendSubscriptionStatus();
+            Serial.println("Telemetry subscription lease expired");
+        } else if (micros() - lastValuesPushMicros >= valuesStreamIntervalUs) {
+            lastValuesPushMicros = micros();
+            sendCurrentValues();
+        }
+    }
   // ========================================================================
   // STATE ENGINE FOR COORDINATED MOTOR SEQUENCING
   // ========================================================================
@@ -1061,7 +1188,7 @@ void loop() {
     // MANUAL MODE OPERATION (Mode = 0)
     // ========================================================================
     
-    if (Mode == 0) {    // Manual Mode: Direct servo control via GUI setpoints
+    if (Mode == 0 && !EStop) {    // Manual Mode: Direct servo control via GUI setpoints
         // Load current setpoint values from GUI into active motor parameters
         loadMotorSetpoints();
         
@@ -1077,7 +1204,7 @@ void loop() {
     // AUTOMATIC MODE OPERATION (Mode = 1) - COORDINATED MOTION SEQUENCES
     // ========================================================================
     
-    if (Mode == 1) {    // Auto Mode: Predefined motion sequences for automation
+    if (Mode == 1 && !EStop) {    // Auto Mode: Predefined motion sequences for automation
         // Load motor setpoints for current automation step
         loadMotorSetpoints();
         
@@ -1329,6 +1456,7 @@ void loop() {
  * - Commands arrive as ASCII strings via UDP
  * - Format: "CMD:COMMAND_TYPE:PARAMETERS\n"
  * - Examples: "CMD:S1_Parameters:1000,500,2000"
+ *            "CMD:ALL_Parameters:1000,500,2000,...(12 values, servos 1-4)"
  *            "CMD:CLEAR_S1_POSITION"
  *            "CMD:Mode AUTO"
  * 
@@ -1363,7 +1491,21 @@ void ReadUdpData() {
         String prefix = "BOARD:" + String(BOARD_ID) + ";";
         if (udpCommand.startsWith(prefix)) {
             udpCommand = udpCommand.substring(prefix.length()); // Remove prefix
-            handleCommand(udpCommand);
+            int idPos = udpCommand.lastIndexOf(";ID:");
+            if (idPos < 0) {
+                handleCommand(udpCommand);       // Untracked: polls, keepalives, older hosts
+            } else {
+                uint32_t id = strtoul(udpCommand.substring(idPos + 4).c_str(), NULL, 10);
+                int slot = findCommandId(id);
+                if (slot >= 0) {
+                    // Retransmission of a command already executed - answer again, do not repeat it
+                    sendCommandAck(id, commandIdResults[slot]);
+                } else {
+                    bool ok = handleCommand(udpCommand.substring(0, idPos));
+                    rememberCommandId(id, ok);
+                    sendCommandAck(id, ok);
+                }
+            }
         }
         // Optionally, ignore or log commands not meant for this board
     }
@@ -1380,26 +1522,117 @@ void parseData(String data, int &V, int &A, int &P) {
     P = data.substring(secondComma + 1).toInt();
 }
 //********************************************************************
+// "V1,A1,P1,V2,A2,P2,V3,A3,P3,V4,A4,P4" - parsed into a local table first and
+// only copied to the S*_SPT setpoints when all 12 fields are present, so a
+// truncated packet never leaves the servos with a mix of old and new values
+bool parseAllParameters(String data) {
+    int values[12];
+    int start = 0;
+    for (int i = 0; i < 12; i++) {
+        int comma = data.indexOf(',', start);
+        if ((i < 11) == (comma < 0)) {
+            return false;           // Too few or too many fields
+        }
+        int end = (comma < 0) ? data.length() : comma;
+        values[i] = data.substring(start, end).toInt();
+        start = end + 1;
+    }
+
+    S1V_SPT = values[0];  S1A_SPT = values[1];  S1P_SPT = values[2];
+    S2V_SPT = values[3];  S2A_SPT = values[4];  S2P_SPT = values[5];
+    S3V_SPT = values[6];  S3A_SPT = values[7];  S3P_SPT = values[8];
+    S4V_SPT = values[9];  S4A_SPT = values[10]; S4P_SPT = values[11];
+    return true;
+}
+//********************************************************************
 // read command string from HMI and parse command string
-void handleCommand(String input) {
+bool handleCommand(String input) {
     input.trim(); // Remove whitespace and newlines
    
       // Special commands
     if (input == "CMD:REQUEST_VALUES") {
         //Serial.println("Debug 900 - Processing CMD:REQUEST_VALUES");
         sendCurrentValues();
-        return;
+        return true;
     } else if (input == "CMD:REQUEST_BUTTON_STATES") {
         Serial.println("Debug 901 - Processing CMD:REQUEST_BUTTON_STATES");
         sendButtonStates();
-        return;
+        return true;
     } else if (input == "CMD:REQUEST_SETPOINTS") {
         Serial.println("Debug 902 - Processing CMD:REQUEST_SETPOINTS");
         sendSetpoints();
-        return;
+        return true;
     } else if (input == "CMD:REQUEST_STATE_ENGINE") {
         sendStateEngineStep();
-        return;
+        return true;
+    } else if (input.startsWith("CMD:PING:")) {
+        // Reachability probe - echo the token straight back
+        sendPong(input.substring(9));
+        return true;
+    } else if (input.startsWith("CMD:SUBSCRIBE_VALUES:")) {
+        // Start or renew push-mode telemetry (also serves as the keepalive)
+        setValuesSubscription(input.substring(21).toInt());
+        sendSubscriptionStatus();
+        return true;
+    } else if (input == "CMD:UNSUBSCRIBE_VALUES") {
+        setValuesSubscription(0);
+        sendSubscriptionStatus();
+        return true;
+    } else if (input == "CMD:VALUES_FORMAT:BINARY") {
+        // Format negotiation - host confirms the choice from the reply
+        binaryValuesFormat = true;
+        sendValuesFormat();
+        return true;
+    } else if (input == "CMD:VALUES_FORMAT:TEXT") {
+        binaryValuesFormat = false;
+        sendValuesFormat();
+        return true;
+    } else if (input.startsWith("CMD:RECIPE_BEGIN:")) {
+        // New upload - forget any partial staging table
+        input.substring(17).toCharArray(recipeStagingName, RECIPE_NAME_LENGTH);
+        for (int step = 0; step < RECIPE_STEPS; step++) {
+            recipeRowReceived[step] = false;
+        }
+        recipeStagingOpen = true;
+        return true;
+    } else if (input.startsWith("CMD:RECIPE_ROWS:")) {
+        if (!recipeStagingOpen) {
+            sendRecipeError("NO_BEGIN");
+            return false;                // NAK - rows outside an upload are not staged
+        }
+        parseRecipeRows(input.substring(16));
+        return true;
+    } else if (input.startsWith("CMD:RECIPE_COMMIT:")) {
+        // NAK unless the table was activated, so the host re-runs the upload
+        return commitRecipe((uint32_t)strtoul(input.substring(18).c_str(), NULL, 10));
+    } else if (input == "CMD:RECIPE_CLEAR") {
+        recipeActive = false;
+        strcpy(recipeName, "NONE");
+        recipeActiveChecksum = 0;
+        sendRecipeStatus();
+        return true;
+    } else if (input == "CMD:REQUEST_RECIPE") {
+        sendRecipeStatus();
+        return true;
+    } else if (input.startsWith("CMD:ESTOP:")) {
+        // Emergency stop - handled before anything else in this pass
+        emergencyStop();
+        sendEStopStatus(input.substring(10));
+        return true;
+    } else if (input == "CMD:ESTOP_RESET") {
+        EStop = false;
+        moveState1 = MOVE_IDLE;
+        moveState2 = MOVE_IDLE;
+        moveState3 = MOVE_IDLE;
+        moveState4 = MOVE_IDLE;
+        Serial.println("DATA: E-stop released");
+        sendEStopStatus("");
+        return true;
+    } else if (input == "CMD:COMMAND_ACKS") {
+        // Capability probe - the host tags commands with ";ID:<n>" once this is answered
+        String msg = "BOARD:" + String(BOARD_ID) + ";COMMAND_ACKS:ON";
+        sendFrame(msg);
+        return true;
     }
 
     // Remove "CMD:" prefix if present for custom commands
@@ -1408,7 +1641,9 @@ void handleCommand(String input) {
         command = command.substring(4);
     }
 
-    // Main command handling logic
+    // Main command handling logic - state commands are idempotent (ENABLE on an enabled
+    // servo is acknowledged and changes nothing), so a retransmitted command is harmless
+    bool handled = true;
     if (command == "Mode AUTO") {
         Mode = true;
         Serial.println("DATA: Auto Mode");
@@ -1421,13 +1656,13 @@ void handleCommand(String input) {
         Serial.print("ACK:");
         Serial.println(command);
     }
-    else if (command == "Repeat ENABLE" && !Repeat) {
+    else if (command == "Repeat ENABLE") {
         Repeat = true;
         Serial.println("DATA: Repeat enabled");
         Serial.print("ACK:");
         Serial.println(command);
     }
-    else if (command == "Repeat DISABLE" && Repeat) {
+    else if (command == "Repeat DISABLE") {
         Repeat = false;
         Serial.println("DATA: Repeat disabled");
         Serial.print("ACK:");
@@ -1445,28 +1680,28 @@ void handleCommand(String input) {
         Serial.print("ACK:");
         Serial.println(command);
     }
-    else if (command == "S1B1 ENABLE" && !S1B1) {
+    else if (command == "S1B1 ENABLE") {
         S1B1 = true;
         Serial.println("Serial Available Flag3a");
         Serial.println("DATA:Servo1 Enabled");
         Serial.print("ACK:");
         Serial.println(command);
     }
-    else if (command == "S1B1 DISABLE" && S1B1) {
+    else if (command == "S1B1 DISABLE") {
         S1B1 = false;
         Serial.println("Serial Available Flag4");
         Serial.println("DATA:Servo1 Disabled");
         Serial.print("ACK:");
         Serial.println(command);
     }
-    else if (command == "S1B2 Start" && !S1B2) {
+    else if (command == "S1B2 Start") {
         S1B2 = true;
         Serial.println("Serial Available Flag4a");
         Serial.println("DATA:Servo1 Started");
         Serial.print("ACK:");
         Serial.println(command);
     }
-    else if (command == "S1B2 STOP" && S1B2) {
+    else if (command == "S1B2 STOP") {
         S1B2 = false;
         Serial.println("DATA:Servo1 Stopped");
         Serial.print("ACK:");
@@ -1484,25 +1719,25 @@ void handleCommand(String input) {
         Serial.print("ACK:");
         Serial.println(command);
     }
-    else if (command == "S2B1 ENABLE" && !S2B1) {
+    else if (command == "S2B1 ENABLE") {
         S2B1 = true;
         Serial.println("DATA:Servo2 Enabled");
         Serial.print("ACK:");
         Serial.println(command);
     }
-    else if (command == "S2B1 DISABLE" && S2B1) {
+    else if (command == "S2B1 DISABLE") {
         S2B1 = false;
         Serial.println("DATA:Servo2 Disabled");
         Serial.print("ACK:");
         Serial.println(command);
     }
-    else if (command == "S2B2 Start" && !S2B2) {
+    else if (command == "S2B2 Start") {
         S2B2 = true;
         Serial.println("DATA:Servo2 Started");
         Serial.print("ACK:");
         Serial.println(command);
     }
-    else if (command == "S2B2 STOP" && S2B2) {
+    else if (command == "S2B2 STOP") {
         S2B2 = false;
         Serial.println("DATA:Servo2 Stopped");
         Serial.print("ACK:");
@@ -1519,25 +1754,25 @@ void handleCommand(String input) {
         Serial.print("ACK:");
         Serial.println(command);
     }
-    else if (command == "S3B1 ENABLE" && !S3B1) {
+    else if (command == "S3B1 ENABLE") {
         S3B1 = true;
         Serial.println("DATA:Servo3 Enabled");
         Serial.print("ACK:");
         Serial.println(command);
     }
-    else if (command == "S3B1 DISABLE" && S3B1) {
+    else if (command == "S3B1 DISABLE") {
         S3B1 = false;
         Serial.println("DATA:Servo3 Disabled");
         Serial.print("ACK:");
         Serial.println(command);
     }
-    else if (command == "S3B2 Start" && !S3B2) {
+    else if (command == "S3B2 Start") {
         S3B2 = true;
         Serial.println("DATA:Servo3 Started");
         Serial.print("ACK:");
         Serial.println(command);
     }
-    else if (command == "S3B2 STOP" && S3B2) {
+    else if (command == "S3B2 STOP") {
         S3B2 = false;
         Serial.println("DATA:Servo3 Stopped");
         Serial.print("ACK:");
@@ -1554,25 +1789,25 @@ void handleCommand(String input) {
         Serial.print("ACK:");
         Serial.println(command);
     }
-    else if (command == "S4B1 ENABLE" && !S4B1) {
+    else if (command == "S4B1 ENABLE") {
         S4B1 = true;
         Serial.println("DATA:Servo4 Enabled");
         Serial.print("ACK:");
         Serial.println(command);
     }
-    else if (command == "S4B1 DISABLE" && S4B1) {
+    else if (command == "S4B1 DISABLE") {
         S4B1 = false;
         Serial.println("DATA:Servo4 Disabled");
         Serial.print("ACK:");
         Serial.println(command);
     }
-    else if (command == "S4B2 Start" && !S4B2) {
+    else if (command == "S4B2 Start") {
         S4B2 = true;
         Serial.println("DATA:Servo4 Started");
         Serial.print("ACK:");
         Serial.println(command);
     }
-    else if (command == "S4B2 STOP" && S4B2) {
+    else if (command == "S4B2 STOP") {
         S4B2 = false;
         Serial.println("DATA:Servo4 Stopped");
         Serial.print("ACK:");
@@ -1589,6 +1824,18 @@ void handleCommand(String input) {
         Serial.print("ACK:");
         Serial.println(command);
     }
+    else if (command.startsWith("ALL_Parameters:")) {
+        // Bulk upload - all four servos change in the same loop pass or not at all
+        if (parseAllParameters(command.substring(15))) {
+            Serial.println("DATA:All parameters received");
+            Serial.print("ACK:");
+            Serial.println(command);
+        } else {
+            Serial.print("ERR:Malformed ALL_Parameters - ");
+            Serial.println(command);
+            handled = false;
+        }
+    }
     // Clear position commands for all servos
     else if (command == "S1_ClearPosition") {
         motor1.PositionRefSet(0);
@@ -1620,21 +1867,63 @@ void handleCommand(String input) {
         if (Serial.available() > 0) {
             Serial.read();  // Flush the serial buffer
         }
+        handled = false;
     }
+    return handled;
 }
 //********************************************************************
 void sendCurrentValues() {
+    if (binaryValuesFormat) {
+        sendCurrentValuesBinary();
+        return;
+    }
     String msg = "BOARD:" + String(BOARD_ID) + ";VALUES:";
     msg += String(S1V) + "," + String(S1A) + "," + String(S1P) + ",";
     msg += String(S2V) + "," + String(S2A) + "," + String(S2P) + ",";
     msg += String(S3V) + "," + String(S3A) + "," + String(S3P) + ",";
     msg += String(S4V) + "," + String(S4A) + "," + String(S4P);
     //Serial.print("Sending VALUES: "); Serial.println(msg);
-        Udp.beginPacket(remoteIp, remotePort);
+    sendFrame(msg);
+}
+
+// Append the sequence/timestamp trailer and transmit a text frame to the host
+void sendFrame(String &msg) {
+    msg += ";SEQ:";
+    msg += String(frameSequence++);
+    msg += ";T:";
+    msg += String(millis());
+
+    Udp.beginPacket(remoteIp, remotePort);
     Udp.write(msg.c_str());
     Udp.endPacket();
 }
 
+void sendCurrentValuesBinary() {
+    int32_t values[12] = {S1V, S1A, S1P, S2V, S2A, S2P,
+                          S3V, S3A, S3P, S4V, S4A, S4P};
+    uint32_t sequence = frameSequence++;
+    uint32_t timestamp = millis();
+    uint8_t frame[VALUES_FRAME_LENGTH];
+
+    // ClearCore (Cortex-M4) is little-endian, so fields are copied as-is
+    frame[0] = VALUES_FRAME_MAGIC;
+    frame[1] = BOARD_ID;
+    memcpy(&frame[2], &sequence, 4);
+    memcpy(&frame[6], &timestamp, 4);
+    memcpy(&frame[10], values, sizeof(values));
+
+    Udp.beginPacket(remoteIp, remotePort);
+    Udp.write(frame, VALUES_FRAME_LENGTH);
+    Udp.endPacket();
+}
+
+void sendValuesFormat() {
+    String msg = "BOARD:" + String(BOARD_ID) + ";VALUES_FORMAT:";
+    msg += (binaryValuesFormat ? "BINARY" : "TEXT");
+
+    sendFrame(msg);
+}
+
 void sendButtonStates() {
     String msg = "BOARD:" + String(BOARD_ID) + ";BUTTON_STATES:";
     msg += (Mode ? "1" : "0"); msg += ",";
@@ -1649,9 +1938,7 @@ void sendButtonStates() {
     msg += (S4B1 ? "1" : "0"); msg += ",";
     msg += (S4B2 ? "1" : "0");
 
-    Udp.beginPacket(remoteIp, remotePort);
-    Udp.write(msg.c_str());
-    Udp.endPacket();
+    sendFrame(msg);
 }
 
 void sendSetpoints() {
@@ -1661,9 +1948,7 @@ void sendSetpoints() {
     msg += String(S3V_SPT) + "," + String(S3A_SPT) + "," + String(S3P_SPT) + ",";
     msg += String(S4V_SPT) + "," + String(S4A_SPT) + "," + String(S4P_SPT);
 
-    Udp.beginPacket(remoteIp, remotePort);
-    Udp.write(msg.c_str());
-    Udp.endPacket();
+    sendFrame(msg);
 
     // Optionally, also print to Serial with prefix
     Serial.print("BOARD:"); Serial.print(BOARD_ID); Serial.print(";SETPOINTS:");
@@ -1684,14 +1969,190 @@ void sendSetpoints() {
 void sendStateEngineStep() {
     String msg = "BOARD:" + String(BOARD_ID) + ";STATE_ENGINE:" + String(next_step);
 
-    Udp.beginPacket(remoteIp, remotePort);
-    Udp.write(msg.c_str());
-    Udp.endPacket();
+    sendFrame(msg);
 
     Serial.print("BOARD:"); Serial.print(BOARD_ID); Serial.print(";STATE_ENGINE:");
     Serial.println(next_step);
 }
 //********************************************************************
+// Start, renew or cancel (rateHz <= 0) the VALUES push subscription
+void setValuesSubscription(int rateHz) {
+    if (rateHz <= 0) {
+        valuesStreamIntervalUs = 0;
+        subscriptionRateHz = 0;
+        return;
+    }
+    if (rateHz > MAX_SUBSCRIPTION_RATE_HZ) {
+        rateHz = MAX_SUBSCRIPTION_RATE_HZ;
+    }
+    if (rateHz != subscriptionRateHz) {
+        Serial.print("Telemetry subscription rate: ");
+        Serial.println(rateHz);
+    }
+    subscriptionRateHz = rateHz;
+    valuesStreamIntervalUs = 1000000UL / rateHz;
+    subscriptionExpiry = millis() + subscriptionLeaseMs;
+}
+
+void sendSubscriptionStatus() {
+    String msg = "BOARD:" + String(BOARD_ID) + ";SUBSCRIBED:" + String(subscriptionRateHz);
+
+    sendFrame(msg);
+}
+
+void sendPong(String token) {
+    String msg = "BOARD:" + String(BOARD_ID) + ";PONG:" + token;
+
+    sendFrame(msg);
+}
+//********************************************************************
+// Command acknowledgement
+//********************************************************************
+void sendCommandAck(uint32_t id, bool ok) {
+    String msg = "BOARD:" + String(BOARD_ID) + (ok ? ";ACK:" : ";NAK:") + String(id);
+
+    sendFrame(msg);
+}
+
+// Ring slot of a recently executed command id, -1 if it is new
+int findCommandId(uint32_t id) {
+    for (int i = 0; i < commandIdCount; i++) {
+        if (commandIds[i] == id) {
+            return i;
+        }
+    }
+    return -1;
+}
+
+void rememberCommandId(uint32_t id, bool ok) {
+    commandIds[commandIdNext] = id;
+    commandIdResults[commandIdNext] = ok;
+    commandIdNext = (commandIdNext + 1) % COMMAND_ID_HISTORY;
+    if (commandIdCount < COMMAND_ID_HISTORY) {
+        commandIdCount++;
+    }
+}
+//********************************************************************
+// Emergency stop
+//********************************************************************
+// Abort every move and latch the stop; loop() skips all motion until ESTOP_RESET
+void emergencyStop() {
+    motor1.MoveStopAbrupt();
+    motor2.MoveStopAbrupt();
+    motor3.MoveStopAbrupt();
+    motor4.MoveStopAbrupt();
+    if (!EStop) {
+        EStop = true;
+        Start = false;
+        S1B2 = false;
+        S2B2 = false;
+        S3B2 = false;
+        S4B2 = false;
+        next_step = 0;
+        Serial.println("DATA: E-stop latched");
+        sendButtonStates();
+    }
+}
+
+// "ESTOP:ACTIVE:<token>" while latched, "ESTOP:CLEAR" once released
+void sendEStopStatus(String token) {
+    String msg = "BOARD:" + String(BOARD_ID);
+    if (EStop) {
+        msg += ";ESTOP:ACTIVE:";
+        msg += token;
+    } else {
+        msg += ";ESTOP:CLEAR";
+    }
+    sendFrame(msg);
+}
+//********************************************************************
+// Recipe upload
+//********************************************************************
+// "<first step>:<12 values>|<12 values>|..." into the staging table
+void parseRecipeRows(String data) {
+    int colon = data.indexOf(':');
+    if (colon < 0) {
+        return;
+    }
+    int step = data.substring(0, colon).toInt();
+    int pos = colon + 1;
+    while (pos < (int)data.length() && step >= 0 && step < RECIPE_STEPS) {
+        int end = data.indexOf('|', pos);
+        if (end < 0) {
+            end = data.length();
+        }
+        int start = pos;
+        for (int i = 0; i < 12; i++) {
+            int comma = data.indexOf(',', start);
+            if (comma < 0 || comma > end) {
+                comma = end;
+            }
+            recipeStaging[step][i / 3][i % 3] = data.substring(start, comma).toInt();
+            start = comma + 1;
+        }
+        recipeRowReceived[step] = true;
+        step++;
+        pos = end + 1;
+    }
+}
+
+// Order-sensitive checksum over every value (checksum * 31 + value, 32-bit wrap)
+uint32_t recipeChecksum(int table[RECIPE_STEPS][4][3]) {
+    uint32_t checksum = 0;
+    for (int step = 0; step < RECIPE_STEPS; step++) {
+        for (int motor = 0; motor < 4; motor++) {
+            for (int k = 0; k < 3; k++) {
+                checksum = checksum * 31 + (uint32_t)table[step][motor][k];
+            }
+        }
+    }
+    return checksum;
+}
+
+// Activate the staging table if a BEGIN opened it, it is complete and it matches
+// the host's checksum; returns false (NAK) otherwise. Either way the upload is
+// closed - the host starts again with RECIPE_BEGIN
+bool commitRecipe(uint32_t checksum) {
+    if (!recipeStagingOpen) {
+        sendRecipeError("NO_BEGIN");
+        return false;
+    }
+    recipeStagingOpen = false;
+    for (int step = 0; step < RECIPE_STEPS; step++) {
+        if (!recipeRowReceived[step]) {
+            sendRecipeError("MISSING_ROWS");
+            return false;
+        }
+    }
+    if (recipeChecksum(recipeStaging) != checksum) {
+        sendRecipeError("CHECKSUM");
+        return false;
+    }
+    memcpy(recipeTable, recipeStaging, sizeof(recipeTable));
+    strcpy(recipeName, recipeStagingName);
+    recipeActiveChecksum = checksum;
+    recipeActive = true;
+    if (Mode == 1) {
+        loadSetpoints(next_step);    // Running sequence picks up the new table at once
+    }
+    sendRecipeStatus();
+    return true;
+}
+
+void sendRecipeStatus() {
+    String msg = "BOARD:" + String(BOARD_ID) + ";RECIPE:" + String(recipeName) + "," + String(recipeActiveChecksum);
+
+    sendFrame(msg);
+}
+
+void sendRecipeError(const char *reason) {
+    String msg = "BOARD:" + String(BOARD_ID) + ";RECIPE_ERROR:" + String(reason);
+
+    sendFrame(msg);
+    Serial.print("Recipe upload rejected: ");
+    Serial.println(reason);
+}
+//********************************************************************
 //Motor Functions
 //********************************************************************
 void loadMotorSetpoints() {
@@ -1709,7 +2170,26 @@ void loadMotorSetpoints() {
 //*************************************************
 void loadSetpoints(int step) {
     
-    if (step >= 0 && step <= 10) {
+    if (step >= 0 && step < RECIPE_STEPS && recipeActive) {
+
+        // Host-uploaded recipe - absolute values, no gains
+        S1V_SPT = recipeTable[step][0][0];
+        S1A_SPT = recipeTable[step][0][1];
+        S1P_SPT = recipeTable[step][0][2];
+
+        S2V_SPT = recipeTable[step][1][0];
+        S2A_SPT = recipeTable[step][1][1];
+        S2P_SPT = recipeTable[step][1][2];
+
+        S3V_SPT = recipeTable[step][2][0];
+        S3A_SPT = recipeTable[step][2][1];
+        S3P_SPT = recipeTable[step][2][2];
+
+        S4V_SPT = recipeTable[step][3][0];
+        S4A_SPT = recipeTable[step][3][1];
+        S4P_SPT = recipeTable[step][3][2];
+
+    } else if (step >= 0 && step <= 10) {
 
         S1V_SPT = motor1_setpoints[step][0] * KV1;
         S1A_SPT = motor1_setpoints[step][1] * KA1;
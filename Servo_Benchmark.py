@@ -0,0 +1,681 @@
+#!/usr/bin/env python3
+"""
+=============================================================================
+Servo Control End-to-End Latency Benchmark
+=============================================================================
+
+PURPOSE:
+    Measures how long an OK (S{n}B3) press takes to become visible motion,
+    stage by stage, by driving the real event handling code of
+    the servo_control package headlessly against ClearCore_Simulator.py:
+
+        press      handle_event() called with the B{b}_S{n}B3 event
+        queued     handle_event() returned (command queued on the I/O scheduler)
+        wire       datagram handed to the socket by the transport event loop
+        applied    first VALUES frame received showing the axis moving
+                   (firmware accepted the setpoints and started the move)
+        displayed  Position display element updated with the moving position
+        settled    Position display shows the commanded target
+
+    Reports p50/p95/p99 per stage for single presses and throughput for
+    command bursts (all 8 OK buttons pressed back to back), and writes the
+    results as JSON so revisions can be compared (--baseline).
+
+    E-stop latency: the E-STOP button is pressed right after an 8-command
+    burst (queue and link busy) and the time from the press to each board's
+    "ESTOP:ACTIVE" confirmation is reported; the boards are reset between
+    runs.
+
+HEADLESS OPERATION:
+    A HeadlessWindow stands in for the FreeSimpleGUI window: it has the board
+    panel element keys, records element updates and queues write_event_value()
+    events. The benchmark's main thread plays the GUI thread - it presses
+    buttons and applies IO_UPDATE_EVENT batches through the GuiRenderer
+    exactly like the main loop. Everything else (I/O scheduler, transport,
+    mailbox, parsing, axis state) is the production code.
+
+USAGE:
+    python3 Servo_Benchmark.py                               # in-process simulator
+    python3 Servo_Benchmark.py --samples 500 --output rev35.json
+    python3 Servo_Benchmark.py --baseline rev34.json --tolerance 0.25
+    python3 Servo_Benchmark.py --external                    # simulator already running
+    python3 Servo_Benchmark.py --adaptive                    # motion-driven telemetry rate
+    python3 Servo_Benchmark.py --replay recordings/<session> # parse/render throughput
+
+    Exit status is 1 when --baseline is given and any p95/p99 latency grew,
+    or burst throughput fell, by more than --tolerance.
+
+AUTHOR: Greg Skovira
+DATE: October 2026
+=============================================================================
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import platform
+import queue
+import subprocess
+import sys
+import time
+
+# The host reads its controller addresses at import - default them to the local simulator
+os.environ.setdefault('SERVO_CLEARCORE1_IP', '127.0.0.1')
+os.environ.setdefault('SERVO_CLEARCORE2_IP', '127.0.0.1')
+
+import ClearCore_Simulator                       # noqa: E402
+from servo_control import (config, events, handlers, protocol, render,  # noqa: E402  (no GUI toolkit)
+                           replay, runtime, scheduler, state)
+
+# ============================================================================
+#                         BENCHMARK CONFIGURATION
+# ============================================================================
+
+RESULTS_VERSION = 1                              # JSON layout version
+SINGLE_STAGES = [                                # (name, from stamp, to stamp)
+    ('handler', 'press', 'queued'),
+    ('scheduler', 'queued', 'wire'),
+    ('controller', 'wire', 'applied'),
+    ('render', 'applied', 'displayed'),
+    ('press_to_wire', 'press', 'wire'),
+    ('press_to_display', 'press', 'displayed'),
+    ('press_to_settled', 'press', 'settled'),
+]
+COMPARED_PERCENTILES = ('p95', 'p99')            # Regression check on the tail latencies
+SAMPLE_TIMEOUT = 5.0                             # Seconds before a press counts as lost
+STARTUP_TIMEOUT = 10.0                           # Seconds to wait for both subscriptions
+DEFAULT_VELOCITY = 2000                          # Benchmark move profile (steps/s, steps/s^2)
+DEFAULT_ACCELERATION = 20000
+
+# ============================================================================
+#                         HEADLESS WINDOW
+# ============================================================================
+
+class HeadlessElement:
+    """Stand-in for a FreeSimpleGUI element: remembers what it shows."""
+
+    def __init__(self, key, window):
+        self.key = key
+        self.window = window
+        self.value = None
+        self.updates = 0
+
+    def update(self, *args, **kwargs):
+        self.value = args[0] if args else kwargs.get('value', kwargs.get('text', self.value))
+        self.updates += 1
+        if self.window.on_update is not None:
+            self.window.on_update(self.key, self.value, time.monotonic())
+
+class HeadlessWindow:
+    """
+    Stand-in for the main window with the keys of both board panels.
+
+    write_event_value() queues events for read(), refresh() only counts,
+    and on_update(key, value, time) is called for every element update.
+    """
+
+    def __init__(self):
+        self.events = queue.Queue()
+        self.refreshes = 0
+        self.on_update = None
+        keys = ['LINK_STATS', 'SHUTDOWN', 'APPLY_ALL']
+        for board in (1, 2):
+            prefix = state.board_prefixes[board]
+            keys += [prefix + 'CLEAR_ALL_FAULTS', prefix + 'ESTOP', prefix + 'ESTOP_RESET', prefix + 'ESTOP_STATUS']
+            for servo in range(1, state.AXES_PER_BOARD + 1):
+                for suffix in ('V_SPT_btn', 'A_SPT_btn', 'P_SPT_btn', 'B1', 'B2', 'B3', 'B4', 'P_display', '_SPT_STATUS'):
+                    keys.append(prefix + f'S{servo}{suffix}')
+        self.AllKeysDict = {key: HeadlessElement(key, self) for key in keys}
+
+    def __getitem__(self, key):
+        return self.AllKeysDict[key]
+
+    def write_event_value(self, key, value):
+        self.events.put((key, value))
+
+    def read(self, timeout=None):
+        """Like Window.read(timeout=ms): next event or ('__TIMEOUT__', {})."""
+        try:
+            key, value = self.events.get(timeout=None if timeout is None else timeout / 1000.0)
+        except queue.Empty:
+            return '__TIMEOUT__', {}
+        return key, {key: value}
+
+    def refresh(self):
+        self.refreshes += 1
+
+# ============================================================================
+#                         INSTRUMENTATION
+# ============================================================================
+
+class TimedTransport:
+    """
+    Transport wrapper handed to the I/O scheduler: stamps when a watched
+    command actually leaves for the socket.
+
+    The stamp is scheduled on the transport loop right after the engine's
+    own sendto callback, so it runs once the datagram has been written.
+    """
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.expected = {}                       # (board, cmd) -> sample dict
+
+    def expect(self, board, cmd, sample):
+        self.expected[(board, cmd)] = sample
+
+    def send(self, board, cmd):
+        self.engine.send(board, cmd)
+        body, sep, _ = cmd.rpartition(";ID:")    # Acknowledged commands carry a request id
+        sample = self.expected.pop((board, body + "\n" if sep else cmd), None)
+        if sample is not None and self.engine.loop is not None:
+            self.engine.loop.call_soon_threadsafe(stamp, sample, 'wire')
+
+def stamp(sample, name, when=None):
+    """Record the first time a sample reaches a stage."""
+    if name not in sample:
+        sample[name] = time.monotonic() if when is None else when
+
+def frame_positions(frame):
+    """Positions of servos 1-4 from a ValuesFrame or text VALUES frame, else None."""
+    if isinstance(frame, protocol.ValuesFrame):
+        return frame.values[2::3], frame.arrival
+    message = protocol.strip_board_prefix(frame)
+    if not message.startswith("VALUES:"):
+        return None
+    parts = protocol.parse_values_text(message)
+    if parts is None:
+        return None
+    return parts[2::3], time.monotonic()
+
+def percentile(samples, pct):
+    """Linear-interpolated percentile of a list of numbers (None if empty)."""
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    rank = (len(ordered) - 1) * pct / 100.0
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+def summarize(samples):
+    """count/mean/p50/p95/p99/max of millisecond samples."""
+    if not samples:
+        return {'count': 0}
+    return {
+        'count': len(samples),
+        'mean': round(sum(samples) / len(samples), 3),
+        'p50': round(percentile(samples, 50), 3),
+        'p95': round(percentile(samples, 95), 3),
+        'p99': round(percentile(samples, 99), 3),
+        'max': round(max(samples), 3),
+    }
+
+# ============================================================================
+#                         BENCHMARK RUNNER
+# ============================================================================
+
+class LatencyBenchmark:
+    """
+    Drives the host pipeline headlessly and collects per-stage timestamps.
+
+    Args:
+        velocity (int): Velocity setpoint used for every move
+        acceleration (int): Acceleration setpoint used for every move
+    """
+
+    def __init__(self, velocity=DEFAULT_VELOCITY, acceleration=DEFAULT_ACCELERATION):
+        self.velocity = velocity
+        self.acceleration = acceleration
+        self.window = HeadlessWindow()
+        self.transport = TimedTransport(runtime.transport_engine)
+        self.scheduler = scheduler.IOScheduler(self.window, runtime.message_queue, self.transport)
+        self.renderer = render.GuiRenderer(self.window)
+        self.watching = {}                       # (board, servo) -> sample being measured
+        self.displays = {}                       # P_display key -> (board, servo)
+        for board in (1, 2):
+            for servo in range(1, state.AXES_PER_BOARD + 1):
+                self.displays[state.board_prefixes[board] + f'S{servo}P_display'] = (board, servo)
+        self.window.on_update = self.on_display_update
+        runtime.transport_engine.subscribe(self.on_frame)
+
+    def start(self):
+        """Install the headless window in the host and wait for telemetry on both boards."""
+        runtime.io_scheduler = self.scheduler
+        runtime.gui_renderer = self.renderer
+        self.scheduler.start()
+        deadline = time.monotonic() + STARTUP_TIMEOUT
+        while time.monotonic() < deadline:
+            self.pump(0.05)
+            if all(state.telemetry_subscriptions[board] for board in (1, 2)) \
+                    and all(state.axis_state.feedback_time[axis] for axis in range(1, state.AXIS_COUNT + 1)):
+                return True
+        return False
+
+    def stop(self):
+        runtime.subscribe_telemetry(0)
+        self.scheduler.stop()
+
+    # ---------------------------------------------------------------- hooks
+    def on_frame(self, board, frame):
+        """Transport loop thread: first frame showing a watched axis moving off its start."""
+        if not self.watching:
+            return
+        decoded = frame_positions(frame)
+        if decoded is None:
+            return
+        positions, arrival = decoded
+        for servo in range(1, state.AXES_PER_BOARD + 1):
+            sample = self.watching.get((board, servo))
+            if sample is not None and 'wire' in sample and positions[servo - 1] != sample['start']:
+                stamp(sample, 'applied', arrival)
+
+    def on_display_update(self, key, value, when):
+        """GUI thread: Position display changes for watched axes."""
+        axis = self.displays.get(key)
+        sample = self.watching.get(axis) if axis is not None else None
+        if sample is None or 'wire' not in sample:
+            return
+        if value != sample['start']:
+            stamp(sample, 'displayed', when)
+        if value == sample['target']:
+            stamp(sample, 'settled', when)
+
+    # ---------------------------------------------------------------- GUI thread
+    def pump(self, duration):
+        """Run the main loop's IO_UPDATE_EVENT handling for duration seconds."""
+        end = time.monotonic() + duration
+        while True:
+            remaining = end - time.monotonic()
+            if remaining <= 0:
+                return
+            event, _ = self.window.read(timeout=min(remaining, 0.01) * 1000)
+            if event == render.IO_UPDATE_EVENT:
+                self.renderer.apply(self.scheduler.updates.take())
+                self.renderer.frame()
+
+    def wait_for(self, samples, timeout):
+        """Pump until every sample has settled or the timeout expires."""
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if all('settled' in sample for sample in samples):
+                return True
+            self.pump(0.005)
+        return False
+
+    def prepare(self, board, servo, target):
+        """Set the axis setpoints (as the keypad does) and register a sample for its OK press."""
+        axis = state.board_axis(board, servo)
+        state.axis_state.set_setpoints(axis, self.velocity, self.acceleration, target)
+        start = int(state.axis_state.position[axis])
+        sample = {'board': board, 'servo': servo, 'start': start, 'target': target}
+        cmd = f"BOARD:{board};CMD:S{servo}_Parameters:{self.velocity},{self.acceleration},{target}\n"
+        self.transport.expect(board, cmd, sample)
+        self.watching[(board, servo)] = sample
+        return sample
+
+    def press(self, board, servo, sample):
+        """Press B{board}_S{servo}B3 through the main loop's event handler."""
+        event = state.board_prefixes[board] + f'S{servo}B3'
+        events.last_event_time.pop(event, None)    # Measure the command path, not the debounce
+        stamp(sample, 'press')
+        events.handle_event(event, {}, self.window)
+        stamp(sample, 'queued')
+
+    def target_for(self, board, servo):
+        """Alternate each axis between the ends of its position range."""
+        low, high = config.POSITION_LIMITS.get(servo, (0, 180))
+        position = int(state.axis_state.position[state.board_axis(board, servo)])
+        return low if abs(position - high) < abs(position - low) else high
+
+    # ---------------------------------------------------------------- runs
+    def run_single(self, count, board, servo, interval):
+        """Isolated presses of one OK button, each waited on until it settles."""
+        samples = []
+        for _ in range(count):
+            sample = self.prepare(board, servo, self.target_for(board, servo))
+            self.press(board, servo, sample)
+            self.wait_for([sample], SAMPLE_TIMEOUT)
+            del self.watching[(board, servo)]
+            samples.append(sample)
+            self.pump(interval)
+        return samples
+
+    def run_bursts(self, bursts, interval):
+        """All 8 OK buttons pressed back to back, repeated bursts times."""
+        axes = [(board, servo) for board in (1, 2) for servo in range(1, state.AXES_PER_BOARD + 1)]
+        results = []
+        for _ in range(bursts):
+            samples = [self.prepare(board, servo, self.target_for(board, servo)) for board, servo in axes]
+            for (board, servo), sample in zip(axes, samples):
+                self.press(board, servo, sample)
+            settled = self.wait_for(samples, SAMPLE_TIMEOUT)
+            self.watching.clear()
+            results.append((samples, settled))
+            self.pump(interval)
+        return results
+
+    def run_estops(self, count, interval):
+        """
+        E-STOP pressed right after an 8-command burst, count times.
+
+        Returns:
+            tuple: (press -> confirmation latencies in ms for every board, unconfirmed boards)
+        """
+        axes = [(board, servo) for board in (1, 2) for servo in range(1, state.AXES_PER_BOARD + 1)]
+        latencies = []
+        unconfirmed = 0
+        for _ in range(count):
+            for board, servo in axes:
+                self.press(board, servo, self.prepare(board, servo, self.target_for(board, servo)))
+            self.watching.clear()
+            events.handle_event('B1_ESTOP', {}, self.window)
+            deadline = time.monotonic() + SAMPLE_TIMEOUT
+            while runtime.estop.snapshot()['pending'] and time.monotonic() < deadline:
+                self.pump(0.001)
+            for ms in runtime.estop.snapshot()['last_ms'].values():
+                if ms is None:
+                    unconfirmed += 1
+                else:
+                    latencies.append(ms)
+            events.handle_event('B1_ESTOP_RESET', {}, self.window)
+            deadline = time.monotonic() + SAMPLE_TIMEOUT
+            while any(state.estop_active.values()) and time.monotonic() < deadline:
+                self.pump(0.005)
+            self.pump(interval)
+        return latencies, unconfirmed
+
+# ============================================================================
+#                         RESULTS
+# ============================================================================
+
+def stage_latencies(samples, first, last):
+    """Milliseconds between two stamps for every sample that reached both."""
+    return [(s[last] - s[first]) * 1000.0 for s in samples if first in s and last in s]
+
+def burst_summary(results):
+    """Throughput and completion figures for the burst runs."""
+    queued_rate, wire_rate, completion = [], [], []
+    lost = 0
+    for samples, settled in results:
+        first_press = min(s['press'] for s in samples)
+        queued = max(s['queued'] for s in samples)
+        queued_rate.append(len(samples) / max(queued - first_press, 1e-9))
+        sent = [s['wire'] for s in samples if 'wire' in s]
+        if sent:
+            wire_rate.append(len(sent) / max(max(sent) - first_press, 1e-9))
+        if settled:
+            completion.append((max(s['settled'] for s in samples) - first_press) * 1000.0)
+        lost += sum(1 for s in samples if 'settled' not in s)
+    return {
+        'bursts': len(results),
+        'burst_size': len(results[0][0]) if results else 0,
+        'queued_commands_per_s': round(percentile(queued_rate, 50), 1) if queued_rate else None,
+        'wire_commands_per_s': round(percentile(wire_rate, 50), 1) if wire_rate else None,
+        'completion_ms': summarize(completion),
+        'lost': lost,
+    }
+
+def git_revision():
+    """Short commit hash of the working tree, or 'unknown'."""
+    try:
+        out = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                             cwd=os.path.dirname(os.path.abspath(__file__)), timeout=5)
+        return out.stdout.strip() or 'unknown'
+    except (OSError, subprocess.SubprocessError):
+        return 'unknown'
+
+def build_results(args, single, bursts, estops, benchmark):
+    stages = {name: summarize(stage_latencies(single, first, last)) for name, first, last in SINGLE_STAGES}
+    return {
+        'version': RESULTS_VERSION,
+        'label': args.label or git_revision(),
+        'date': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'platform': {'system': platform.system(), 'machine': platform.machine(),
+                     'python': platform.python_version()},
+        'config': {
+            'samples': args.samples, 'board': args.board, 'servo': args.servo, 'bursts': args.bursts,
+            'estops': args.estops,
+            'telemetry_mode': config.TELEMETRY_MODE, 'telemetry_format': config.TELEMETRY_FORMAT,
+            'telemetry_rate_hz': config.TELEMETRY_RATE_HZ, 'telemetry_adaptive': config.TELEMETRY_ADAPTIVE,
+            'render_fps': config.RENDER_FPS,
+            'io_parse_interval': config.IO_PARSE_INTERVAL, 'tick_hz': None if args.external else args.tick_hz,
+            'velocity': benchmark.velocity, 'acceleration': benchmark.acceleration,
+        },
+        'single': {'stages_ms': stages, 'lost': sum(1 for s in single if 'settled' not in s)},
+        'burst': burst_summary(bursts),
+        'estop': {'latency_ms': summarize(estops[0]), 'unconfirmed': estops[1]},
+        'renderer': {'refreshes': benchmark.window.refreshes, 'skipped_updates': benchmark.renderer.skipped},
+    }
+
+def compare_results(current, baseline, tolerance):
+    """
+    List regressions of current against baseline results.
+
+    Args:
+        current (dict): Results from this run
+        baseline (dict): Results loaded from an earlier --output file
+        tolerance (float): Allowed relative change (0.2 = 20 %)
+
+    Returns:
+        list: Human-readable regression descriptions (empty = no regression)
+    """
+    regressions = []
+    for name, stats in current['single']['stages_ms'].items():
+        old = baseline.get('single', {}).get('stages_ms', {}).get(name, {})
+        for key in COMPARED_PERCENTILES:
+            if stats.get(key) is not None and old.get(key):
+                if stats[key] > old[key] * (1.0 + tolerance):
+                    regressions.append(f"{name} {key}: {old[key]:.3f} -> {stats[key]:.3f} ms")
+    for key in ('queued_commands_per_s', 'wire_commands_per_s'):
+        new, old = current['burst'].get(key), baseline.get('burst', {}).get(key)
+        if new is not None and old and new < old * (1.0 - tolerance):
+            regressions.append(f"burst {key}: {old:.1f} -> {new:.1f}")
+    stats = current.get('estop', {}).get('latency_ms', {})
+    old = baseline.get('estop', {}).get('latency_ms', {})
+    for key in COMPARED_PERCENTILES:
+        if stats.get(key) is not None and old.get(key):
+            if stats[key] > old[key] * (1.0 + tolerance):
+                regressions.append(f"estop {key}: {old[key]:.3f} -> {stats[key]:.3f} ms")
+    return regressions
+
+def print_report(results):
+    print("=" * 66)
+    print(f"End-to-end latency - {results['label']} ({results['date']})")
+    print("=" * 66)
+    print(f"{'stage':<18}{'count':>7}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    for name, stats in results['single']['stages_ms'].items():
+        if stats['count']:
+            print(f"{name:<18}{stats['count']:>7}{stats['p50']:>10.3f}{stats['p95']:>10.3f}"
+                  f"{stats['p99']:>10.3f}{stats['max']:>10.3f}")
+        else:
+            print(f"{name:<18}{0:>7}")
+    print(f"Lost presses: {results['single']['lost']}")
+    burst = results['burst']
+    if burst['bursts']:
+        completion = burst['completion_ms']
+        print(f"Bursts: {burst['bursts']} x {burst['burst_size']} commands - "
+              f"queued {burst['queued_commands_per_s']} cmd/s, wire {burst['wire_commands_per_s']} cmd/s, "
+              f"all settled p50 {completion.get('p50')} ms p99 {completion.get('p99')} ms, lost {burst['lost']}")
+    estop = results['estop']
+    if estop['latency_ms']['count']:
+        latency = estop['latency_ms']
+        print(f"E-stop: press -> confirmed p50 {latency['p50']} ms p99 {latency['p99']} ms "
+              f"max {latency['max']} ms ({latency['count']} board stops), unconfirmed {estop['unconfirmed']}")
+    print(f"Renderer: {results['renderer']['refreshes']} refreshes, "
+          f"{results['renderer']['skipped_updates']} unchanged updates skipped")
+
+# ============================================================================
+#                         REPLAY THROUGHPUT
+# ============================================================================
+
+def run_replay(args):
+    """
+    Push a recorded session through message handling and rendering as fast
+    as possible, on this thread only - deterministic and hardware-free.
+
+    Every frame goes through handle_board_message() into a GuiUpdateBatch;
+    every --render-every frames the batch is applied by a GuiRenderer with
+    an uncapped frame rate, as the GUI thread would per display frame.
+    """
+    source = replay.ReplaySource(args.replay, 0)
+    records = list(source.events())                 # Build frames up front - time handling only
+    duration = source.duration()
+    render_every = args.render_every or max(1, round(len(records) / max(duration, 1e-9) / config.RENDER_FPS))
+    window = HeadlessWindow()
+    renderer = render.GuiRenderer(window, fps=1e9)
+    batch = render.GuiUpdateBatch()
+    parse_us, render_ms = [], []
+    clock = time.perf_counter
+    started = clock()
+    for count, (board, frame) in enumerate(records, 1):
+        t = clock()
+        handlers.handle_board_message(board, frame, batch)
+        parse_us.append((clock() - t) * 1e6)
+        if count % render_every == 0 or count == len(records):
+            t = clock()
+            renderer.apply(batch.take())
+            renderer.frame()
+            render_ms.append((clock() - t) * 1000.0)
+    elapsed = clock() - started
+    return {
+        'version': RESULTS_VERSION,
+        'label': args.label or git_revision(),
+        'date': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'platform': {'system': platform.system(), 'machine': platform.machine(),
+                     'python': platform.python_version()},
+        'replay': {
+            'session': args.replay,
+            'frames': len(records),
+            'session_seconds': round(duration, 3),
+            'render_every': render_every,
+            'frames_per_s': round(len(records) / max(elapsed, 1e-9), 1),
+            'speedup': round(duration / max(elapsed, 1e-9), 1),
+            'parse_us': summarize(parse_us),
+            'render_ms': summarize(render_ms),
+            'refreshes': window.refreshes,
+            'skipped_updates': renderer.skipped,
+        },
+    }
+
+def compare_replay(current, baseline, tolerance):
+    """Regressions of a replay run: tail parse/render times up, throughput down."""
+    regressions = []
+    new, old = current['replay'], baseline.get('replay', {})
+    for stage in ('parse_us', 'render_ms'):
+        for key in COMPARED_PERCENTILES:
+            if new[stage].get(key) is not None and old.get(stage, {}).get(key):
+                if new[stage][key] > old[stage][key] * (1.0 + tolerance):
+                    regressions.append(f"{stage} {key}: {old[stage][key]:.3f} -> {new[stage][key]:.3f}")
+    if old.get('frames_per_s') and new['frames_per_s'] < old['frames_per_s'] * (1.0 - tolerance):
+        regressions.append(f"frames_per_s: {old['frames_per_s']:.1f} -> {new['frames_per_s']:.1f}")
+    return regressions
+
+def print_replay_report(results):
+    result = results['replay']
+    print("=" * 66)
+    print(f"Replay throughput - {results['label']} ({results['date']})")
+    print("=" * 66)
+    print(f"Session {result['session']}: {result['frames']} frames, {result['session_seconds']} s recorded")
+    print(f"Throughput: {result['frames_per_s']} frames/s ({result['speedup']}x real time), "
+          f"render every {result['render_every']} frames")
+    print(f"{'stage':<18}{'count':>7}{'p50':>10}{'p95':>10}{'p99':>10}{'max':>10}")
+    for name in ('parse_us', 'render_ms'):
+        stats = result[name]
+        if stats['count']:
+            print(f"{name:<18}{stats['count']:>7}{stats['p50']:>10.3f}{stats['p95']:>10.3f}"
+                  f"{stats['p99']:>10.3f}{stats['max']:>10.3f}")
+    print(f"Renderer: {result['refreshes']} refreshes, {result['skipped_updates']} unchanged updates skipped")
+
+# ============================================================================
+#                         MAIN
+# ============================================================================
+
+def main():
+    parser = argparse.ArgumentParser(description="Button-to-motion latency benchmark against the ClearCore simulator")
+    parser.add_argument('--samples', type=int, default=200, help="single OK presses to time (default 200)")
+    parser.add_argument('--board', type=int, default=1, choices=(1, 2), help="board for single presses")
+    parser.add_argument('--servo', type=int, default=1, choices=(1, 2, 3, 4), help="servo for single presses")
+    parser.add_argument('--bursts', type=int, default=20, help="8-command bursts to time (default 20)")
+    parser.add_argument('--estops', type=int, default=10, help="E-stops to time after a burst (default 10)")
+    parser.add_argument('--interval', type=float, default=0.05, help="idle seconds between presses/bursts")
+    parser.add_argument('--velocity', type=int, default=DEFAULT_VELOCITY, help="move velocity setpoint")
+    parser.add_argument('--acceleration', type=int, default=DEFAULT_ACCELERATION, help="move acceleration setpoint")
+    parser.add_argument('--rate', type=int, default=config.TELEMETRY_RATE_HZ, help="telemetry push rate (Hz)")
+    parser.add_argument('--adaptive', action='store_true',
+                        help="let the adaptive rate controller choose the telemetry rate instead of --rate")
+    parser.add_argument('--format', choices=('binary', 'text'), default=config.TELEMETRY_FORMAT,
+                        help="telemetry frame format")
+    parser.add_argument('--tick-hz', type=float, default=1000.0, help="simulator loop rate (Hz)")
+    parser.add_argument('--external', action='store_true', help="use an already running simulator/controllers")
+    parser.add_argument('--label', help="revision label stored in the results (default: git commit)")
+    parser.add_argument('--output', help="write JSON results to this file")
+    parser.add_argument('--baseline', help="JSON results of an earlier run to compare against")
+    parser.add_argument('--tolerance', type=float, default=0.2, help="allowed relative regression (default 0.2)")
+    parser.add_argument('--verbose', action='store_true', help="keep the host's debug output")
+    parser.add_argument('--replay', metavar='SESSION',
+                        help="replay throughput benchmark of a recorded session (no simulator)")
+    parser.add_argument('--render-every', type=int, default=0,
+                        help="frames per render pass in --replay (default: recorded rate / RENDER_FPS)")
+    args = parser.parse_args()
+
+    if args.replay:
+        output = contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(open(os.devnull, 'w'))
+        with output:
+            results = run_replay(args)
+        print_replay_report(results)
+        return write_and_compare(args, results, compare_replay)
+
+    config.TELEMETRY_RATE_HZ = args.rate                  # Read by the I/O scheduler keepalive
+    config.TELEMETRY_ADAPTIVE = args.adaptive             # Off: a pinned rate keeps runs comparable
+    config.TELEMETRY_FORMAT = args.format
+    simulator = None
+    if not args.external:
+        simulator = ClearCore_Simulator.ClearCoreSimulator(
+            2, '127.0.0.1', ('127.0.0.1', config.LOCAL_PORT1), args.tick_hz)
+        simulator.start()
+    runtime.start_transport()
+
+    benchmark = LatencyBenchmark(args.velocity, args.acceleration)
+    output = contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(open(os.devnull, 'w'))
+    try:
+        with output:
+            ready = benchmark.start()
+            if ready:
+                single = benchmark.run_single(args.samples, args.board, args.servo, args.interval)
+                bursts = benchmark.run_bursts(args.bursts, args.interval)
+                estops = benchmark.run_estops(args.estops, args.interval)
+            benchmark.stop()
+    finally:
+        runtime.stop_transport()
+        if simulator is not None:
+            simulator.stop()
+    if not ready:
+        print("Error: no telemetry subscription from both boards - is the simulator running?")
+        return 2
+
+    results = build_results(args, single, bursts, estops, benchmark)
+    print_report(results)
+    return write_and_compare(args, results, compare_results)
+
+def write_and_compare(args, results, compare):
+    """Write --output, check against --baseline; returns the exit status."""
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"Results written to {args.output}")
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance)
+        print(f"Compared with {baseline.get('label', args.baseline)} (tolerance {args.tolerance:.0%}):")
+        for regression in regressions:
+            print(f"  REGRESSION {regression}")
+        if regressions:
+            return 1
+        print("  no regressions")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,9 @@
+"""
+servo_control - host software for the 8-axis ClearCore servo system.
+
+The GUI is started with Servo_Control_8_Axis.py (servo_control.app.main()).
+Importing the package or its non-GUI modules (config, protocol, transport,
+state, render, runtime, handlers, scheduler, events, daemon, recorder,
+replay, plot, planner, recipes, uploads, telemetry_rate) opens no sockets, starts no threads
+and does not load FreeSimpleGUI.
+"""
@@ -0,0 +1,209 @@
+"""
+Servo Control application entry point: loading screen, connectivity check,
+main window and the GUI event loop.
+
+Everything that touches the controllers or the display starts inside main(),
+so importing this module has no side effects beyond loading FreeSimpleGUI.
+With --replay SESSION the GUI shows a recorded session instead of the
+controllers (servo_control.replay).
+"""
+
+import argparse                            # --replay / --speed / --start options
+import queue                               # init_error_queue.get_nowait()
+import subprocess                          # Raspberry Pi shutdown command
+import time                                # Status popup delay
+
+import FreeSimpleGUI as sg                 # Free GUI library for cross-platform interface
+
+from . import config, runtime
+from .config import GLOBAL_FONT, IS_RASPBERRY_PI, WINDOW_READ_TIMEOUT
+from .events import ESTOP_EVENTS, handle_event
+from .gui import (build_layout, create_loading_window, show_communication_status_popup,
+                  show_network_error_dialog, shutdown_system)
+from .plot import AxisHistory, LivePlot
+from .render import IO_UPDATE_EVENT, GuiRenderer
+from .replay import ReplaySource
+from .runtime import check_network_connectivity, subscribe_telemetry
+from .scheduler import IOScheduler, StartupSync
+from .state import axis_state
+
+# ============================================================================
+#                         MAIN APPLICATION
+# ============================================================================
+
+def parse_arguments(argv=None):
+    parser = argparse.ArgumentParser(description="Servo Control 8-Axis GUI")
+    parser.add_argument('--replay', metavar='SESSION',
+                        help="replay a recorded session directory instead of connecting to the controllers")
+    parser.add_argument('--speed', type=float, default=1.0,
+                        help="replay speed factor (default 1.0, 0 = as fast as possible)")
+    parser.add_argument('--start', type=float, default=0.0, help="replay start offset (seconds)")
+    return parser.parse_args(argv)
+
+def connect_controllers():
+    """
+    Loading screen and connectivity check with Retry / Continue / Exit.
+    
+    Returns:
+        tuple: (start GUI?, network error message or None)
+    """
+    # Show initial loading screen
+    loading_window = create_loading_window()
+
+    # ENHANCED: Network connectivity check with "Continue Anyway" option
+    # This replaces the old binary retry/exit loop with three-way handling:
+    # 1. Success -> start normally
+    # 2. Retry -> try again  
+    # 3. Continue -> start in debug mode with persistent error display
+    network_error_message = None  # Store error for later display in GUI
+    while True:
+        network_ok, message = check_network_connectivity()
+        loading_window.close()
+
+        if network_ok:
+            break
+        else:
+            # NEW: Show enhanced error dialog with three options
+            user_choice = show_network_error_dialog(message)
+
+            if user_choice == 'exit':
+                # User chose to exit - clean shutdown
+                runtime.stop_transport()
+                return False, None
+            elif user_choice == 'continue':
+                # NEW: User chose to continue anyway - enable debug mode
+                # Save error message to display persistent warning in main GUI
+                network_error_message = message
+                print(f"Debug: Continuing with network error: {message}")
+                break  # Exit loop and start GUI with error display
+            elif user_choice == 'retry':
+                # User chose retry - create fresh loading screen to avoid element reuse error
+                loading_window = create_loading_window()  # Probe itself bounds the wait (PROBE_DEADLINE)
+    return True, network_error_message
+
+def main(argv=None):
+    """
+    Run the Servo Control GUI until the window is closed or the system shuts down.
+    
+    Args:
+        argv (list): Command line arguments (default sys.argv[1:])
+    
+    Returns:
+        int: Process exit status (1 if the user exits at the network error dialog)
+    """
+    args = parse_arguments(argv)
+    replay = None
+    network_error_message = None
+    if args.replay:
+        # Recorded frames take the transport's place; nothing is sent to the controllers
+        replay = ReplaySource(args.replay, args.speed)
+        replay.subscribe(runtime.message_queue.put)
+        replay.seek(args.start)
+        print(f"Debug: Replaying {args.replay} ({replay.duration():.1f} s) at speed {args.speed}")
+    else:
+        runtime.start_transport()                          # Open the controller endpoints
+        if config.RECORD_DIR:
+            runtime.start_recorder(config.RECORD_DIR)      # SERVO_RECORD_DIR set - record the session
+        connected, network_error_message = connect_controllers()
+        if not connected:
+            return 1
+
+    # Layout is built after the connectivity check so the warning bar can show
+    window = sg.Window("Servo Control" if replay is None else f"Servo Control - Replay {args.replay}",
+                build_layout(network_error_message), default_element_size=(8, 5),
+                size=(800, 450) if IS_RASPBERRY_PI else (800, 400),
+                location=(0, 0) if IS_RASPBERRY_PI else (None, None),
+                auto_size_text=False,
+                auto_size_buttons=False,
+                font=GLOBAL_FONT,
+                finalize=True)
+
+    # NEW: Show communication status popup if running in debug mode
+    # This provides clear feedback after GUI loads about system status
+    if network_error_message:
+        # Brief delay to ensure main window is fully displayed
+        window.refresh()
+        time.sleep(0.5)
+        show_communication_status_popup(network_error_message)
+
+    # Network connectivity confirmed - loading screen already closed above
+
+    # Position history for the Plot tab, fed by every feedback frame on the I/O thread
+    axis_history = AxisHistory()
+    axis_state.subscribe(axis_history.on_axis_change)
+    live_plot = LivePlot(window['PLOT_GRAPH'], axis_history)
+
+    # Polling, keepalives, command transmission and parsing run on their own
+    # thread from here on - the GUI loop only handles events and applies updates.
+    # State sync covers the boards that answered the probe (all of them if none did)
+    if replay is None:
+        sync_boards = [board for board, rtt in runtime.controller_rtts.items() if rtt is not None] or list(runtime.transport_engine.controllers)
+        io_scheduler = IOScheduler(window, runtime.message_queue, runtime.transport_engine, StartupSync(sync_boards))
+    else:
+        io_scheduler = IOScheduler(window, runtime.message_queue, replay)  # Commands and keepalives are dropped
+    runtime.io_scheduler = io_scheduler
+    io_scheduler.start()
+    gui_renderer = GuiRenderer(window)                     # Dirty-checked, RENDER_FPS-capped display updates
+    runtime.gui_renderer = gui_renderer                    # Used by handle_event()
+    if replay is not None:
+        replay.start()
+
+    while True:
+        event, values = window.read(timeout=WINDOW_READ_TIMEOUT)
+        if event in ESTOP_EVENTS:
+            handle_event(event, values, window)            # E-stop first - nothing below may delay it
+            continue
+        try:
+            error_msg = runtime.init_error_queue.get_nowait()
+            sg.popup_error(error_msg, location=(50, 50), font=GLOBAL_FONT)
+        except queue.Empty:
+            pass
+
+        if event == sg.WIN_CLOSED or event == "Exit":
+            print("Debug 40 - Window closed or Exit event triggered")
+            break
+
+        # Scroll the position plot (draws only while its tab is shown, RENDER_FPS-capped)
+        live_plot.frame(window['TABGROUP'].get() == 'TAB_PLOT')
+
+        if event == IO_UPDATE_EVENT:
+            gui_renderer.apply(io_scheduler.updates.take())  # Parsed state changes from the I/O scheduler
+            gui_renderer.frame()
+            continue
+
+        if event.startswith('PLOT_AXIS_'):
+            live_plot.set_axis_visible(int(event[len('PLOT_AXIS_'):]), values[event])
+            continue
+
+        # Handle shutdown button (Raspberry Pi only)
+        if event == 'SHUTDOWN':
+            print("Debug: Shutdown button pressed")
+            if shutdown_system():
+                print("Debug: Shutdown confirmed, closing application and powering off")
+                # Clean shutdown sequence
+                subscribe_telemetry(0)                     # Release the push subscriptions
+                io_scheduler.stop()                        # Flushes the unsubscribe commands
+                if replay is not None:
+                    replay.stop()
+                runtime.stop_transport()
+                window.close()
+
+                # Execute system shutdown
+                try:
+                    subprocess.run(['sudo', 'shutdown', 'now'], check=False)
+                except Exception as e:
+                    print(f"Shutdown command failed: {e}")
+
+                return 0
+            else:
+                print("Debug: Shutdown cancelled")
+
+        handle_event(event, values, window)
+
+    subscribe_telemetry(0)                                 # Release the push subscriptions
+    io_scheduler.stop()                                    # Flushes the unsubscribe commands
+    if replay is not None:
+        replay.stop()
+    runtime.stop_transport()
+    window.close()
+    return 0
@@ -0,0 +1,185 @@
+"""
+Configuration constants for the servo control package.
+
+Everything here is plain data - importing this module opens no sockets and
+loads no GUI toolkit. Controller addresses, ports and the probe deadline can
+be overridden from the environment (SERVO_* variables) before import.
+Tools may also change the telemetry tunables (TELEMETRY_MODE,
+TELEMETRY_RATE_HZ, TELEMETRY_ADAPTIVE, TELEMETRY_FORMAT) at runtime; the
+I/O scheduler reads them through this module on every keepalive.
+"""
+
+import os                                  # Environment overrides for controller addresses
+import platform                            # Cross-platform OS detection and adaptation
+
+# =========================
+# GLOBAL CONFIGURATION
+# =========================
+# Per-servo position limits: {servo_number: (min, max)}
+POSITION_LIMITS = {
+    1: (0, 180),
+    2: (0, 180),
+    3: (0, 180),
+    4: (0, 180),
+    5: (0, 180),
+    6: (0, 180),
+    7: (0, 180),
+    8: (0, 180),
+}
+
+# Per-servo motion limits used by the trajectory planner (servo_control.planner)
+# Units as sent to the ClearCore: steps/s, steps/s^2, steps/s^3
+VELOCITY_LIMITS = {axis: 5000 for axis in range(1, 9)}           # Firmware Calculate_Velocity() clamp
+ACCELERATION_LIMITS = {axis: 8000 for axis in range(1, 9)}       # Highest acceleration in the swing tables
+JERK_LIMITS = {axis: 80000 for axis in range(1, 9)}              # Full acceleration reached in 0.1 s (S-curve)
+
+# Global font setting for consistent cross-platform alignment
+GLOBAL_FONT = ('Courier New', 10)
+# Smaller font for "Clear Value" buttons to fit text on one line
+CLEAR_BUTTON_FONT = ('Courier New', 9)
+# Bold font for "Position X" labels - same size as global font for alignment consistency
+POSITION_LABEL_FONT = ('Courier New', 10, 'bold')
+
+# ============================================================================
+#                         PLATFORM DETECTION & CONFIGURATION
+# ============================================================================
+
+# Cross-platform compatibility flags
+IS_WINDOWS = platform.system() == "Windows"      # Windows development environment
+IS_RASPBERRY_PI = platform.system() == "Linux" and platform.machine().startswith('arm')  # Pi deployment
+
+# ============================================================================
+#                         DEBUG FLAGS
+# ============================================================================
+
+# Debug system hierarchy (multiple priority levels for development)
+DEBUG = False                                    # Master debug flag
+DEBUG00 = False                                 # Legacy debug flag
+DEBUG_LOW_PRIORITY = False                      # Low importance debug messages
+DEBUG_MEDIUM_PRIORITY = False                   # Medium importance debug messages  
+DEBUG_HIGH_PRIORITY = False                     # Critical debug messages
+
+# ============================================================================
+#                              TIMING CONSTANTS
+# ============================================================================
+
+# GUI responsiveness and update intervals
+WINDOW_READ_TIMEOUT = 100                       # GUI event loop timeout (ms)
+MEDIUM_PRIORITY_UPDATE_INTERVAL = 0.1           # Medium priority task interval (seconds)
+LOW_PRIORITY_UPDATE_INTERVAL = 0.1              # Low priority task interval (seconds)
+IO_PARSE_INTERVAL = 0.02                        # I/O scheduler message parsing interval (seconds)
+RENDER_FPS = 30                                 # Max GUI refreshes per second (display updates posted at this rate)
+
+# Live position plot (Plot tab, servo_control.plot)
+PLOT_WINDOW_SECONDS = 30                        # Visible history (seconds)
+PLOT_MAX_RATE_HZ = 500                          # Highest feedback rate kept per axis (sizes the ring buffers)
+PLOT_SIZE = (770, 290)                          # Graph canvas size (pixels)
+PLOT_BUCKET_PIXELS = 2                          # Horizontal pixels per min/max bucket
+PLOT_COLORS = ('red', 'blue', 'green', 'orange', 'purple', 'brown', 'magenta', 'darkcyan')  # Axis 1-8 trace colors
+
+# Communication and user interface timing
+BATCH_SIZE = 30                                 # Network packet batching size
+DEBOUNCE_INTERVAL = 0.05                        # Button debounce protection (seconds)
+
+# Readback-verified setpoint uploads (servo_control.uploads)
+SETPOINT_READBACK_INTERVAL = 0.1                # Seconds between REQUEST_SETPOINTS readbacks / retries
+SETPOINT_UPLOAD_DEADLINE = 1.0                  # Seconds before an unconfirmed axis is reported failed
+
+# Telemetry streaming (push mode) configuration
+# 'subscribe': each ClearCore pushes VALUES frames at TELEMETRY_RATE_HZ under a lease
+#              renewed by keepalives; boards that never confirm are still polled
+# 'poll':      legacy REQUEST_VALUES round trip at the adaptive rate (capped by
+#              POLL_RATE_LIMIT_HZ), every MEDIUM_PRIORITY_UPDATE_INTERVAL when not adaptive
+TELEMETRY_MODE = 'subscribe'                    # 'subscribe' or 'poll'
+TELEMETRY_RATE_HZ = 100                         # Push rate per board when not adaptive (firmware max 500)
+SUBSCRIPTION_KEEPALIVE_INTERVAL = 1.0           # Lease renewal interval (seconds, firmware lease 3 s)
+
+# Adaptive telemetry rate (servo_control.telemetry_rate): dense VALUES frames while axes move
+# or during selected state engine steps, a low idle rate otherwise. Applies to the push
+# subscription and to polling of boards that are not streaming; False pins TELEMETRY_RATE_HZ
+TELEMETRY_ADAPTIVE = True
+TELEMETRY_IDLE_RATE_HZ = 10                     # Nothing moving (Idle / Address, jogs finished)
+TELEMETRY_MOTION_RATE_HZ = 200                  # Any axis moving or away from its setpoint
+TELEMETRY_STEP_RATES_HZ = {                     # State engine step -> rate (Hz), unlisted steps add no demand
+    2: 200, 3: 200, 4: 200, 5: 200,             # Initial TakeAway, Take Away, Full Rotation, Top of Swing
+    6: 500, 7: 500, 8: 500, 9: 500,             # Initial Downswing, Release, Impact, Follow Through
+    10: 200,                                    # Finish
+}
+TELEMETRY_IDLE_HOLD = 1.0                       # Seconds of lower demand before the rate drops (raises are immediate)
+MOTION_VELOCITY_THRESHOLD = 1                   # |velocity| above this counts as moving (steps/s)
+MOTION_POSITION_TOLERANCE = 1                   # Manual mode |setpoint - position| above this counts as moving
+
+# Acknowledged commands (boards that answer CMD:COMMAND_ACKS): state-changing commands carry
+# ";ID:<n>", are answered ACK/NAK and re-sent with the same id until answered
+COMMAND_ACK_TIMEOUT = 0.15                      # Seconds without ACK/NAK before a retransmission
+COMMAND_MAX_RETRIES = 4                         # Retransmissions before a command is reported lost
+
+# Outgoing command priorities (servo_control.protocol.command_priority): emergency stop >
+# motion/enable > configuration > polling; polls are paced by a per-board token bucket
+POLL_RATE_LIMIT_HZ = 50                         # Polling commands per second per board (bucket refill)
+POLL_BURST = 10                                 # Polling commands a board may get back to back
+
+# Emergency stop fast path (runtime.emergency_stop): redundant datagrams to every board,
+# sent from the calling thread ahead of the command queue
+ESTOP_REPEATS = 3                               # Copies of the stop datagram per burst
+ESTOP_RETRY_INTERVAL = 0.05                     # Seconds between bursts to a board that has not confirmed
+ESTOP_DEADLINE = 1.0                            # Seconds of re-sending before a board is reported unconfirmed
+ESTOP_LATENCY_HISTORY = 100                     # Confirmed latencies kept for the mean/max report
+
+# VALUES frame format requested during startup negotiation
+# 'binary': fixed 58-byte frame decoded with VALUES_FRAME (no string splitting)
+# 'text':   legacy "BOARD:n;VALUES:v,a,p,..." format (always accepted as fallback)
+TELEMETRY_FORMAT = 'binary'
+
+# ============================================================================
+#                          NETWORK CONFIGURATION & UDP SETUP
+# ============================================================================
+
+# ClearCore Controller Network Addresses
+# Dedicated Ethernet subnet (192.168.10.x) isolated from internet traffic
+# Each value can be overridden from the environment (e.g. SERVO_CLEARCORE1_IP=127.0.0.1)
+# to run against ClearCore_Simulator.py on a development machine
+CLEARCORE1_IP = os.environ.get('SERVO_CLEARCORE1_IP', '192.168.1.151')        # Primary controller (Board 1 servos)
+CLEARCORE1_PORT = int(os.environ.get('SERVO_CLEARCORE1_PORT', 8888))          # ClearCore 1 listening port
+LOCAL_PORT1 = int(os.environ.get('SERVO_LOCAL_PORT', 8889))                   # Local port for ClearCore 1 communication
+
+CLEARCORE2_IP = os.environ.get('SERVO_CLEARCORE2_IP', '192.168.1.152')        # Secondary controller (Board 2 servos)
+CLEARCORE2_PORT = int(os.environ.get('SERVO_CLEARCORE2_PORT', 8890))          # ClearCore 2 listening port
+LOCAL_PORT2 = int(os.environ.get('SERVO_LOCAL_PORT', 8889))                   # Local port for ClearCore 2 communication
+
+# Startup reachability probe (application-level PING/PONG, all controllers at once)
+PROBE_DEADLINE = float(os.environ.get('SERVO_PROBE_DEADLINE', 1.0))          # Seconds before a controller counts as unreachable
+PROBE_RETRY_INTERVAL = 0.2                                                    # Resend PING to silent controllers (seconds)
+
+# Headless control daemon (servo_control.daemon) - local JSON-RPC API
+# Listens on TCP DAEMON_HOST:DAEMON_PORT, or on a Unix socket when DAEMON_SOCKET is set
+DAEMON_HOST = os.environ.get('SERVO_DAEMON_HOST', '127.0.0.1')                # Loopback only by default
+DAEMON_PORT = int(os.environ.get('SERVO_DAEMON_PORT', 8900))                  # Local RPC port
+DAEMON_SOCKET = os.environ.get('SERVO_DAEMON_SOCKET')                         # Unix socket path (overrides TCP)
+DAEMON_CLIENT_BUFFER = 256 * 1024                                             # Telemetry dropped above this backlog per client (bytes)
+
+# Motion recipes (servo_control.recipes): named 11-step, 8-axis tables uploaded to the boards
+RECIPE_DIR = os.environ.get('SERVO_RECIPE_DIR', 'recipes')                   # One <name>.json per recipe
+RECIPE_PACKET_BYTES = 480                                                     # Upload datagram size (firmware MAX_PACKET_LENGTH 512,
+                                                                              # room left for the ";ID:<n>" command tag)
+RECIPE_UPLOAD_DEADLINE = 2.0                                                  # Seconds a phase may wait for its ACKs / RECIPE reply
+RECIPE_UPLOAD_ATTEMPTS = 5                                                    # Whole BEGIN..COMMIT runs before a board is reported failed
+
+# ============================================================================
+#                         TELEMETRY RECORDING
+# ============================================================================
+
+# Recorder (servo_control.recorder): frames, state engine steps and commands go to
+# preallocated memory-mapped column files, one directory per session
+RECORD_DIR = os.environ.get('SERVO_RECORD_DIR')                               # Session parent directory, None = not recording
+RECORD_FLUSH_INTERVAL = 0.5                                                   # Seconds between batched writes
+RECORD_SEGMENT_SECONDS = float(os.environ.get('SERVO_RECORD_SEGMENT_SECONDS', 600))  # Rotate after this long
+RECORD_SEGMENT_ROWS = int(os.environ.get('SERVO_RECORD_SEGMENT_ROWS', 600000))       # Frames per segment (500 Hz x 2 boards x 10 min)
+RECORD_EVENT_ROWS = 65536                                                     # Step / command rows per segment
+RECORD_COMMAND_BYTES = 48                                                     # Recorded command text width (truncated)
+
+# Network Architecture Notes:
+# - ClearCore controllers use fixed IP addresses for reliable communication
+# - Separate subnet prevents conflicts with WiFi/internet (192.168.1.x)
+# - UDP protocol chosen for low-latency real-time servo control
+# - Bidirectional communication: commands out, status feedback in
@@ -0,0 +1,593 @@
+"""
+Headless control daemon: owns the controller connections and serves a local
+JSON-RPC 2.0 API, so test rigs and scripts can drive the machine without the
+touchscreen GUI.
+
+USAGE:
+    python3 -m servo_control.daemon                        # TCP 127.0.0.1:8900
+    python3 -m servo_control.daemon --tcp 127.0.0.1:9000
+    python3 -m servo_control.daemon --unix /run/servo.sock
+
+PROTOCOL:
+    One JSON document per line (UTF-8, newline terminated). A line holding an
+    array is a JSON-RPC batch and is answered with one array. Requests are
+    pipelined: clients may send any number of lines without waiting, replies
+    come back in request order with the request id. Requests without an id
+    are notifications and get no reply. Commands are queued on the I/O
+    scheduler, so a whole batch leaves for the controllers in one pass.
+
+METHODS (board 1-2, servo 1-4 on that board):
+    set_parameters(board, servo, velocity, acceleration, position)
+    set_all_parameters(board, parameters)   # [[V, A, P] x 4] in one datagram
+    set_mode(board, auto)                   set_repeat(board, enabled)
+    set_start(board, enabled)               set_enable(board, servo, enabled)
+    set_run(board, servo, running)          clear_position(board, servo)
+    clear_faults(board)                     get_state()
+    emergency_stop()                        reset_emergency_stop()
+    subscribe(boards=None)                  unsubscribe()
+    list_recipes()                          upload_recipe(name, boards=None)
+    get_recipe_status()                     clear_recipe(board)
+
+    get_state()["commands"] reports the acknowledged-command layer: commands
+    in flight, retransmissions, retry rate, ACK/NAK counts and lost commands;
+    get_state()["command_queue"] the commands waiting per priority class and
+    the polls held back by the rate limit.
+
+    get_state()["telemetry_rate"] shows the VALUES rate the adaptive
+    controller requests, why (idle, moving axis or state engine step), how
+    often it changed and the seconds spent at each rate; get_state()
+    ["telemetry"] the rate each board confirmed.
+
+    emergency_stop() sends redundant stop datagrams to every board at once,
+    ahead of any queued command, and returns the token the boards echo.
+    get_state()["estop"] shows each board's latch, the latency of the latest
+    stop per board and the mean/max latency; boards stay stopped until
+    reset_emergency_stop().
+
+    set_parameters() and set_all_parameters() accept the per-axis limits of
+    recipes (config.POSITION_LIMITS, VELOCITY_LIMITS, ACCELERATION_LIMITS)
+    and are verified by SETPOINTS readback; get_state()["setpoint_status"]
+    shows each axis as pending, verified or failed (mismatched axes are
+    re-sent until the deadline).
+
+    upload_recipe() validates the stored recipe (servo_control.recipes) and
+    returns {"<board>": checksum}; each board's upload is re-run until it
+    confirms, and get_recipe_status() shows "upload" as pending, confirmed
+    or failed next to the name and checksum the board reports.
+
+    After subscribe() the connection receives "telemetry" notifications for
+    every feedback frame of the chosen boards:
+        {"board": b, "time": t, "axes": {"<axis>": [velocity, acceleration, position]}}
+    Telemetry for a client that stops reading is dropped once its unsent
+    backlog exceeds DAEMON_CLIENT_BUFFER; command replies are never dropped.
+"""
+
+import argparse                            # Command line options
+import asyncio                             # Socket server
+import json                                # JSON-RPC encoding
+import os                                  # Stale Unix socket removal
+import signal                              # Clean stop on SIGTERM
+import socket                              # RpcClient connections
+from collections import deque              # RpcClient notification backlog
+
+from . import config, recipes, runtime
+from .config import (ACCELERATION_LIMITS, DAEMON_CLIENT_BUFFER, DAEMON_HOST, DAEMON_PORT, DAEMON_SOCKET,
+                     POSITION_LIMITS, RECORD_DIR, VELOCITY_LIMITS)
+from .scheduler import IOScheduler, StartupSync
+from .state import (AXES_PER_BOARD, axis_state, board_axis, board_cnt_states, board_gui_states,
+                    estop_active, recipe_errors, recipe_status, recipe_upload_status, setpoint_status,
+                    state_engine_steps, telemetry_formats, telemetry_subscriptions)
+
+# ============================================================================
+#                         JSON-RPC ERRORS
+# ============================================================================
+
+PARSE_ERROR = -32700                                    # Line is not valid JSON
+INVALID_REQUEST = -32600                                # Not a JSON-RPC 2.0 request object
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+INTERNAL_ERROR = -32603                                 # Unexpected exception inside a method
+RPC_READ_LIMIT = 1024 * 1024                            # Longest accepted request line (bytes)
+
+class RpcError(Exception):
+    """JSON-RPC error with its numeric code (raised by methods and by RpcClient)."""
+
+    def __init__(self, code, message):
+        Exception.__init__(self, message)
+        self.code = code
+        self.message = message
+
+def error_response(request_id, code, message):
+    return {'jsonrpc': '2.0', 'id': request_id, 'error': {'code': code, 'message': message}}
+
+# ============================================================================
+#                         CONTROLLER COMMANDS
+# ============================================================================
+
+def check_board(board):
+    if not isinstance(board, int) or isinstance(board, bool) or board not in (1, 2):
+        raise RpcError(INVALID_PARAMS, f"board must be 1 or 2, got {board!r}")
+
+def check_servo(servo):
+    if not isinstance(servo, int) or isinstance(servo, bool) or not 1 <= servo <= AXES_PER_BOARD:
+        raise RpcError(INVALID_PARAMS, f"servo must be 1-{AXES_PER_BOARD}, got {servo!r}")
+
+def check_range(name, value, min_val, max_val):
+    if not isinstance(value, int) or isinstance(value, bool) or not min_val <= value <= max_val:
+        raise RpcError(INVALID_PARAMS, f"{name} must be an integer {min_val}-{max_val}, got {value!r}")
+
+def check_setpoints(board, servo, velocity, acceleration, position):
+    """Check V/A/P against the axis' limits - the same ones recipes.validate_recipe() enforces."""
+    axis = board_axis(board, servo)
+    check_range('velocity', velocity, 1, VELOCITY_LIMITS[axis])
+    check_range('acceleration', acceleration, 1, ACCELERATION_LIMITS[axis])
+    check_range('position', position, *POSITION_LIMITS[axis])
+
+def send_board_command(board, cmd):
+    """Queue "BOARD:n;CMD:<cmd>" on the I/O scheduler."""
+    runtime.queue_command(board, f"BOARD:{board};CMD:{cmd}\n")
+
+def set_button(board, key, enabled, cmd):
+    # Keep both button mirrors in step with what was commanded (no GUI to toggle them)
+    board_gui_states[board][key] = bool(enabled)
+    board_cnt_states[board][key] = bool(enabled)
+    send_board_command(board, cmd)
+
+# ============================================================================
+#                         RPC SESSION (ONE PER CONNECTION)
+# ============================================================================
+
+class RpcSession:
+    """
+    One client connection: dispatches its requests and carries its
+    telemetry subscription. Every rpc_<name> method is callable as <name>.
+
+    Args:
+        writer: asyncio.StreamWriter of the connection
+    """
+
+    def __init__(self, writer):
+        self.writer = writer
+        self.boards = ()                                # Boards whose telemetry is streamed
+        self.dropped = 0                                # Telemetry lines dropped (slow reader)
+
+    def notify(self, board, line):
+        """Queue a telemetry line unless the client is falling behind (event loop thread)."""
+        if board not in self.boards or self.writer.is_closing():
+            return
+        if self.writer.transport.get_write_buffer_size() > DAEMON_CLIENT_BUFFER:
+            self.dropped += 1
+            return
+        self.writer.write(line)
+
+    def handle(self, request):
+        """
+        Execute one request object.
+
+        Returns:
+            dict or None: Response, or None for a notification
+        """
+        if not isinstance(request, dict) or request.get('jsonrpc') != '2.0' \
+                or not isinstance(request.get('method'), str):
+            return error_response(None, INVALID_REQUEST, "Invalid Request")
+        request_id = request.get('id')
+        params = request.get('params', {})
+        try:
+            method = getattr(self, 'rpc_' + request['method'], None)
+            if method is None:
+                raise RpcError(METHOD_NOT_FOUND, f"Method not found: {request['method']}")
+            if isinstance(params, list):
+                result = method(*params)
+            elif isinstance(params, dict):
+                result = method(**params)
+            else:
+                raise RpcError(INVALID_PARAMS, "params must be an array or an object")
+        except RpcError as e:
+            response = error_response(request_id, e.code, e.message)
+        except TypeError as e:                          # Missing or unexpected arguments
+            response = error_response(request_id, INVALID_PARAMS, str(e))
+        except Exception as e:                          # Reply instead of dropping the connection
+            print(f"Debug: RPC {request['method']} failed: {e!r}")
+            response = error_response(request_id, INTERNAL_ERROR, f"Internal error: {e}")
+        else:
+            response = {'jsonrpc': '2.0', 'id': request_id, 'result': result}
+        return response if 'id' in request else None
+
+    def handle_line(self, line):
+        """
+        Execute one received line (single request or batch).
+
+        Returns:
+            bytes or None: Encoded reply line, None when nothing is to be sent
+        """
+        try:
+            request = json.loads(line)
+        except ValueError:
+            reply = error_response(None, PARSE_ERROR, "Parse error")
+        else:
+            if isinstance(request, list):
+                if not request:
+                    reply = error_response(None, INVALID_REQUEST, "Invalid Request")
+                else:
+                    reply = [response for response in map(self.handle, request) if response is not None]
+                    reply = reply or None               # Batch of notifications only
+            else:
+                reply = self.handle(request)
+        if reply is None:
+            return None
+        return (json.dumps(reply, separators=(',', ':')) + '\n').encode()
+
+    # ---- Setpoints and buttons ----------------------------------------------
+
+    def rpc_set_parameters(self, board, servo, velocity, acceleration, position):
+        check_board(board)
+        check_servo(servo)
+        check_setpoints(board, servo, velocity, acceleration, position)
+        axis_state.set_setpoints(board_axis(board, servo), velocity, acceleration, position)
+        runtime.upload_setpoints([board_axis(board, servo)])
+        return True
+
+    def rpc_set_all_parameters(self, board, parameters):
+        check_board(board)
+        if not isinstance(parameters, list) or len(parameters) != AXES_PER_BOARD \
+                or not all(isinstance(values, list) and len(values) == 3 for values in parameters):
+            raise RpcError(INVALID_PARAMS, f"parameters must be {AXES_PER_BOARD} [velocity, acceleration, position] lists")
+        for servo, (velocity, acceleration, position) in enumerate(parameters, 1):
+            check_setpoints(board, servo, velocity, acceleration, position)
+        for servo, (velocity, acceleration, position) in enumerate(parameters, 1):
+            axis_state.set_setpoints(board_axis(board, servo), velocity, acceleration, position)
+        runtime.send_all_parameters((board,))
+        return True
+
+    def rpc_set_mode(self, board, auto):
+        check_board(board)
+        set_button(board, 'Mode', auto, "Mode AUTO" if auto else "Mode MANUAL")
+        return True
+
+    def rpc_set_repeat(self, board, enabled):
+        check_board(board)
+        set_button(board, 'Repeat', enabled, "Repeat ENABLE" if enabled else "Repeat DISABLE")
+        return True
+
+    def rpc_set_start(self, board, enabled):
+        check_board(board)
+        set_button(board, 'Start', enabled, "Start ENABLE" if enabled else "Start DISABLE")
+        return True
+
+    def rpc_set_enable(self, board, servo, enabled):
+        check_board(board)
+        check_servo(servo)
+        set_button(board, f'S{servo}B1', enabled, f"S{servo}B1 ENABLE" if enabled else f"S{servo}B1 DISABLE")
+        return True
+
+    def rpc_set_run(self, board, servo, running):
+        check_board(board)
+        check_servo(servo)
+        set_button(board, f'S{servo}B2', running, f"S{servo}B2 Start" if running else f"S{servo}B2 STOP")
+        return True
+
+    def rpc_clear_position(self, board, servo):
+        check_board(board)
+        check_servo(servo)
+        send_board_command(board, f"S{servo}_ClearPosition")
+        return True
+
+    def rpc_clear_faults(self, board):
+        check_board(board)
+        send_board_command(board, "CLEAR_ALL_FAULTS")
+        return True
+
+    def rpc_emergency_stop(self):
+        return runtime.emergency_stop()
+
+    def rpc_reset_emergency_stop(self):
+        runtime.reset_emergency_stop()
+        return True
+
+    # ---- State and telemetry ------------------------------------------------
+
+    def rpc_get_state(self):
+        snap = axis_state.snapshot()
+        axes = {str(axis): {field: snap[field][axis] for field in axis_state.FIELDS}
+                for axis in range(1, axis_state.axis_count + 1)}
+        return {
+            'version': snap['version'],
+            'axes': axes,
+            'buttons': {str(board): dict(states) for board, states in board_gui_states.items()},
+            'state_engine': {str(board): step for board, step in state_engine_steps.items()},
+            'telemetry': {str(board): {'rate_hz': telemetry_subscriptions[board],
+                                       'format': telemetry_formats[board]} for board in (1, 2)},
+            'link': {str(board): stats.snapshot() for board, stats in runtime.link_statistics.items()},
+            'setpoint_status': {str(axis): status for axis, status in setpoint_status.items()},
+            'setpoint_uploads': runtime.setpoint_upload.statistics(),
+            'recipe_uploads': runtime.recipe_upload.statistics(),
+            'commands': runtime.command_tracker.snapshot(),
+            'command_queue': runtime.io_scheduler.commands.statistics() if runtime.io_scheduler else None,
+            'telemetry_rate': dict(runtime.telemetry_rate.statistics(), adaptive=config.TELEMETRY_ADAPTIVE),
+            'estop': dict(runtime.estop.snapshot(),
+                          active={str(board): latched for board, latched in estop_active.items()}),
+        }
+
+    def rpc_subscribe(self, boards=None):
+        boards = (1, 2) if boards is None else tuple(boards)
+        for board in boards:
+            check_board(board)
+        self.boards = boards
+        return list(boards)
+
+    def rpc_unsubscribe(self):
+        self.boards = ()
+        return True
+
+    # ---- Motion recipes -----------------------------------------------------
+
+    def rpc_list_recipes(self):
+        return recipes.list_recipes()
+
+    def rpc_upload_recipe(self, name, boards=None):
+        boards = (1, 2) if boards is None else tuple(boards)
+        for board in boards:
+            check_board(board)
+        if not isinstance(name, str) or not recipes.RECIPE_NAME_PATTERN.fullmatch(name):
+            raise RpcError(INVALID_PARAMS, f"name must be 1-23 letters, digits, '-' or '_', got {name!r}")
+        try:
+            recipe = recipes.load_recipe(name)
+            checksums = recipes.upload_recipe(recipe, boards)
+        except (OSError, ValueError) as e:
+            raise RpcError(INVALID_PARAMS, str(e))
+        return {str(board): checksum for board, checksum in checksums.items()}
+
+    def rpc_get_recipe_status(self):
+        return {str(board): {'name': recipe_status[board][0] if recipe_status[board] else None,
+                             'checksum': recipe_status[board][1] if recipe_status[board] else None,
+                             'error': recipe_errors[board],
+                             'upload': recipe_upload_status[board]} for board in (1, 2)}
+
+    def rpc_clear_recipe(self, board):
+        check_board(board)
+        send_board_command(board, "RECIPE_CLEAR")
+        return True
+
+# ============================================================================
+#                         CONTROL DAEMON
+# ============================================================================
+
+class DiscardDisplay:
+    """Window stand-in for the I/O scheduler: display updates are discarded (no GUI)."""
+
+    def __init__(self, updates):
+        self.updates = updates
+
+    def write_event_value(self, key, value):
+        self.updates.take()
+
+class ControlDaemon:
+    """
+    JSON-RPC server on the asyncio event loop of the calling thread.
+
+    Telemetry comes from axis_state change callbacks on the I/O scheduler
+    thread; each feedback frame is encoded once and handed to the event
+    loop for every subscribed session.
+
+    Args:
+        host (str): TCP address to listen on (ignored when path is given)
+        port (int): TCP port
+        path (str): Unix socket path, or None for TCP
+    """
+
+    def __init__(self, host=DAEMON_HOST, port=DAEMON_PORT, path=None):
+        self.host = host
+        self.port = port
+        self.path = path
+        self.sessions = set()
+        self.loop = None
+        self.stopping = None                            # asyncio.Event, set to stop serving
+        axis_state.subscribe(self.on_axis_change)
+
+    def on_axis_change(self, store, field_group, axes):
+        # Called on the I/O scheduler thread after every applied frame
+        if field_group != 'feedback' or self.loop is None or not self.sessions:
+            return
+        first, last = axes[0], axes[-1]
+        columns = [store.read(name, first, last) for name in ('velocity', 'acceleration', 'position')]
+        board = (first - 1) // AXES_PER_BOARD + 1
+        message = {'jsonrpc': '2.0', 'method': 'telemetry', 'params': {
+            'board': board,
+            'time': store.feedback_time[first],
+            'axes': {str(axis): [column[i] for column in columns] for i, axis in enumerate(axes)},
+        }}
+        line = (json.dumps(message, separators=(',', ':')) + '\n').encode()
+        self.loop.call_soon_threadsafe(self.broadcast, board, line)
+
+    def broadcast(self, board, line):
+        for session in self.sessions:
+            session.notify(board, line)
+
+    async def handle_client(self, reader, writer):
+        session = RpcSession(writer)
+        self.sessions.add(session)
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+                reply = session.handle_line(line)
+                if reply is not None:
+                    writer.write(reply)
+                if writer.transport.get_write_buffer_size() > DAEMON_CLIENT_BUFFER:
+                    await writer.drain()                # Back-pressure on replies, not per request
+        except (ConnectionError, ValueError) as e:      # ValueError: line over RPC_READ_LIMIT
+            print(f"Debug: RPC client error: {e}")
+        finally:
+            self.sessions.discard(session)
+            if session.dropped:
+                print(f"Debug: RPC client dropped {session.dropped} telemetry lines (slow reader)")
+            writer.close()
+
+    async def serve(self):
+        """Serve until stop() (or SIGINT/SIGTERM)."""
+        self.loop = asyncio.get_running_loop()
+        self.stopping = asyncio.Event()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            try:
+                self.loop.add_signal_handler(signum, self.stopping.set)
+            except (NotImplementedError, RuntimeError):  # Windows / not the main thread
+                pass
+        if self.path:
+            if os.path.exists(self.path):
+                os.unlink(self.path)                    # Left behind by an earlier run
+            server = await asyncio.start_unix_server(self.handle_client, self.path, limit=RPC_READ_LIMIT)
+            print(f"Debug: Control daemon listening on {self.path}")
+        else:
+            server = await asyncio.start_server(self.handle_client, self.host, self.port, limit=RPC_READ_LIMIT)
+            print(f"Debug: Control daemon listening on {self.host}:{self.port}")
+        async with server:
+            await self.stopping.wait()
+        self.loop = None
+        if self.path and os.path.exists(self.path):
+            os.unlink(self.path)
+
+    def stop(self):
+        """Stop serving (thread-safe)."""
+        if self.loop is not None:
+            self.loop.call_soon_threadsafe(self.stopping.set)
+
+# ============================================================================
+#                         CLIENT
+# ============================================================================
+
+class RpcClient:
+    """
+    Minimal blocking client for scripts and test rigs.
+
+    call() sends one request and waits for its reply; batch() sends many
+    requests on one line. Telemetry notifications arriving meanwhile are
+    kept and returned by next_notification().
+
+    Args:
+        address: (host, port) tuple for TCP or a Unix socket path
+        timeout (float): Socket timeout in seconds
+    """
+
+    def __init__(self, address=(DAEMON_HOST, DAEMON_PORT), timeout=5.0):
+        if isinstance(address, str):
+            self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        else:
+            self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.sock.settimeout(timeout)
+        self.sock.connect(address)
+        self.file = self.sock.makefile('rb')
+        self.next_id = 1
+        self.notifications = deque()
+
+    def close(self):
+        self.file.close()
+        self.sock.close()
+
+    def send(self, payload):
+        self.sock.sendall((json.dumps(payload, separators=(',', ':')) + '\n').encode())
+
+    def receive(self):
+        """Read lines until a reply arrives, keeping notifications."""
+        while True:
+            line = self.file.readline()
+            if not line:
+                raise ConnectionError("Control daemon closed the connection")
+            message = json.loads(line)
+            if isinstance(message, dict) and 'method' in message:
+                self.notifications.append(message['params'])
+                continue
+            return message
+
+    def request(self, method, params):
+        request = {'jsonrpc': '2.0', 'id': self.next_id, 'method': method, 'params': params}
+        self.next_id += 1
+        return request
+
+    def call(self, method, **params):
+        """Call one method and return its result (raises RpcError on error)."""
+        self.send(self.request(method, params))
+        return unwrap(self.receive())
+
+    def batch(self, calls):
+        """
+        Send several calls in one batch.
+
+        Args:
+            calls (list): (method, params dict) pairs
+
+        Returns:
+            list: Results in call order (raises RpcError on the first error)
+        """
+        requests = [self.request(method, params) for method, params in calls]
+        self.send(requests)
+        replies = {reply.get('id'): reply for reply in self.receive()}
+        return [unwrap(replies[request['id']]) for request in requests]
+
+    def next_notification(self):
+        """Return the next telemetry notification's params (blocks until one arrives)."""
+        while not self.notifications:
+            message = json.loads(self.file.readline() or b'null')
+            if message is None:
+                raise ConnectionError("Control daemon closed the connection")
+            if 'method' in message:
+                self.notifications.append(message['params'])
+        return self.notifications.popleft()
+
+def unwrap(reply):
+    if 'error' in reply:
+        raise RpcError(reply['error']['code'], reply['error']['message'])
+    return reply['result']
+
+# ============================================================================
+#                         MAIN
+# ============================================================================
+
+def main(argv=None):
+    """
+    Run the headless control daemon until SIGINT/SIGTERM.
+
+    Returns:
+        int: Process exit status
+    """
+    parser = argparse.ArgumentParser(description="Headless servo control daemon (JSON-RPC over a local socket)")
+    parser.add_argument('--tcp', metavar='HOST:PORT', help=f"TCP address (default {DAEMON_HOST}:{DAEMON_PORT})")
+    parser.add_argument('--unix', metavar='PATH', default=DAEMON_SOCKET, help="Unix socket path instead of TCP")
+    parser.add_argument('--record', metavar='DIR', default=RECORD_DIR,
+                        help="record telemetry, steps and commands to a session under DIR")
+    args = parser.parse_args(argv)
+    host, port = DAEMON_HOST, DAEMON_PORT
+    if args.tcp:
+        host, _, port = args.tcp.rpartition(':')
+        port = int(port)
+
+    runtime.start_transport()
+    if args.record:
+        runtime.start_recorder(args.record)
+    network_ok, message = runtime.check_network_connectivity()
+    print(f"Debug: {message}")                          # Controllers that come up later are still served
+
+    # Same background I/O as the GUI: startup sync, keepalives, polling and parsing
+    sync_boards = [board for board, rtt in runtime.controller_rtts.items() if rtt is not None] \
+        or list(runtime.transport_engine.controllers)
+    io_scheduler = IOScheduler(None, runtime.message_queue, runtime.transport_engine, StartupSync(sync_boards))
+    io_scheduler.window = DiscardDisplay(io_scheduler.updates)
+    runtime.io_scheduler = io_scheduler
+    io_scheduler.start()
+
+    daemon = ControlDaemon(host, port, args.unix)
+    try:
+        asyncio.run(daemon.serve())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        runtime.subscribe_telemetry(0)                  # Release the push subscriptions
+        io_scheduler.stop()                             # Flushes the unsubscribe commands
+        runtime.stop_transport()
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
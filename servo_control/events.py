@@ -0,0 +1,257 @@
+"""
+Board panel event dispatch (buttons, setpoint editors, OK/Clear).
+
+GUI-toolkit free: commands go out through runtime.send_udp_command1/2 and
+display changes through runtime.gui_renderer, so the benchmark drives this
+code with a headless window. The numeric keypad (setpoint editors) imports
+the GUI module on first use.
+"""
+
+import time                                # Debounce timestamps
+
+from . import runtime
+from .config import DEBOUNCE_INTERVAL, POSITION_LIMITS
+from .runtime import send_udp_command1, send_udp_command2
+from .state import (GUI_button_states_1, GUI_button_states_2, CNT_button_states_1,
+                    CNT_button_states_2, axis_state, board_axis)
+
+# ============================================================================
+#                         SERVO BUTTON HANDLING
+# ============================================================================
+
+def handle_servo_buttons(event, enable_command, disable_command, enabled, window):
+    """
+    Handle servo button display state changes.
+    
+    Sends nothing - handle_event() transmits the "BOARD:n;CMD:..." command
+    for each press.
+    """
+    # print(f"Debug 25 - Handling event: {event}, enabled: {enabled}")   
+    
+    if event == 'Mode':  # Mode is either Manual or Auto
+        if enabled:
+            runtime.gui_renderer.update(event, text='Auto', button_color=('white', 'green'))
+            GUI_button_states[event] = False
+        else:
+            runtime.gui_renderer.update(event, text='Manual', button_color=('black', 'yellow'))
+            GUI_button_states[event] = True
+
+    elif event == 'Repeat':  # Repeat is either enabled or disabled
+        if enabled:
+            runtime.gui_renderer.update(event, text='Repeat', button_color=('white', 'green'))
+            GUI_button_states[event] = False
+        else:
+            runtime.gui_renderer.update(event, text='Single', button_color=('black', 'yellow'))
+            GUI_button_states[event] = True
+
+    elif event == 'Start':  # Start is either enabled or disabled
+        if enabled:
+            runtime.gui_renderer.update(event, text='Disable Start', button_color=('white', 'green'))
+            GUI_button_states[event] = False
+        else:
+            runtime.gui_renderer.update(event, text='Enable Start', button_color=('black', 'yellow'))
+            GUI_button_states[event] = True
+    
+    elif event.endswith('B1'):  # B1 is either ENABLE or DISABLE
+        if enabled:
+            runtime.gui_renderer.update(event, text='ENabled', button_color=('white', 'green'))
+            GUI_button_states[event] = False
+        else:
+            runtime.gui_renderer.update(event, text='DISabled', button_color=('black', 'yellow'))
+            GUI_button_states[event] = True
+    
+    elif event.endswith('B2'):  # B2 is either Run or Stop
+        if enabled:
+            runtime.gui_renderer.update(event, text='Spare', button_color=('black', 'gray'))
+            GUI_button_states[event] = False
+        else:
+            runtime.gui_renderer.update(event, text='Spare', button_color=('white', 'gray'))
+            GUI_button_states[event] = True
+    
+    return not enabled
+
+# ============================================================================
+#                         EVENT DISPATCH
+# ============================================================================
+
+# E-STOP buttons (both board tabs and the Plot tab) - each stops every board
+ESTOP_EVENTS = ('B1_ESTOP', 'B2_ESTOP', 'PLOT_ESTOP')
+ESTOP_RESET_EVENTS = ('B1_ESTOP_RESET', 'B2_ESTOP_RESET')
+
+last_event_time = {}                                    # event key -> last accepted time (debounce)
+
+def show_numeric_keypad(title, current_value, min_val=0, max_val=54000):
+    """Open the numeric keypad dialog, loading the GUI module on first use."""
+    from .gui import show_numeric_keypad as keypad
+    return keypad(title, current_value, min_val, max_val)
+
+def handle_event(event, values, window):
+    """
+    Dispatch one board panel event from the main window.
+    
+    Routes B1_/B2_ prefixed events to their board, applies the debounce
+    and queues the resulting command on the I/O scheduler. Window close,
+    IO updates and shutdown stay in the main loop; everything else comes
+    through here, so Servo_Benchmark.py can drive the same code headlessly.
+    
+    Args:
+        event: Event key returned by window.read()
+        values (dict): Element values returned by window.read()
+        window: Main window (or a headless stand-in with the same keys)
+    """
+    global GUI_button_states, CNT_button_states, send_udp_command, board_num
+
+    # Emergency stop before anything else - no debounce, datagrams bypass the command queue
+    if event in ESTOP_EVENTS:
+        runtime.emergency_stop()
+        return
+    if event in ESTOP_RESET_EVENTS:
+        runtime.reset_emergency_stop()
+        return
+
+    # [CHANGE 2025-11-23] Handle Clear All Faults button for each board
+    if event == 'B1_CLEAR_ALL_FAULTS':
+        send_udp_command1("BOARD:1;CMD:CLEAR_ALL_FAULTS\n")
+    if event == 'B2_CLEAR_ALL_FAULTS':
+        send_udp_command2("BOARD:2;CMD:CLEAR_ALL_FAULTS\n")
+    # Apply All: every servo's setpoints to both boards, one ALL_Parameters datagram each
+    if event == 'APPLY_ALL':
+        runtime.send_all_parameters((1, 2))
+
+    board_num = None
+    event_key = event
+    if isinstance(event, str) and event.startswith("B1_"):
+        board_num = 1
+        event_key = event[3:]
+    elif isinstance(event, str) and event.startswith("B2_"):
+        board_num = 2
+        event_key = event[3:]
+
+    if board_num == 1:
+        GUI_button_states = GUI_button_states_1
+        CNT_button_states = CNT_button_states_1
+        send_udp_command = send_udp_command1
+    elif board_num == 2:
+        GUI_button_states = GUI_button_states_2
+        CNT_button_states = CNT_button_states_2
+        send_udp_command = send_udp_command2
+
+    # --- Button Events with BOARD prefix for all commands ---
+    if event and isinstance(event, str) and board_num:
+        current_time = time.time()
+        if event != '__TIMEOUT__':
+            print(f"Debug 41 - Event: {event}")
+
+        if event not in last_event_time or (current_time - last_event_time[event] > DEBOUNCE_INTERVAL):
+            last_event_time[event] = current_time
+            match event_key:
+                case 'Mode':
+                    GUI_button_states[event_key] = not GUI_button_states[event_key]
+                    CNT_button_states[event_key] = handle_servo_buttons(event, "Mode AUTO", "Mode MANUAL", CNT_button_states[event_key], window)
+                    runtime.gui_renderer.update(event,
+                        text='Auto' if GUI_button_states[event_key] else 'Manual',
+                        button_color=('white', 'green') if GUI_button_states[event_key] else ('black', 'yellow')
+                    )
+                    runtime.gui_renderer.frame()
+                    mode_cmd = "Mode AUTO" if GUI_button_states[event_key] else "Mode MANUAL"
+                    cmd = f"BOARD:{board_num};CMD:{mode_cmd}\n"
+                    print(f"Debug 42 - Sending command: {cmd.strip()}")
+                    send_udp_command(cmd)
+                case 'Repeat':
+                    GUI_button_states[event_key] = not GUI_button_states[event_key]
+                    CNT_button_states[event_key] = handle_servo_buttons(event, "Repeat", "Single", CNT_button_states[event_key], window)
+                    runtime.gui_renderer.update(event,
+                        text='Repeat' if GUI_button_states[event_key] else 'Single',
+                        button_color=('white', 'green') if GUI_button_states[event_key] else ('black', 'yellow')
+                    )
+                    runtime.gui_renderer.frame()
+                    repeat_cmd = "Repeat ENABLE" if GUI_button_states[event_key] else "Repeat DISABLE"
+                    cmd = f"BOARD:{board_num};CMD:{repeat_cmd}\n"
+                    print(f"Debug 43 - Sending command: {cmd.strip()}")
+                    send_udp_command(cmd)
+                case 'Start':
+                    GUI_button_states[event_key] = not GUI_button_states[event_key]
+                    CNT_button_states[event_key] = handle_servo_buttons(event, "Start ENABLED", "Start DISABLED", CNT_button_states[event_key], window)
+                    runtime.gui_renderer.update(event,
+                        text='Step Enabled' if GUI_button_states[event_key] else 'Step Disabled',
+                        button_color=('white', 'green') if GUI_button_states[event_key] else ('black', 'yellow')
+                    )
+                    runtime.gui_renderer.frame()
+                    start_cmd = "Start ENABLE" if GUI_button_states[event_key] else "Start DISABLE"
+                    cmd = f"BOARD:{board_num};CMD:{start_cmd}\n"
+                    print(f"Debug 44 - Sending command: {cmd.strip()}")
+                    send_udp_command(cmd)
+                case 'S1B1' | 'S2B1' | 'S3B1' | 'S4B1':
+                    servo = int(event_key[1])
+                    GUI_button_states[event_key] = not GUI_button_states[event_key]
+                    CNT_button_states[event_key] = handle_servo_buttons(event, "ENABLE", "DISABLE", CNT_button_states[event_key], window)
+                    runtime.gui_renderer.update(event,
+                        text='Enabled' if GUI_button_states[event_key] else 'Disabled',
+                        button_color=('white', 'green') if GUI_button_states[event_key] else ('black', 'yellow')
+                    )
+                    runtime.gui_renderer.frame()
+                    b1_cmd = f"S{servo}B1 ENABLE" if GUI_button_states[event_key] else f"S{servo}B1 DISABLE"
+                    cmd = f"BOARD:{board_num};CMD:{b1_cmd}\n"
+                    print(f"Debug 45 - Sending command: {cmd.strip()}")
+                    send_udp_command(cmd)
+                case 'S1B2' | 'S2B2' | 'S3B2' | 'S4B2':
+                    servo = int(event_key[1])
+                    GUI_button_states[event_key] = not GUI_button_states[event_key]
+                    CNT_button_states[event_key] = handle_servo_buttons(event, "RUN", "STOP", CNT_button_states[event_key], window)
+                    runtime.gui_renderer.update(event,
+                        text='STOP' if GUI_button_states[event_key] else 'RUN',
+                        button_color=('black', 'gray') if GUI_button_states[event_key] else ('white', 'gray')
+                    )
+                    runtime.gui_renderer.frame()
+                    b2_cmd = f"S{servo}B2 Start" if GUI_button_states[event_key] else f"S{servo}B2 STOP"
+                    cmd = f"BOARD:{board_num};CMD:{b2_cmd}\n"
+                    print(f"Debug 46 - Sending command: {cmd.strip()}")
+                    send_udp_command(cmd)
+                case _ if event_key.endswith('V_SPT_btn'):
+                    servo = int(event_key[1])
+                    axis = board_axis(board_num, servo)
+                    current_value = int(axis_state.velocity_setpoint[axis])
+                    new_value = show_numeric_keypad(
+                        f'Velocity Setpoint for Servo {servo}',
+                        current_value,
+                        0, 200000
+                    )
+                    if new_value is not None:
+                        axis_state.set_setpoints(axis, velocity=new_value)
+                        runtime.gui_renderer.update(event, str(new_value))
+                case _ if event_key.endswith('A_SPT_btn'):
+                    servo = int(event_key[1])
+                    axis = board_axis(board_num, servo)
+                    current_value = int(axis_state.acceleration_setpoint[axis])
+                    new_value = show_numeric_keypad(
+                        f'Acceleration Setpoint for Servo {servo}',
+                        current_value,
+                        0, 200000
+                    )
+                    if new_value is not None:
+                        axis_state.set_setpoints(axis, acceleration=new_value)
+                        runtime.gui_renderer.update(event, str(new_value))
+                case _ if event_key.endswith('P_SPT_btn'):
+                    servo = int(event_key[1])
+                    axis = board_axis(board_num, servo)
+                    current_value = int(axis_state.position_setpoint[axis])
+                    pos_min, pos_max = POSITION_LIMITS.get(servo, (0, 54000))
+                    new_value = show_numeric_keypad(
+                        f'Position Setpoint for Servo {servo}',
+                        current_value,
+                        pos_min, pos_max
+                    )
+                    if new_value is not None:
+                        axis_state.set_setpoints(axis, position=new_value)
+                        runtime.gui_renderer.update(event, str(new_value))
+                case _ if event_key.endswith('B3'):
+                    servo = int(event_key[1])
+                    V_data, A_data, P_data = axis_state.setpoints(board_axis(board_num, servo))
+                    print(f"Debug 47 - Uploading S{servo}_Parameters:{V_data},{A_data},{P_data} to board {board_num}")
+                    runtime.upload_setpoints([board_axis(board_num, servo)])  # Verified by SETPOINTS readback
+                    print(f"Debug 48 - Updated setpoints for S{servo}: V_SPT={V_data}, A_SPT={A_data}, P_SPT={P_data}")
+                case _ if event_key.endswith('B4'):
+                    servo = int(event_key[1])
+                    cmd = f"BOARD:{board_num};CMD:S{servo}_ClearPosition\n"
+                    print(f"Debug 49 - Sending clear position command: {cmd.strip()}")
+                    send_udp_command(cmd)
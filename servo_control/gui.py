@@ -0,0 +1,400 @@
+"""
+FreeSimpleGUI windows: board panels, main layout, loading screen, network
+dialogs, numeric keypad and the Raspberry Pi shutdown dialog.
+
+The only module that imports FreeSimpleGUI (Tk); headless tools never load it.
+"""
+
+import time                                # Shutdown progress animation
+
+import FreeSimpleGUI as sg                 # Free GUI library for cross-platform interface
+
+from .config import (CLEAR_BUTTON_FONT, GLOBAL_FONT, IS_RASPBERRY_PI, IS_WINDOWS, PLOT_COLORS,
+                     PLOT_SIZE, PLOT_WINDOW_SECONDS, POSITION_LABEL_FONT, POSITION_LIMITS)
+from .state import AXIS_COUNT, GUI_button_states_1, GUI_button_states_2, axis_state, board_axis
+
+# ============================================================================
+#                         NETWORK ERROR DIALOGS
+# ============================================================================
+
+def show_network_error_dialog(message):
+    """
+    Show network error dialog with three user options:
+    - 'retry': Try network check again
+    - 'continue': Start application anyway (debugging mode) 
+    - 'exit': Close application
+    
+    This replaces the old binary retry/exit dialog to allow debugging
+    when ClearCore controllers are not available.
+    """
+    # Platform-specific troubleshooting tips
+    if IS_WINDOWS:
+        platform_tips = [
+            '• Check Windows Firewall settings',
+            '• Verify Ethernet adapter has IP 192.168.10.x',
+            '• Check Norton/antivirus firewall settings',
+            '• Ensure at least one ClearCore is powered on'
+        ]
+    else:
+        platform_tips = [
+            '• Check if eth0 interface is up: ip addr show eth0',
+            '• Verify route exists: ip route show | grep 192.168.10',
+            '• Check systemd network service status',
+            '• Ensure at least one ClearCore is powered on'
+        ]
+    
+    # Updated dialog layout: Changed from "Error" to "Warning" to reflect
+    # that the application can now continue without network connectivity
+    layout = [
+        [sg.Text('Network Connectivity Warning', font=GLOBAL_FONT, text_color='orange')],
+        [sg.Text('ClearCore communication issue detected:', font=GLOBAL_FONT)],
+        [sg.Text(message, font=GLOBAL_FONT, text_color='darkred')],
+        [sg.Text('Please check:', font=GLOBAL_FONT)],
+        [sg.Text('• Ethernet cable connection to ClearCore controllers', font=GLOBAL_FONT)],
+        [sg.Text('• ClearCore controllers are powered on', font=GLOBAL_FONT)],
+        [sg.Text('• ClearCore IP addresses (171, 172)', font=GLOBAL_FONT)],
+    ] + [[sg.Text(tip, font=GLOBAL_FONT)] for tip in platform_tips] + [
+        # NEW: Inform user that debugging is possible without network
+        [sg.Text('You can continue to use the interface for debugging:', font=GLOBAL_FONT)],
+        # NEW: Three-button layout with color coding:
+        # Green = Retry (preferred), Yellow = Continue (caution), Red = Exit (stop)
+        [sg.Button('Retry', size=(10, 1), button_color=('black', 'lightgreen'), font=GLOBAL_FONT), 
+         sg.Button('Continue Anyway', size=(15, 1), button_color=('black', 'yellow'), font=GLOBAL_FONT),
+         sg.Button('Exit', size=(10, 1), button_color=('white', 'red'), font=GLOBAL_FONT)]
+    ]
+    
+    error_window = sg.Window('Network Warning', layout, 
+                           keep_on_top=True, modal=True, finalize=True,
+                           location=(50, 50))
+    
+    # NEW: Three-state return values replace old boolean retry/exit logic
+    # Returns string values for clearer handling in main program
+    while True:
+        event, values = error_window.read()
+        if event in (sg.WIN_CLOSED, 'Exit'):
+            error_window.close()
+            return 'exit'       # Close application
+        elif event == 'Retry':
+            error_window.close()
+            return 'retry'      # Try network check again
+        elif event == 'Continue Anyway':
+            error_window.close()
+            return 'continue'   # Start app with network error (debug mode)
+
+def show_communication_status_popup(error_message):
+    """
+    Show informational popup after GUI loads when running in debug mode.
+    
+    This popup appears AFTER the main GUI is displayed to provide clear
+    status information about the communication failure and explain that
+    the interface is still functional for testing/debugging purposes.
+    
+    Args:
+        error_message (str): The network error message to display
+    """
+    layout = [
+        [sg.Text('Communication Status', font=GLOBAL_FONT, text_color='orange')],
+        [sg.Text('🔧 DEBUG MODE ACTIVE 🔧', font=GLOBAL_FONT, 
+                text_color='red', justification='center')],
+        [sg.Text('ClearCore Communication:', font=GLOBAL_FONT)],
+        [sg.Text('❌ Failed to establish connection', font=GLOBAL_FONT, text_color='red')],
+        [sg.Text(f'   {error_message}', font=GLOBAL_FONT, text_color='darkred')],
+        [sg.Text('Interface Status:', font=GLOBAL_FONT)],
+        [sg.Text('✅ GUI fully functional for testing', font=GLOBAL_FONT, text_color='green')],
+        [sg.Text('✅ All controls available for debugging', font=GLOBAL_FONT, text_color='green')],
+        [sg.Text('Note: Servo commands will not be sent to hardware', 
+                font=GLOBAL_FONT, text_color='darkblue')],
+        [sg.Button('Continue', size=(12, 1), button_color=('black', 'lightblue'), font=GLOBAL_FONT)]
+    ]
+    
+    status_window = sg.Window('Communication Status', layout, 
+                            keep_on_top=True, modal=True, finalize=True,
+                            location=(50, 50))
+    
+    # Wait for user acknowledgment
+    while True:
+        event, values = status_window.read()
+        if event in (sg.WIN_CLOSED, 'Continue'):
+            status_window.close()
+            break
+
+# ============================================================================
+#                         POPUPS & SYSTEM FUNCTIONS
+# ============================================================================
+
+def show_numeric_keypad(title, current_value, min_val=0, max_val=54000):
+    """Custom numeric keypad popup for touchscreen input"""
+    layout = [
+        [sg.Text(title, font=GLOBAL_FONT)],
+        [sg.Text('Current Value:', font=GLOBAL_FONT), 
+         sg.InputText(str(current_value), key='display', size=(15, 1), font=GLOBAL_FONT, justification='center', readonly=False)],
+        [sg.Button('7', size=(6, 2), font=GLOBAL_FONT), 
+         sg.Button('8', size=(6, 2), font=GLOBAL_FONT), 
+         sg.Button('9', size=(6, 2), font=GLOBAL_FONT)],
+        [sg.Button('4', size=(6, 2), font=GLOBAL_FONT), 
+         sg.Button('5', size=(6, 2), font=GLOBAL_FONT), 
+         sg.Button('6', size=(6, 2), font=GLOBAL_FONT)],
+        [sg.Button('1', size=(6, 2), font=GLOBAL_FONT), 
+         sg.Button('2', size=(6, 2), font=GLOBAL_FONT), 
+         sg.Button('3', size=(6, 2), font=GLOBAL_FONT)],
+        [sg.Button('Clear', size=(6, 2), font=GLOBAL_FONT), 
+         sg.Button('0', size=(6, 2), font=GLOBAL_FONT), 
+         sg.Button('⌫', size=(6, 2), font=GLOBAL_FONT)],
+        [sg.Button('Cancel', size=(8, 2), font=GLOBAL_FONT), 
+         sg.Button('OK', size=(8, 2), font=GLOBAL_FONT)]
+    ]
+    
+    # Upper right corner positioning for all platforms
+    location = (50, 50)  # Upper left corner for all platforms
+    
+    popup_window = sg.Window(title, layout, modal=True, finalize=True, location=location, keep_on_top=True)
+    
+    while True:
+        event, values = popup_window.read()
+        
+        if event in (sg.WIN_CLOSED, 'Cancel'):
+            popup_window.close()
+            return None
+            
+        elif event == 'OK':
+            try:
+                result = int(values['display'])
+                if min_val <= result <= max_val:
+                    popup_window.close()
+                    return result
+                else:
+                    sg.popup_error(f'Value must be between {min_val} and {max_val}', keep_on_top=True, location=(50, 50), font=GLOBAL_FONT)
+            except ValueError:
+                sg.popup_error('Please enter a valid number', keep_on_top=True, location=(50, 50), font=GLOBAL_FONT)
+                
+        elif event == 'Clear':
+            popup_window['display'].update('0')
+            
+        elif event == '⌫':  # Backspace
+            current = values['display']
+            popup_window['display'].update(current[:-1])
+            
+        elif event in '0123456789':
+            current = values['display']
+            popup_window['display'].update(current + event)
+
+def shutdown_system():
+    """Shutdown the Raspberry Pi system after confirmation"""
+    if not IS_RASPBERRY_PI:
+        sg.popup_error("Shutdown function is only available on Raspberry Pi", location=(50, 50), font=GLOBAL_FONT)
+        return False
+    
+    # Confirmation dialog
+    layout = [
+        [sg.Text('System Shutdown', font=GLOBAL_FONT, text_color='red')],
+        [sg.Text('', font=GLOBAL_FONT)],
+        [sg.Text('Are you sure you want to shutdown the Raspberry Pi?', font=GLOBAL_FONT)],
+        [sg.Text('This will close the application and power off the system.', font=GLOBAL_FONT)],
+        [sg.Text('', font=GLOBAL_FONT)],
+        [sg.Button('Cancel', size=(10, 1), button_color=('black', 'lightgray'), font=GLOBAL_FONT), 
+         sg.Button('Shutdown Now', size=(12, 1), button_color=('white', 'red'), font=GLOBAL_FONT)]
+    ]
+    
+    confirm_window = sg.Window('Confirm Shutdown', layout, 
+                              keep_on_top=True, modal=True, finalize=True,
+                              location=(50, 50))
+    
+    while True:
+        event, values = confirm_window.read()
+        if event in (sg.WIN_CLOSED, 'Cancel'):
+            confirm_window.close()
+            return False
+        elif event == 'Shutdown Now':
+            confirm_window.close()
+            
+            # Show shutdown progress
+            progress_layout = [
+                [sg.Text('Shutting down system...', font=GLOBAL_FONT)],
+                [sg.Text('Please wait, system will power off shortly.', font=GLOBAL_FONT)],
+                [sg.ProgressBar(100, orientation='h', size=(40, 20), key='PROGRESS')]
+            ]
+            
+            progress_window = sg.Window('System Shutdown', progress_layout, 
+                                       no_titlebar=True, keep_on_top=True, 
+                                       location=(50, 50), finalize=True)
+            
+            # Animate progress bar briefly
+            for i in range(101):
+                progress_window['PROGRESS'].update(i)
+                progress_window.refresh()
+                time.sleep(0.01)
+            
+            progress_window.close()
+            return True
+
+# ============================================================================
+#                         LAYOUT CONSTRUCTION
+# ============================================================================
+
+def build_board_panel(board_num, GUI_button_states):
+    """
+    Build servo control panel with simplified interface for Servos 2-4.
+    
+    Interface Layout:
+    - Tab 1 (Board 1): Servos 1-4 with full controls (Velocity, Acceleration, Position)
+    - Tab 2 (Board 2): Servos 5-8 with full controls (Velocity, Acceleration, Position)
+    
+    This provides complete 8-axis control capability with clean organization across two tabs.
+    Each servo has independent Velocity, Acceleration, and Position controls.
+    """
+
+    prefix = f'B{board_num}_'
+    panel = [
+        [sg.Button('Clear All Faults', key=prefix+'CLEAR_ALL_FAULTS', font=GLOBAL_FONT, size=(18,2), pad=((0, 0), (0, 0))),
+         sg.Button('E-STOP', key=prefix+'ESTOP', size=(12, 2), button_color=('white', 'red'), font=GLOBAL_FONT),  # Stops every board
+         sg.Button('Reset Stop', key=prefix+'ESTOP_RESET', size=(12, 2), button_color=('black', 'yellow'), font=GLOBAL_FONT),
+         sg.Text('', size=(20, 1), key=prefix+'ESTOP_STATUS', font=GLOBAL_FONT)]  # Latch and stop latency
+    ]
+
+    for i in range(1, 5):
+        # All Servos 1-4: Show all controls (Velocity, Acceleration, Position) - Hide Enable/Start buttons
+        # On the second row (i==2), add the Clear All Faults button at the end
+        if i == 2:
+            panel += [
+                [sg.Text(f'Position {i}', size=(11, 1), justification='left', font=POSITION_LABEL_FONT),
+                 sg.Text('', size=(22, 1), font=GLOBAL_FONT),  # Hidden Enable/Disable button
+                 sg.Text('', size=(8, 1), key=prefix+f'S{i}_SPT_STATUS', font=GLOBAL_FONT),  # Setpoint upload status
+                 sg.Button(f'{int(axis_state.velocity_setpoint[board_axis(board_num, i)])}', key=prefix+f'S{i}V_SPT_btn', size=(8, 1), button_color=('black', 'lightblue'), font=GLOBAL_FONT),
+                 sg.Button(f'{int(axis_state.acceleration_setpoint[board_axis(board_num, i)])}', key=prefix+f'S{i}A_SPT_btn', size=(8, 1), button_color=('black', 'lightblue'), font=GLOBAL_FONT),
+                 sg.Button(f'{int(axis_state.position_setpoint[board_axis(board_num, i)])}', key=prefix+f'S{i}P_SPT_btn', size=(8, 1), button_color=('black', 'lightblue'), font=GLOBAL_FONT),
+                 sg.Button('OK', key=prefix+f'S{i}B3', size=(8, 2), font=GLOBAL_FONT)]
+            ]
+            panel += [
+                [sg.Button('Clear Value', key=prefix+f'S{i}B4', size=(16, 1), button_color=('black', 'orange'), font=CLEAR_BUTTON_FONT),
+                 sg.Text('', size=(5, 1), font=GLOBAL_FONT),  # 5-space spacing after Clear Value button
+                 sg.Text('Current Position', size=(16, 1), justification='left', font=GLOBAL_FONT),
+                 sg.Text('..............................', size=(31, 1), font=GLOBAL_FONT),  # Adjusted spacing
+                 sg.Text(int(axis_state.position[board_axis(board_num, i)]), size=(6, 1), key=prefix+f'S{i}P_display', justification='center', font=GLOBAL_FONT),
+                 sg.Text('', size=(1, 1))]  # Spacer to align with above
+            ]
+        else:
+            panel += [
+                [sg.Text(f'Position {i}', size=(11, 1), justification='left', font=POSITION_LABEL_FONT),
+                 sg.Text('', size=(22, 1), font=GLOBAL_FONT),  # Hidden Enable/Disable button
+                 sg.Text('', size=(8, 1), key=prefix+f'S{i}_SPT_STATUS', font=GLOBAL_FONT),  # Setpoint upload status
+                 sg.Button(f'{int(axis_state.velocity_setpoint[board_axis(board_num, i)])}', key=prefix+f'S{i}V_SPT_btn', size=(8, 1), button_color=('black', 'lightblue'), font=GLOBAL_FONT),
+                 sg.Button(f'{int(axis_state.acceleration_setpoint[board_axis(board_num, i)])}', key=prefix+f'S{i}A_SPT_btn', size=(8, 1), button_color=('black', 'lightblue'), font=GLOBAL_FONT),
+                 sg.Button(f'{int(axis_state.position_setpoint[board_axis(board_num, i)])}', key=prefix+f'S{i}P_SPT_btn', size=(8, 1), button_color=('black', 'lightblue'), font=GLOBAL_FONT),
+                 sg.Button('OK', key=prefix+f'S{i}B3', size=(8, 2), font=GLOBAL_FONT)],
+                [sg.Button('Clear Value', key=prefix+f'S{i}B4', size=(16, 1), button_color=('black', 'orange'), font=CLEAR_BUTTON_FONT),
+                 sg.Text('', size=(5, 1), font=GLOBAL_FONT),  # 5-space spacing after Clear Value button
+                 sg.Text('Current Position', size=(16, 1), justification='left', font=GLOBAL_FONT),
+                 sg.Text('..............................', size=(31, 1), font=GLOBAL_FONT),  # Adjusted spacing
+                 sg.Text(int(axis_state.position[board_axis(board_num, i)]), size=(6, 1), key=prefix+f'S{i}P_display', justification='center', font=GLOBAL_FONT)]
+            ]
+    return panel
+
+# Live position plot tab (drawn by servo_control.plot.LivePlot)
+def build_plot_panel():
+    """
+    Build the Plot tab: one graph in pixel coordinates for all 8 axes and a
+    row of per-axis show/hide checkboxes in the trace colors, with an
+    E-STOP button so every board can be stopped from this tab too.
+    
+    Returns:
+        list: FreeSimpleGUI layout for the Plot tab
+    """
+    low = min(limits[0] for limits in POSITION_LIMITS.values())
+    high = max(limits[1] for limits in POSITION_LIMITS.values())
+    return [
+        [sg.Graph(canvas_size=PLOT_SIZE, graph_bottom_left=(0, 0), graph_top_right=PLOT_SIZE,
+                  background_color='white', key='PLOT_GRAPH')],
+        [sg.Text(f'Position {low}-{high}, last {PLOT_WINDOW_SECONDS} s (thick = actual, thin = setpoint)',
+                 size=(60, 1), font=GLOBAL_FONT),
+         sg.Button('E-STOP', key='PLOT_ESTOP', size=(10, 1), button_color=('white', 'red'), font=GLOBAL_FONT)],
+        [sg.Checkbox(f'S{axis}', default=True, key=f'PLOT_AXIS_{axis}', enable_events=True,
+                     text_color=PLOT_COLORS[axis - 1], font=GLOBAL_FONT, size=(4, 1))
+         for axis in range(1, AXIS_COUNT + 1)]
+    ]
+
+# Build the main layout with both tabs enabled for 8-axis control
+def build_layout(network_error_message=None):
+    """
+    Build the main window layout: both board tabs and the position plot tab
+    plus the link status / shutdown row, with a warning bar on top when
+    running without controllers.
+    
+    Args:
+        network_error_message (str): Startup connectivity error, or None
+    
+    Returns:
+        list: FreeSimpleGUI layout for the main window
+    """
+    main_layout = [
+        [sg.TabGroup(
+            [[
+                sg.Tab('Servos 1-4', build_board_panel(1, GUI_button_states_1), key='TAB1'),
+                sg.Tab('Servos 5-8', build_board_panel(2, GUI_button_states_2), key='TAB2'),
+                sg.Tab('Plot', build_plot_panel(), key='TAB_PLOT')
+            ]],
+            key='TABGROUP',
+            tab_background_color='darkgray',           # color of all tabs
+            selected_title_color='darkblue',               # text color of selected tab
+            selected_background_color='white'        # background color of selected tab
+        )]
+    ]
+
+    # Add shutdown button row for GUI testing on all platforms (only functional on Raspberry Pi)
+    shutdown_row = [
+        sg.Text('', key='LINK_STATS', size=(68, 1), font=GLOBAL_FONT),  # Link quality status (also pushes buttons right)
+        sg.Button('Apply All', key='APPLY_ALL', size=(10, 1),           # Every servo's setpoints, one datagram per board
+                  button_color=('black', 'lightblue'), font=GLOBAL_FONT),
+        sg.Button('Shutdown', key='SHUTDOWN', size=(10, 1), 
+                  button_color=('white', 'red'), font=GLOBAL_FONT)
+    ]
+    main_layout.append(shutdown_row)
+
+    # NEW: Dynamic layout creation based on network status
+    # If user chose "Continue Anyway", add persistent error warning at top of GUI
+    # This provides constant visual feedback that the system is running in debug mode
+    if network_error_message:
+        # Create prominent warning bar with high-visibility colors (red text on yellow)
+        error_bar = [
+            [sg.Text('⚠ NETWORK ERROR - RUNNING IN DEBUG MODE ⚠', 
+                     font=('Helvetica', 12, 'bold'), 
+                     text_color='red', 
+                     background_color='yellow',
+                     justification='center',
+                     size=(80, 1))],
+            [sg.Text(f'Error: {network_error_message}', 
+                     font=('Helvetica', 9), 
+                     text_color='darkred',
+                     justification='center')],
+            [sg.Text(' ')]  # Visual spacing between warning and main interface
+        ]
+        # Prepend error bar to main layout - warning appears at top of window
+        layout = error_bar + main_layout
+    else:
+        # Normal operation - no network issues detected
+        layout = main_layout
+    return layout
+
+def create_loading_window():
+    """
+    Create a fresh loading window with new elements each time.
+    
+    BUGFIX: This prevents the GUI element reuse error that occurs when
+    the user clicks 'Retry' on the network error dialog. FreeSimpleGUI
+    elements can only be used once, so we must create new elements
+    for each loading window instance.
+    
+    Returns:
+        sg.Window: A new loading window with fresh GUI elements
+    """
+    loading_layout = [
+        [sg.Text('Servo Control System', font=GLOBAL_FONT, justification='center')],
+        [sg.Text(' ', size=(20, 1), font=GLOBAL_FONT)],
+        [sg.Text('Checking network connectivity...', font=GLOBAL_FONT, justification='center')],
+        [sg.Text('Please wait while connecting to controllers', font=GLOBAL_FONT, justification='center')],
+        [sg.Text(' ', size=(20, 1), font=GLOBAL_FONT)]
+    ]
+    window = sg.Window('Loading', loading_layout, no_titlebar=True, 
+                      keep_on_top=True, location=(50, 50), 
+                      alpha_channel=0.9, font=GLOBAL_FONT, finalize=True)
+    window.refresh()
+    return window
@@ -0,0 +1,270 @@
+"""
+Message processing: per-board handlers for every controller reply type.
+
+Handlers update the shared state and record display changes through
+update_element(), so they run unchanged on the I/O scheduler thread
+(GuiUpdateBatch), the GUI thread (GuiRenderer) or against a plain window.
+"""
+
+import time                                # Feedback arrival stamps
+
+from . import state
+from .protocol import ValuesFrame, strip_board_prefix, parse_values_text
+from .render import update_element
+from .state import (AXES_PER_BOARD, axis_state, board_cnt_states, board_gui_states,
+                    board_prefixes, command_acks, estop_active, estop_latency, recipe_errors,
+                    recipe_status, state_engine_steps, telemetry_formats, telemetry_subscriptions)
+
+# ============================================================================
+#                         MESSAGE PROCESSING
+# ============================================================================
+
+def process_values_format_response(message, board_num):
+    """
+    Record the VALUES format a board confirmed, e.g. "VALUES_FORMAT:BINARY".
+    
+    Args:
+        message (str): Message body without board prefix
+        board_num (int): Board the reply came from (1 or 2)
+    """
+    fmt = message.split(":")[1]
+    if fmt != telemetry_formats[board_num]:
+        print(f"Debug: Board {board_num} telemetry format {fmt}")
+    telemetry_formats[board_num] = fmt
+    return True
+
+def process_command_acks_response(message, board_num):
+    """Record that a board answers tracked commands ("COMMAND_ACKS:ON") with ACK/NAK."""
+    if not command_acks[board_num]:
+        print(f"Debug: Board {board_num} acknowledges commands")
+    command_acks[board_num] = message.split(":")[1] == "ON"
+    return True
+
+def process_subscription_response(message, board_num):
+    """
+    Record the push rate a board granted in reply to SUBSCRIBE_VALUES.
+    
+    Args:
+        message (str): Message body without board prefix, e.g. "SUBSCRIBED:100"
+        board_num (int): Board the reply came from (1 or 2)
+        
+    Returns:
+        bool: True if the reply was parsed
+    """
+    try:
+        rate = int(message.split(":")[1])
+    except (IndexError, ValueError):
+        return False
+    if rate != telemetry_subscriptions[board_num]:
+        print(f"Debug: Board {board_num} telemetry subscription rate {rate} Hz")
+    telemetry_subscriptions[board_num] = rate
+    return True
+
+def process_recipe_response(message, board_num):
+    """
+    Record the recipe a board reports as active, e.g. "RECIPE:short-swing,1234567".
+    
+    Args:
+        message (str): Message body without board prefix
+        board_num (int): Board the reply came from (1 or 2)
+        
+    Returns:
+        bool: True if the reply was parsed
+    """
+    try:
+        name, checksum = message.split(":", 1)[1].rsplit(",", 1)
+        checksum = int(checksum)
+    except ValueError:
+        return False
+    if recipe_status[board_num] != (name, checksum):
+        print(f"Debug: Board {board_num} recipe {name} (checksum {checksum})")
+    recipe_status[board_num] = (name, checksum)
+    recipe_errors[board_num] = None
+    return True
+
+def process_recipe_error_response(message, board_num):
+    """Record a rejected recipe upload, e.g. "RECIPE_ERROR:MISSING_ROWS"."""
+    reason = message.split(":", 1)[1] if ":" in message else ''
+    print(f"Debug: Board {board_num} rejected recipe upload: {reason}")
+    recipe_errors[board_num] = reason
+    return True
+
+def process_estop_response(message, window, board_num):
+    """
+    Apply an E-stop report: "ESTOP:ACTIVE:<token>" (latched) or "ESTOP:CLEAR".
+    
+    Shows the latch and the latency measured by runtime.estop next to the
+    board's E-STOP button; every redundant copy is answered, so repeated
+    reports only refresh the display.
+    
+    Args:
+        message (str): Message body without board prefix
+        window: GUI window or GuiUpdateBatch for the status display
+        board_num (int): Board the report came from (1 or 2)
+    """
+    active = message.split(":")[1] == "ACTIVE"
+    if active != estop_active[board_num]:
+        print(f"Debug: Board {board_num} E-stop {'latched' if active else 'released'}")
+    estop_active[board_num] = active
+    latency = estop_latency[board_num]
+    if not active:
+        text = ''
+    elif latency is None:
+        text = 'STOPPED'
+    else:
+        text = f'STOPPED {latency * 1000:.1f} ms'
+    update_element(window, board_prefixes[board_num]+'ESTOP_STATUS', text, text_color='red')
+    return True
+
+def process_values_response(parts, window, board_num, timestamp=None):
+    """
+    Store one board's V/A/P feedback and update its changed position displays.
+    
+    Args:
+        parts (sequence): 12 integers (V/A/P × 4 servos) from a binary frame
+                          or parse_values_text()
+        window: GUI window object for display updates
+        board_num (int): Board the frame came from
+        timestamp (float): Arrival time, defaults to now
+    """
+    # print(f"DEBUG: process_values_response called for board {board_num}: {parts}")
+    if parts is not None and len(parts) >= 12:  # 4 servos × 3 values (V/A/P) = 12 values
+        changed = axis_state.update_feedback(board_num, parts,
+                                             time.monotonic() if timestamp is None else timestamp)
+        # Update Position displays (position only - velocity and acceleration hidden)
+        prefix = board_prefixes[board_num]
+        for axis in changed:
+            servo = axis - (board_num - 1) * AXES_PER_BOARD
+            update_element(window, prefix+f'S{servo}P_display', int(axis_state.position[axis]))
+        window.refresh()
+        return True
+    return False
+
+def process_values_text_response(message, window, board_num):
+    """Handle a text "VALUES:" frame from one board (text format fallback)."""
+    if telemetry_formats[board_num] == 'BINARY':
+        telemetry_formats[board_num] = None             # Board reverted to text (reboot) - renegotiate
+    return process_values_response(parse_values_text(message), window, board_num)
+
+def process_button_states_response(message, window, board_num=1):
+    """
+    Apply a "BUTTON_STATES:M,R,S,S1E,S1R,...,S4E,S4R" report from one board.
+    
+    Args:
+        message (str): Message with any "BOARD:n;" prefix already removed
+        window: GUI window object for display updates
+        board_num (int): Board the report came from
+    """
+    GUI_button_states = board_gui_states[board_num]
+    prefix = board_prefixes[board_num]
+    parts = message.split(":")[1].split(",")
+    if len(parts) >= 11:
+        GUI_button_states['Mode'] = True if parts[0] == '1' else False
+        GUI_button_states['Repeat'] = True if parts[1] == '1' else False
+        GUI_button_states['Start'] = True if parts[2] == '1' else False
+        GUI_button_states['S1B1'] = True if parts[3] == '1' else False
+        GUI_button_states['S1B2'] = True if parts[4] == '1' else False
+        GUI_button_states['S2B1'] = True if parts[5] == '1' else False
+        GUI_button_states['S2B2'] = True if parts[6] == '1' else False
+        GUI_button_states['S3B1'] = True if parts[7] == '1' else False
+        GUI_button_states['S3B2'] = True if parts[8] == '1' else False
+        GUI_button_states['S4B1'] = True if parts[9] == '1' else False
+        GUI_button_states['S4B2'] = True if parts[10] == '1' else False
+        board_cnt_states[board_num].update(GUI_button_states)  # Hardware mirror matches report
+        state.states_received = True
+        update_element(window, prefix+'Mode', text='Auto' if GUI_button_states['Mode'] else 'Manual', button_color=('white', 'green') if GUI_button_states['Mode'] else ('black', 'yellow'))
+        update_element(window, prefix+'Repeat', text='Repeat' if GUI_button_states['Repeat'] else 'Single', button_color=('white', 'green') if GUI_button_states['Repeat'] else ('black', 'yellow'))
+        update_element(window, prefix+'Start', text='Started' if GUI_button_states['Start'] else 'Start', button_color=('white', 'green') if GUI_button_states['Start'] else ('black', 'yellow'))
+        for i in range(1, 5):
+            update_element(window, prefix+f'S{i}B1', text='Enabled' if GUI_button_states[f'S{i}B1'] else 'Disabled', button_color=('white', 'green') if GUI_button_states[f'S{i}B1'] else ('black', 'yellow'))
+            update_element(window, prefix+f'S{i}B2', text='Run' if GUI_button_states[f'S{i}B2'] else 'Stop', button_color=('black', 'gray'))
+        window.refresh()
+        return True
+    return False
+
+def process_setpoints_response(message, window, board_num=1):
+    """
+    Apply a "SETPOINTS:S1V,S1A,S1P,...,S4P" report from one board.
+    
+    Args:
+        message (str): Message with any "BOARD:n;" prefix already removed
+        window: GUI window object for display updates
+        board_num (int): Board the report came from
+    """
+    prefix = board_prefixes[board_num]
+    parts = message.split(":")[1].split(",")
+    if len(parts) >= 12:
+        try:
+            values = [int(p) for p in parts[:12]]
+        except ValueError:
+            print("Error processing setpoints response")
+            return False
+        state.setpoints_received = True
+        axis_state.update_setpoints(board_num, values)
+        for i in range(1, 5):
+            v, a, p = values[(i - 1) * 3:i * 3]
+            update_element(window, prefix+f'S{i}V_SPT_btn', text=f'{v}')
+            update_element(window, prefix+f'S{i}A_SPT_btn', text=f'{a}')
+            update_element(window, prefix+f'S{i}P_SPT_btn', text=f'{p}')
+        window.refresh()
+        return True
+    return False
+
+def process_state_engine_response(message, window, board_num=1):
+    """Apply a "STATE_ENGINE:<step>" report from one board."""
+    try:
+        step = int(message.split(":")[1].split(",")[0])
+    except (IndexError, ValueError):
+        return False
+    state_engine_steps[board_num] = step
+    state.state_engine_step = step
+    update_element(window, board_prefixes[board_num]+'state_engine_step', step)
+    window.refresh()
+    return True
+
+def process_response(message, expected, window, board_num=1):
+    if expected == "BUTTON_STATES:":
+        return process_button_states_response(message, window, board_num)
+    elif expected == "SETPOINTS:":
+        return process_setpoints_response(message, window, board_num)
+    elif expected == "STATE_ENGINE:":
+        return process_state_engine_response(message, window, board_num)
+    return False
+
+# Message type (text before the first ':') -> handler(message, window, board_num)
+BOARD_MESSAGE_HANDLERS = {
+    'VALUES': process_values_text_response,
+    'BUTTON_STATES': process_button_states_response,
+    'SETPOINTS': process_setpoints_response,
+    'STATE_ENGINE': process_state_engine_response,
+    'SUBSCRIBED': lambda message, window, board_num: process_subscription_response(message, board_num),
+    'VALUES_FORMAT': lambda message, window, board_num: process_values_format_response(message, board_num),
+    'COMMAND_ACKS': lambda message, window, board_num: process_command_acks_response(message, board_num),
+    'ACK': lambda message, window, board_num: True,    # Settled by runtime.command_tracker on arrival
+    'NAK': lambda message, window, board_num: True,
+    'RECIPE': lambda message, window, board_num: process_recipe_response(message, board_num),
+    'RECIPE_ERROR': lambda message, window, board_num: process_recipe_error_response(message, board_num),
+    'ESTOP': process_estop_response,
+}
+
+def handle_board_message(board_num, message, window):
+    """
+    Route one received frame to its handler.
+    
+    The board comes from the transport (source address), so routing is a
+    dict lookup on the message type and works for replies with or without
+    a "BOARD:n;" prefix.
+    
+    Args:
+        board_num (int): Board the frame came from
+        message: ValuesFrame or text message
+        window: GUI window object for display updates
+    """
+    if isinstance(message, ValuesFrame):
+        # Binary frame - already decoded by the transport
+        return process_values_response(message.values, window, board_num, message.arrival)
+    message = strip_board_prefix(message)
+    handler = BOARD_MESSAGE_HANDLERS.get(message.split(":", 1)[0])
+    if handler is None:
+        return False
+    return handler(message, window, board_num)
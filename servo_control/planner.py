@@ -0,0 +1,295 @@
+"""
+Time-synchronized trajectory planner for all 8 axes (requires NumPy).
+
+For every step of a sequence the planner picks one step duration and one
+set of phase times (acceleration, jerk) shared by all axes, then gives each
+axis the peak velocity, acceleration and jerk that cover its own distance
+in exactly that time. All axes therefore start and finish each step
+together and follow the same normalized profile - the motion is a straight
+line in joint space - while no axis exceeds its VELOCITY_LIMITS,
+ACCELERATION_LIMITS or JERK_LIMITS.
+
+Profiles:
+    'trapezoid' - Constant acceleration phases. Matches the ClearCore move
+                  generator, so plan.setpoints(step) (V = VelMax, A = AccelMax)
+                  reproduces the planned timing on the boards.
+    'scurve'    - Jerk-limited 7-phase profile. The ClearCore has no jerk
+                  setting, so its setpoints are the S-curve peak values; the
+                  full profile is available through sample() for analysis
+                  and plotting.
+
+Every step of a sequence is solved at once as NumPy array operations
+(trapezoid in closed form, S-curve by a vectorized search over the
+cruise time), so an 11-step plan takes well under a millisecond:
+
+    python3 -m servo_control.planner [--profile scurve] [--repeat 1000]
+"""
+
+import argparse                            # Command line options
+import time                                # Planning time report
+
+from .config import ACCELERATION_LIMITS, JERK_LIMITS, VELOCITY_LIMITS
+from .state import AXIS_COUNT
+
+try:
+    import numpy                           # Vectorized planning (required by plan_sequence())
+except ImportError:
+    numpy = None
+
+# ============================================================================
+#                         SWING SEQUENCE
+# ============================================================================
+
+# Step names of the firmware auto sequence (next_step 0-10)
+SWING_STEP_NAMES = ('Idle', 'Address', 'Initial Take Away', 'Take Away', 'Full Rotation', 'Top of Swing',
+                    'Initial Downswing', 'Release', 'Impact', 'Follow Through', 'Finish')
+
+# Positions of motor1_setpoints..motor4_setpoints in Clearcore_8_Axis_Program.c (KP = 1);
+# board 2 runs the same tables, so axes 5-8 repeat axes 1-4
+_BOARD_SWING_POSITIONS = (
+    (2000, 2000,    0,   0),  # Idle
+    (2000, 2000,  900, 400),  # Address
+    (1500, 2000,  800, 400),  # Initial Take Away
+    (1000, 2000,  700, 270),  # Take Away
+    (500,     0,  600, 125),  # Full Rotation
+    (0,       0,  500,   0),  # Top of Swing
+    (500,     0,  600, 300),  # Initial Downswing
+    (1000,  500,  700, 356),  # Release
+    (2000, 2000,  800, 390),  # Impact
+    (2500, 3000,  900, 415),  # Follow Through
+    (4000, 4000, 1000, 623),  # Finish
+)
+SWING_POSITIONS = tuple(row + row for row in _BOARD_SWING_POSITIONS)
+
+PROFILES = ('trapezoid', 'scurve')
+PLAN_SEARCH_POINTS = 256                                # Cruise time candidates per step (S-curve)
+PLAN_SEARCH_SPAN = 8.0                                  # Candidates span lower bound .. SPAN x lower bound
+
+# ============================================================================
+#                         MOTION PLAN
+# ============================================================================
+
+class MotionPlan:
+    """
+    Result of plan_sequence(): one synchronized move per step.
+
+    Step k moves every axis from positions[k] to positions[k + 1]. Arrays
+    are indexed [step] or [step, axis - 1]; peak values are magnitudes.
+
+    Attributes:
+        profile (str): 'trapezoid' or 'scurve'
+        positions (ndarray): (steps + 1, axes) start position followed by each step's target
+        durations (ndarray): (steps,) move time of each step (seconds)
+        accel_times (ndarray): (steps,) acceleration (= deceleration) phase length
+        jerk_times (ndarray): (steps,) jerk ramp length (0 for trapezoid)
+        velocity, acceleration, jerk (ndarray): (steps, axes) per-axis peak values
+    """
+
+    def __init__(self, profile, positions, durations, accel_times, jerk_times, velocity, acceleration, jerk):
+        self.profile = profile
+        self.positions = positions
+        self.durations = durations
+        self.accel_times = accel_times
+        self.jerk_times = jerk_times
+        self.velocity = velocity
+        self.acceleration = acceleration
+        self.jerk = jerk
+
+    def step_count(self):
+        """Number of steps in the plan."""
+        return len(self.durations)
+
+    def total_time(self):
+        """Duration of the whole sequence in seconds."""
+        return float(self.durations.sum())
+
+    def setpoints(self, step):
+        """
+        Firmware V/A/P setpoints of one step for every axis.
+
+        Velocity and acceleration are rounded to whole units and never 0
+        (axes that do not move in a step get 1), positions to the nearest step.
+
+        Returns:
+            list: (velocity, acceleration, position) ints for axes 1..n
+        """
+        velocity = numpy.maximum(numpy.rint(self.velocity[step]), 1).astype(int)
+        acceleration = numpy.maximum(numpy.rint(self.acceleration[step]), 1).astype(int)
+        position = numpy.rint(self.positions[step + 1]).astype(int)
+        return [(int(v), int(a), int(p)) for v, a, p in zip(velocity, acceleration, position)]
+
+    def profile_fraction(self, step, times):
+        """
+        Normalized position (0..1) of one step at the given times (shared by all axes).
+
+        Args:
+            step (int): Step index
+            times (ndarray): Times from the start of the step (seconds)
+
+        Returns:
+            ndarray: Fraction of each axis' distance covered at each time
+        """
+        duration, accel_time, jerk_time = self.durations[step], self.accel_times[step], self.jerk_times[step]
+        if duration <= 0:
+            return numpy.ones_like(times)
+        # Unit acceleration shape (peak 1) over the acceleration phase, mirrored for deceleration
+        phase = numpy.where(times < duration / 2, times, duration - times)
+        phase = numpy.clip(phase, 0.0, accel_time)
+        if jerk_time > 0:
+            shape = numpy.minimum(numpy.minimum(phase, accel_time - phase) / jerk_time, 1.0)
+        else:
+            shape = numpy.ones_like(phase)
+        shape = numpy.where((phase > 0) & (phase < accel_time), shape, 0.0)
+        shape = numpy.where(times < duration / 2, shape, -shape)
+        # Integrate twice (trapezoidal rule) and normalize to the full distance
+        steps = numpy.diff(times)
+        velocity = numpy.concatenate(([0.0], numpy.cumsum((shape[1:] + shape[:-1]) / 2 * steps)))
+        position = numpy.concatenate(([0.0], numpy.cumsum((velocity[1:] + velocity[:-1]) / 2 * steps)))
+        return position / position[-1] if position[-1] > 0 else numpy.ones_like(times)
+
+    def sample(self, dt=0.001):
+        """
+        Sample the whole sequence for plotting or verification.
+
+        Args:
+            dt (float): Sample interval (seconds)
+
+        Returns:
+            tuple: (times (n,), positions (n, axes)) from the start of step 0
+        """
+        all_times, all_positions = [], []
+        offset = 0.0
+        for step in range(self.step_count()):
+            times = numpy.arange(0.0, self.durations[step] + dt / 2, dt)
+            times[-1] = self.durations[step]
+            fraction = self.profile_fraction(step, times)
+            start, target = self.positions[step], self.positions[step + 1]
+            all_times.append(offset + times)
+            all_positions.append(start + numpy.outer(fraction, target - start))
+            offset += self.durations[step]
+        return numpy.concatenate(all_times), numpy.concatenate(all_positions)
+
+# ============================================================================
+#                         PLANNING
+# ============================================================================
+
+def limits_array(limits, axes):
+    """Per-axis limit dictionary {axis: value} as an array for axes 1..axes."""
+    return numpy.array([float(limits[axis]) for axis in range(1, axes + 1)])
+
+def plan_sequence(targets, start=None, profile='trapezoid', velocity_limits=VELOCITY_LIMITS,
+                  acceleration_limits=ACCELERATION_LIMITS, jerk_limits=JERK_LIMITS):
+    """
+    Plan a multi-step sequence so all axes start and finish every step together.
+
+    Each step's duration is the shortest that keeps every axis within its
+    limits while sharing phase times. With u = cruise-inclusive time
+    (duration - accel time) and C, E, J the largest distance/limit ratios
+    over the axes, an axis moving D needs v = D/u, a = v/(accel - jerk time)
+    and j = a/jerk time; the trapezoid minimum is u = max(C, sqrt(E)),
+    accel time = E/u.
+
+    Args:
+        targets (sequence): (steps, axes) target position of every step
+        start (sequence): Position of every axis before step 0 (default targets[0])
+        profile (str): 'trapezoid' or 'scurve'
+        velocity_limits, acceleration_limits, jerk_limits (dict): {axis: limit}
+
+    Returns:
+        MotionPlan: Synchronized plan
+
+    Raises:
+        RuntimeError: NumPy is not installed
+        ValueError: Unknown profile or malformed positions
+    """
+    if numpy is None:
+        raise RuntimeError("The trajectory planner requires NumPy (pip install numpy)")
+    if profile not in PROFILES:
+        raise ValueError(f"Unknown profile {profile!r} (expected one of {', '.join(PROFILES)})")
+    targets = numpy.asarray(targets, dtype=float)
+    if targets.ndim != 2 or len(targets) == 0:
+        raise ValueError("targets must be a non-empty (steps, axes) table")
+    axes = targets.shape[1]
+    start = targets[0] if start is None else numpy.asarray(start, dtype=float)
+    if start.shape != (axes,):
+        raise ValueError(f"start must have {axes} positions")
+    positions = numpy.vstack((start, targets))
+    distance = numpy.abs(numpy.diff(positions, axis=0))              # (steps, axes)
+
+    # Tightest axis per step for each limit
+    velocity_bound = (distance / limits_array(velocity_limits, axes)).max(axis=1)
+    accel_bound = (distance / limits_array(acceleration_limits, axes)).max(axis=1)
+    moving = distance.max(axis=1) > 0
+
+    if profile == 'trapezoid':
+        cruise = numpy.maximum(velocity_bound, numpy.sqrt(accel_bound))
+        jerk_times = numpy.zeros_like(cruise)
+        with numpy.errstate(divide='ignore', invalid='ignore'):
+            accel_times = numpy.where(moving, accel_bound / cruise, 0.0)
+    else:
+        jerk_bound = (distance / limits_array(jerk_limits, axes)).max(axis=1)
+        lower = numpy.maximum.reduce([velocity_bound, numpy.sqrt(accel_bound), numpy.cbrt(4 * jerk_bound)])
+        candidates = lower[:, None] * numpy.geomspace(1.0, PLAN_SEARCH_SPAN, PLAN_SEARCH_POINTS)[None, :]
+        with numpy.errstate(divide='ignore', invalid='ignore'):
+            product = jerk_bound[:, None] / candidates                   # Required (accel - jerk) x jerk time
+            constant = numpy.maximum(accel_bound[:, None] / candidates, numpy.sqrt(product))
+            ramp = product / constant
+            total = candidates + constant + ramp
+            total = numpy.where(constant + ramp <= candidates * (1 + 1e-9), total, numpy.inf)
+        best = numpy.argmin(total, axis=1)
+        rows = numpy.arange(len(best))
+        cruise = numpy.where(moving, candidates[rows, best], 0.0)
+        jerk_times = numpy.where(moving, ramp[rows, best], 0.0)
+        accel_times = numpy.where(moving, constant[rows, best] + jerk_times, 0.0)
+
+    durations = cruise + accel_times
+    with numpy.errstate(divide='ignore', invalid='ignore'):
+        velocity = numpy.nan_to_num(distance / cruise[:, None])
+        acceleration = numpy.nan_to_num(velocity / (accel_times - jerk_times)[:, None])
+        jerk = numpy.nan_to_num(acceleration / jerk_times[:, None]) if profile == 'scurve' \
+            else numpy.zeros_like(acceleration)
+    return MotionPlan(profile, positions, durations, accel_times, jerk_times, velocity, acceleration, jerk)
+
+# ============================================================================
+#                         COMMAND LINE
+# ============================================================================
+
+def print_plan(plan, names=SWING_STEP_NAMES):
+    """Print per-step duration and per-axis V/A setpoints."""
+    axes = plan.positions.shape[1]
+    header = ''.join(f'{"S" + str(axis) + " V/A":>14}' for axis in range(1, axes + 1))
+    print(f'{"Step":<20}{"Time s":>8}{header}')
+    for step in range(plan.step_count()):
+        name = names[step] if step < len(names) else str(step)
+        cells = ''.join(f'{f"{v}/{a}":>14}' for v, a, _ in plan.setpoints(step))
+        print(f'{name:<20}{plan.durations[step]:>8.3f}{cells}')
+    print(f'{"Total":<20}{plan.total_time():>8.3f}')
+
+def main(argv=None):
+    """
+    Plan the firmware swing sequence and print the synchronized setpoints.
+
+    Returns:
+        int: Process exit status
+    """
+    parser = argparse.ArgumentParser(description="Time-synchronized 8-axis trajectory planner")
+    parser.add_argument('--profile', choices=PROFILES, default='trapezoid', help="motion profile")
+    parser.add_argument('--repeat', type=int, default=100, help="plans to time (default 100)")
+    args = parser.parse_args(argv)
+    if numpy is None:
+        print("The trajectory planner requires NumPy (pip install numpy)")
+        return 1
+
+    targets = SWING_POSITIONS
+    plan = plan_sequence(targets, profile=args.profile)
+    started = time.perf_counter()
+    for _ in range(args.repeat):
+        plan_sequence(targets, profile=args.profile)
+    elapsed = (time.perf_counter() - started) / max(args.repeat, 1)
+
+    print_plan(plan)
+    print(f"Planned {plan.step_count()} steps x {AXIS_COUNT} axes ({args.profile}) in {elapsed * 1000:.3f} ms")
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
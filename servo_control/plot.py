@@ -0,0 +1,270 @@
+"""
+Live position plot: per-axis history ring buffers and an incremental,
+downsampled strip chart for the Plot tab.
+
+AxisHistory records actual and setpoint position of every axis from the
+axis state store's feedback callbacks (I/O scheduler thread) into
+preallocated ring buffers sized for PLOT_WINDOW_SECONDS at PLOT_MAX_RATE_HZ.
+
+LivePlot turns that history into graph figures on the GUI thread. Samples
+are reduced to one min/max bucket per PLOT_BUCKET_PIXELS columns, so a
+30 s window at 500 Hz (15000 samples per axis) becomes a few hundred line
+figures per trace. Only completed buckets are drawn, each exactly once:
+every frame the existing figures are shifted left with a single move() and
+the new buckets are added at the right edge, figures that scroll out of the
+window are deleted. A full redraw from the ring buffers only happens when
+the tab becomes visible again or an axis is shown or hidden.
+
+Works with any graph object offering draw_line()/draw_lines()/move()/
+delete_figure()/erase() in pixel coordinates (a FreeSimpleGUI Graph with
+graph_bottom_left=(0, 0) and graph_top_right=size), so it does not import
+FreeSimpleGUI.
+"""
+
+import threading                           # AxisHistory lock
+import time                                # Frame pacing
+from array import array                    # Preallocated ring buffers
+from collections import deque              # Drawn buckets, oldest first
+
+from .config import (PLOT_BUCKET_PIXELS, PLOT_COLORS, PLOT_MAX_RATE_HZ, PLOT_SIZE,
+                     PLOT_WINDOW_SECONDS, POSITION_LIMITS, RENDER_FPS)
+from .state import AXIS_COUNT
+
+# ============================================================================
+#                         POSITION HISTORY
+# ============================================================================
+
+class AxisHistory:
+    """
+    Ring buffers of (time, position, position setpoint) for every axis.
+
+    Samples are addressed by a running per-axis sample number, so a reader
+    keeps a cursor and asks for everything since it (since()); samples that
+    have already been overwritten are skipped. Subscribe on_axis_change to
+    the AxisStateStore to feed it.
+
+    Args:
+        axis_count (int): Number of axes (index 0 unused)
+        window_seconds (float): History length to keep
+        max_rate (float): Highest feedback rate per axis (Hz)
+    """
+
+    def __init__(self, axis_count=AXIS_COUNT, window_seconds=PLOT_WINDOW_SECONDS, max_rate=PLOT_MAX_RATE_HZ):
+        self.axis_count = axis_count
+        self.capacity = int(window_seconds * max_rate) + max_rate   # One spare second for late readers
+        size = bytes(8 * self.capacity)
+        self.times = [array('d', size) for _ in range(axis_count + 1)]
+        self.positions = [array('d', size) for _ in range(axis_count + 1)]
+        self.setpoints = [array('d', size) for _ in range(axis_count + 1)]
+        self.counts = [0] * (axis_count + 1)            # Samples ever written per axis
+        self.lock = threading.Lock()
+
+    def on_axis_change(self, store, field_group, axes):
+        """AxisStateStore callback: record the new feedback of the changed axes."""
+        if field_group != 'feedback':
+            return
+        with store.lock:
+            samples = [(axis, store.feedback_time[axis], store.position[axis], store.position_setpoint[axis])
+                       for axis in axes]
+        with self.lock:
+            for axis, t, position, setpoint in samples:
+                slot = self.counts[axis] % self.capacity
+                self.times[axis][slot] = t
+                self.positions[axis][slot] = position
+                self.setpoints[axis][slot] = setpoint
+                self.counts[axis] += 1
+
+    def first_after(self, axis, t):
+        """Sample number of the oldest retained sample at or after time t."""
+        with self.lock:
+            low = max(0, self.counts[axis] - self.capacity)
+            high = self.counts[axis]
+            times = self.times[axis]
+            while low < high:
+                mid = (low + high) // 2
+                if times[mid % self.capacity] < t:
+                    low = mid + 1
+                else:
+                    high = mid
+            return low
+
+    def since(self, axis, cursor, until):
+        """
+        Samples of one axis from sample number cursor up to (not including) time until.
+
+        Args:
+            axis (int): Global axis number (1-8)
+            cursor (int): First sample number wanted
+            until (float): Stop at the first sample at or after this time
+
+        Returns:
+            tuple: ([(time, position, setpoint), ...], next cursor)
+        """
+        samples = []
+        with self.lock:
+            count = self.counts[axis]
+            cursor = max(cursor, count - self.capacity)
+            times, positions, setpoints = self.times[axis], self.positions[axis], self.setpoints[axis]
+            while cursor < count:
+                slot = cursor % self.capacity
+                t = times[slot]
+                if t >= until:
+                    break
+                samples.append((t, positions[slot], setpoints[slot]))
+                cursor += 1
+        return samples, cursor
+
+# ============================================================================
+#                         INCREMENTAL STRIP CHART
+# ============================================================================
+
+class LivePlot:
+    """
+    Scrolling min/max strip chart of actual (thick) and setpoint (thin)
+    position for the visible axes (GUI thread only).
+
+    Time is cut into buckets of PLOT_BUCKET_PIXELS pixels; bucket n covers
+    [n * bucket_seconds, (n + 1) * bucket_seconds) of time.monotonic(), so
+    bucket positions never depend on when a frame happens to run. Each
+    bucket draws one polyline per axis (previous level -> min -> max ->
+    last) and one setpoint segment.
+
+    Args:
+        graph: Graph element in pixel coordinates (see module docstring)
+        history (AxisHistory): Sample source
+        size (tuple): Graph (width, height) in pixels
+        window_seconds (float): Visible time span
+        bucket_pixels (int): Horizontal pixels per bucket
+        fps (float): Maximum frames per second
+    """
+
+    MARGIN = 4                                          # Pixels kept free above and below the traces
+
+    def __init__(self, graph, history, size=PLOT_SIZE, window_seconds=PLOT_WINDOW_SECONDS,
+                 bucket_pixels=PLOT_BUCKET_PIXELS, fps=RENDER_FPS):
+        self.graph = graph
+        self.history = history
+        self.width, self.height = size
+        self.bucket_pixels = bucket_pixels
+        self.bucket_count = self.width // bucket_pixels          # Buckets across the window
+        self.bucket_seconds = window_seconds / self.bucket_count
+        self.frame_interval = 1.0 / fps
+        self.last_frame = 0.0
+        low = min(limits[0] for limits in POSITION_LIMITS.values())
+        high = max(limits[1] for limits in POSITION_LIMITS.values())
+        self.y_low = low
+        self.y_scale = (self.height - 2 * self.MARGIN) / float(high - low or 1)
+        self.visible = {axis: True for axis in range(1, history.axis_count + 1)}
+        self.cursors = {}                               # axis -> next history sample number
+        self.previous = {}                              # axis -> (bucket, last y, setpoint y)
+        self.figures = deque()                          # (bucket, [figure ids]), oldest first
+        self.drawn = None                               # Newest bucket on screen
+        self.stale = True                               # Full redraw needed
+
+    def set_axis_visible(self, axis, visible):
+        """Show or hide one axis' traces (redraws on the next frame)."""
+        self.visible[axis] = bool(visible)
+        self.stale = True
+
+    def invalidate(self):
+        """Force a full redraw on the next frame."""
+        self.stale = True
+
+    def y(self, value):
+        """Graph y coordinate of a position value (clamped to the canvas)."""
+        y = self.MARGIN + (value - self.y_low) * self.y_scale
+        return min(max(y, 0), self.height)
+
+    def x(self, bucket):
+        """Graph x coordinate of a bucket's right edge."""
+        return self.width - (self.drawn - bucket) * self.bucket_pixels
+
+    def frame(self, visible=True, now=None):
+        """
+        Bring the chart up to date (call from the GUI loop every iteration).
+
+        Args:
+            visible (bool): Plot tab currently shown; hidden plots draw nothing
+                and redraw from history once shown again
+            now (float): time.monotonic() override (benchmarks)
+
+        Returns:
+            bool: True if anything was drawn
+        """
+        if not visible:
+            self.stale = True
+            return False
+        now = time.monotonic() if now is None else now
+        if now - self.last_frame < self.frame_interval:
+            return False
+        self.last_frame = now
+        latest = int(now / self.bucket_seconds) - 1     # Newest completed bucket
+        if self.stale or self.drawn is None or latest - self.drawn >= self.bucket_count:
+            self.reset(latest)
+        elif latest > self.drawn:
+            self.graph.move(-(latest - self.drawn) * self.bucket_pixels, 0)  # Scroll everything at once
+        else:
+            return False
+        floor = self.drawn + 1                          # Oldest bucket not yet drawn
+        self.drawn = latest
+        self.draw(latest, floor)
+        self.prune(latest)
+        return True
+
+    def reset(self, latest):
+        """Clear the canvas and rewind every visible axis to the start of the window."""
+        self.graph.erase()
+        self.figures.clear()
+        self.previous.clear()
+        start = (latest - self.bucket_count + 1) * self.bucket_seconds
+        self.cursors = {axis: self.history.first_after(axis, start)
+                        for axis, shown in self.visible.items() if shown}
+        self.drawn = latest - self.bucket_count
+        self.stale = False
+
+    def draw(self, latest, floor):
+        """Reduce each visible axis' new samples (buckets floor..latest) to min/max and draw them."""
+        until = (latest + 1) * self.bucket_seconds
+        new_figures = {}
+        for axis, cursor in self.cursors.items():
+            samples, self.cursors[axis] = self.history.since(axis, cursor, until)
+            if not samples:
+                continue
+            buckets = {}                                # bucket -> [min, max, last, setpoint]
+            for t, position, setpoint in samples:
+                bucket = max(int(t / self.bucket_seconds), floor)  # Late samples join the oldest undrawn bucket
+                entry = buckets.get(bucket)
+                if entry is None:
+                    buckets[bucket] = [position, position, position, setpoint]
+                else:
+                    if position < entry[0]:
+                        entry[0] = position
+                    elif position > entry[1]:
+                        entry[1] = position
+                    entry[2] = position
+                    entry[3] = setpoint
+            color = PLOT_COLORS[(axis - 1) % len(PLOT_COLORS)]
+            for bucket in sorted(buckets):
+                low, high, last, setpoint = buckets[bucket]
+                x = self.x(bucket)
+                y_last, y_setpoint = self.y(last), self.y(setpoint)
+                previous = self.previous.get(axis)
+                if previous is None:
+                    x_from, y_from, y_setpoint_from = x - self.bucket_pixels, self.y(low), y_setpoint
+                else:
+                    x_from, y_from, y_setpoint_from = self.x(previous[0]), previous[1], previous[2]
+                ids = new_figures.setdefault(bucket, [])
+                ids.append(self.graph.draw_lines([(x_from, y_from), (x, self.y(low)), (x, self.y(high)),
+                                                  (x, y_last)], color=color, width=2))
+                ids.append(self.graph.draw_line((x_from, y_setpoint_from), (x, y_setpoint),
+                                                color=color, width=1))
+                self.previous[axis] = (bucket, y_last, y_setpoint)
+        for bucket in sorted(new_figures):
+            self.figures.append((bucket, new_figures[bucket]))
+
+    def prune(self, latest):
+        """Delete figures of buckets that scrolled out of the window."""
+        oldest = latest - self.bucket_count
+        while self.figures and self.figures[0][0] <= oldest:
+            for figure in self.figures.popleft()[1]:
+                self.graph.delete_figure(figure)
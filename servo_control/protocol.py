@@ -0,0 +1,124 @@
+"""
+ClearCore wire protocol helpers: binary VALUES frame layout, text frame parsing
+and the priority classes of outgoing commands.
+
+Pure functions and constants shared by the transport, the message handlers
+and tools such as the benchmark - no I/O, no GUI.
+"""
+
+import struct                              # Binary telemetry frame decoding
+from collections import namedtuple         # Decoded frame records
+
+# ============================================================================
+#                         BINARY TELEMETRY FRAME
+# ============================================================================
+
+# Layout must match sendCurrentValuesBinary() in Clearcore_8_Axis_Program.c:
+#   uint8 magic | uint8 board | uint32 sequence | uint32 board millis() | int32[12] V,A,P x 4
+VALUES_FRAME_MAGIC = 0xC5                               # Never the first byte of a text frame
+VALUES_FRAME = struct.Struct('<BBII12i')                # Precompiled, 58 bytes
+
+# Decoded binary VALUES frame as placed on the message queue
+# (arrival = host time.monotonic() when the datagram was received)
+ValuesFrame = namedtuple('ValuesFrame', ['board', 'sequence', 'timestamp', 'values', 'arrival'])
+
+def decode_values_frame(data, arrival=0.0):
+    """
+    Decode a binary VALUES datagram.
+    
+    Args:
+        data (bytes): Raw datagram received from a ClearCore
+        arrival (float): Host monotonic receive time to stamp on the frame
+        
+    Returns:
+        ValuesFrame or None: Decoded frame, None if the datagram is not a binary frame
+    """
+    if len(data) != VALUES_FRAME.size or data[0] != VALUES_FRAME_MAGIC:
+        return None
+    fields = VALUES_FRAME.unpack(data)
+    return ValuesFrame(fields[1], fields[2], fields[3], fields[4:], arrival)
+
+def split_frame_trailer(message):
+    """
+    Split the ";SEQ:<n>;T:<ms>" trailer off a text frame.
+    
+    Returns:
+        tuple: (body, sequence, board_millis) - sequence/board_millis are None
+               for frames from firmware that does not send the trailer
+    """
+    body, sep, trailer = message.rpartition(';SEQ:')
+    if not sep:
+        return message, None, None
+    sequence, _, timestamp = trailer.partition(';T:')
+    try:
+        return body, int(sequence), int(timestamp)
+    except ValueError:
+        return body, None, None
+
+# ============================================================================
+#                         TEXT FRAME HELPERS
+# ============================================================================
+
+def strip_board_prefix(message):
+    """
+    Remove a leading "BOARD:n;" prefix from a text message.
+    
+    The transport already attributes every frame to its board by source
+    address, so the prefix is redundant; older replies omit it entirely.
+    Non-text frames (ValuesFrame) are returned unchanged.
+    """
+    if isinstance(message, str) and message.startswith("BOARD:"):
+        sep = message.find(';')
+        if sep != -1:
+            return message[sep + 1:]
+    return message
+
+def parse_values_text(message):
+    """
+    Parse a text "VALUES:v,a,p,..." body into integers (text format fallback).
+    
+    Returns:
+        list or None: The 12 V/A/P values, None if the frame is malformed
+    """
+    try:
+        parts = [int(p) for p in message.split(":")[1].split(",")]
+    except (IndexError, ValueError):
+        return None
+    return parts if len(parts) >= 12 else None
+
+# ============================================================================
+#                         COMMAND PRIORITY CLASSES
+# ============================================================================
+
+# Outgoing command classes, most urgent first (transmission order of the I/O scheduler)
+PRIORITY_ESTOP = 0                                      # Emergency stop (normally sent around the queue)
+PRIORITY_MOTION = 1                                     # Mode/Repeat/Start, servo enable/run, position clear
+PRIORITY_CONFIGURATION = 2                              # Setpoints, recipes, telemetry format/subscription
+PRIORITY_POLLING = 3                                    # REQUEST_* queries and PING (rate limited)
+COMMAND_PRIORITIES = (PRIORITY_ESTOP, PRIORITY_MOTION, PRIORITY_CONFIGURATION, PRIORITY_POLLING)
+
+MOTION_COMMANDS = ('Mode ', 'Repeat ', 'Start ', 'ESTOP_RESET', 'CLEAR_ALL_FAULTS')
+POLLING_COMMANDS = ('REQUEST_', 'PING:')
+
+def command_priority(cmd):
+    """
+    Priority class of an outgoing command.
+    
+    Args:
+        cmd (str): "BOARD:n;CMD:...\n" command string
+    
+    Returns:
+        int: PRIORITY_ESTOP, PRIORITY_MOTION, PRIORITY_CONFIGURATION or
+             PRIORITY_POLLING - anything not recognised counts as configuration
+    """
+    body = strip_board_prefix(cmd).strip()
+    if body.startswith("CMD:"):
+        body = body[4:]
+    if body.startswith("ESTOP:"):
+        return PRIORITY_ESTOP
+    if body.startswith(POLLING_COMMANDS):
+        return PRIORITY_POLLING
+    if body.startswith(MOTION_COMMANDS) or body.endswith("_ClearPosition") \
+            or (body[:1] == 'S' and body[2:4] in ('B1', 'B2')):
+        return PRIORITY_MOTION
+    return PRIORITY_CONFIGURATION
@@ -0,0 +1,332 @@
+"""
+Motion recipes: named 11-step, 8-axis sequences stored on the host and
+uploaded to both boards in bulk.
+
+A recipe replaces the compiled-in motor1_setpoints..motor4_setpoints step
+tables of the firmware: each step holds the velocity, acceleration and
+position of every axis (absolute values - the firmware KV/KA/KP gains are
+not applied). The auto sequence itself (step order and step conditions)
+stays in the firmware; the recipe supplies the values loadSetpoints() loads
+for each step, so swing variants switch without a firmware build.
+
+FILE FORMAT (RECIPE_DIR/<name>.json):
+    {"name": "short-swing", "description": "...", "profile": "trapezoid",
+     "steps": [{"name": "Idle", "positions": [8 ints],
+                "velocities": [8 ints], "accelerations": [8 ints]}, ... 11 steps]}
+
+    Steps without velocities/accelerations are filled by the trajectory
+    planner (servo_control.planner, needs NumPy) with the given profile, so
+    all axes start and finish each step together.
+
+UPLOAD (per board, "BOARD:n;CMD:" prefix):
+    RECIPE_BEGIN:<name>
+    RECIPE_ROWS:<first step>:<V,A,P x 4>|<V,A,P x 4>|...   (as many rows as fit
+                                                           in RECIPE_PACKET_BYTES)
+    RECIPE_COMMIT:<checksum>
+    The board activates the table only when a BEGIN opened the upload, every
+    row arrived and the checksum matches, and answers RECIPE:<name>,<checksum>
+    (or RECIPE_ERROR and a NAK). A whole recipe is 3-4 datagrams per board,
+    sent one acknowledged phase at a time and re-run from BEGIN until the
+    board confirms it (runtime.recipe_upload, servo_control.uploads).
+
+USAGE:
+    python3 -m servo_control.recipes list
+    python3 -m servo_control.recipes check NAME [NAME ...]
+    python3 -m servo_control.recipes new NAME
+"""
+
+import argparse                            # Command line options
+import json                                # Recipe files
+import os                                  # Recipe directory
+import re                                  # Recipe name check
+
+from . import runtime
+from .config import (ACCELERATION_LIMITS, POSITION_LIMITS, RECIPE_DIR, RECIPE_PACKET_BYTES,
+                     VELOCITY_LIMITS)
+from .planner import SWING_STEP_NAMES, plan_sequence
+from .state import AXES_PER_BOARD, AXIS_COUNT, recipe_status
+
+try:
+    import numpy                           # Optional - vectorized validation
+except ImportError:
+    numpy = None
+
+RECIPE_STEPS = len(SWING_STEP_NAMES)                    # Firmware RECIPE_STEPS
+RECIPE_NAME_PATTERN = re.compile(r'^[A-Za-z0-9_-]{1,23}$')   # Fits RECIPE_NAME_LENGTH, no separators
+RECIPE_FIELDS = ('positions', 'velocities', 'accelerations')
+RECIPE_VALUE_NAMES = ('position', 'velocity', 'acceleration')
+
+# ============================================================================
+#                         RECIPE FORMAT
+# ============================================================================
+
+class Recipe:
+    """
+    One named sequence: per-step, per-axis V/A/P tables.
+
+    Tables are lists indexed [step][axis - 1].
+
+    Args:
+        name (str): Recipe name (letters, digits, '-' and '_', at most 23)
+        positions, velocities, accelerations (list): RECIPE_STEPS x AXIS_COUNT ints
+        step_names (sequence): Name of each step
+        description (str): Free text
+    """
+
+    def __init__(self, name, positions, velocities, accelerations, step_names=SWING_STEP_NAMES, description=''):
+        self.name = name
+        self.positions = positions
+        self.velocities = velocities
+        self.accelerations = accelerations
+        self.step_names = list(step_names)
+        self.description = description
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Build a recipe from its JSON form, planning missing velocities/accelerations.
+
+        Raises:
+            ValueError: Malformed recipe
+        """
+        try:
+            steps = data['steps']
+            positions = [[int(value) for value in step['positions']] for step in steps]
+        except (KeyError, TypeError, ValueError) as e:
+            raise ValueError(f"Malformed recipe: {e}")
+        velocities = [step.get('velocities') for step in steps]
+        accelerations = [step.get('accelerations') for step in steps]
+        if any(row is None for row in velocities + accelerations):
+            # Synchronized profile; step 0 starts from the previous cycle's last step
+            try:
+                plan = plan_sequence(positions, start=positions[-1], profile=data.get('profile', 'trapezoid'))
+            except RuntimeError as e:
+                raise ValueError(f"{e} to fill in missing velocities/accelerations")
+            for step in range(len(steps)):
+                planned = plan.setpoints(step)
+                if velocities[step] is None:
+                    velocities[step] = [v for v, _, _ in planned]
+                if accelerations[step] is None:
+                    accelerations[step] = [a for _, a, _ in planned]
+        try:
+            velocities = [[int(value) for value in row] for row in velocities]
+            accelerations = [[int(value) for value in row] for row in accelerations]
+        except (TypeError, ValueError) as e:
+            raise ValueError(f"Malformed recipe: {e}")
+        return cls(data.get('name', ''), positions, velocities, accelerations,
+                   [step.get('name', str(index)) for index, step in enumerate(steps)],
+                   data.get('description', ''))
+
+    def to_dict(self):
+        """JSON form with every value explicit."""
+        return {
+            'name': self.name,
+            'description': self.description,
+            'steps': [{'name': self.step_names[step], 'positions': self.positions[step],
+                       'velocities': self.velocities[step], 'accelerations': self.accelerations[step]}
+                      for step in range(len(self.positions))],
+        }
+
+    def board_rows(self, board):
+        """
+        Firmware rows of one board: per step, V,A,P of its servos 1-4.
+
+        Returns:
+            list: RECIPE_STEPS lists of 12 ints
+        """
+        first = (board - 1) * AXES_PER_BOARD
+        return [[value for axis in range(first, first + AXES_PER_BOARD)
+                 for value in (self.velocities[step][axis], self.accelerations[step][axis],
+                               self.positions[step][axis])]
+                for step in range(len(self.positions))]
+
+def validate_recipe(recipe, position_limits=POSITION_LIMITS, velocity_limits=VELOCITY_LIMITS,
+                    acceleration_limits=ACCELERATION_LIMITS):
+    """
+    Check a recipe's shape and every value against the per-axis limits.
+
+    Values are checked in one vectorized comparison of the whole
+    (field, step, axis) table when NumPy is installed. Velocities and
+    accelerations must be at least 1 (the ClearCore rejects 0 limits).
+
+    Returns:
+        list: Error messages, empty if the recipe can be uploaded
+    """
+    errors = []
+    if not RECIPE_NAME_PATTERN.match(recipe.name or ''):
+        errors.append(f"name {recipe.name!r} must be 1-23 letters, digits, '-' or '_'")
+    tables = [recipe.positions, recipe.velocities, recipe.accelerations]
+    for field, table in zip(RECIPE_FIELDS, tables):
+        if len(table) != RECIPE_STEPS or any(len(row) != AXIS_COUNT for row in table):
+            errors.append(f"{field} must be {RECIPE_STEPS} steps x {AXIS_COUNT} axes")
+    if errors:
+        return errors
+
+    axes = range(1, AXIS_COUNT + 1)
+    low = [[position_limits[axis][0] for axis in axes], [1] * AXIS_COUNT, [1] * AXIS_COUNT]
+    high = [[position_limits[axis][1] for axis in axes], [velocity_limits[axis] for axis in axes],
+            [acceleration_limits[axis] for axis in axes]]
+    if numpy is not None:
+        values = numpy.array(tables)                                 # (field, step, axis)
+        low, high = numpy.array(low)[:, None, :], numpy.array(high)[:, None, :]
+        bad = numpy.argwhere((values < low) | (values > high))
+        failures = [(int(f), int(s), int(a)) for f, s, a in bad]
+        low, high = low[:, 0, :], high[:, 0, :]
+    else:
+        failures = [(f, s, a) for f in range(3) for s in range(RECIPE_STEPS) for a in range(AXIS_COUNT)
+                    if not low[f][a] <= tables[f][s][a] <= high[f][a]]
+    for field, step, axis in failures:
+        errors.append(f"step {step} ({recipe.step_names[step]}) axis {axis + 1}: {RECIPE_VALUE_NAMES[field]} "
+                      f"{tables[field][step][axis]} outside {low[field][axis]}-{high[field][axis]}")
+    return errors
+
+# ============================================================================
+#                         STORAGE
+# ============================================================================
+
+def recipe_path(name, directory=RECIPE_DIR):
+    return os.path.join(directory, f"{name}.json")
+
+def list_recipes(directory=RECIPE_DIR):
+    """Names of the recipes stored in directory (sorted)."""
+    if not os.path.isdir(directory):
+        return []
+    return sorted(entry[:-5] for entry in os.listdir(directory) if entry.endswith('.json'))
+
+def load_recipe(name, directory=RECIPE_DIR):
+    """
+    Load a stored recipe by name.
+
+    Raises:
+        FileNotFoundError: No such recipe
+        ValueError: Malformed recipe file
+    """
+    with open(recipe_path(name, directory)) as f:
+        try:
+            data = json.load(f)
+        except ValueError as e:
+            raise ValueError(f"{name}: {e}")
+    data.setdefault('name', name)
+    return Recipe.from_dict(data)
+
+def save_recipe(recipe, directory=RECIPE_DIR):
+    """Write a recipe to directory/<name>.json (creating the directory)."""
+    os.makedirs(directory, exist_ok=True)
+    with open(recipe_path(recipe.name, directory), 'w') as f:
+        json.dump(recipe.to_dict(), f, indent=1)
+
+# ============================================================================
+#                         UPLOAD
+# ============================================================================
+
+def recipe_checksum(rows):
+    """Firmware recipeChecksum(): checksum * 31 + value over every value, 32-bit wrap."""
+    checksum = 0
+    for row in rows:
+        for value in row:
+            checksum = (checksum * 31 + (value & 0xFFFFFFFF)) & 0xFFFFFFFF
+    return checksum
+
+def recipe_commands(recipe, board, packet_bytes=RECIPE_PACKET_BYTES):
+    """
+    Datagrams that upload a recipe to one board.
+
+    Returns:
+        tuple: (list of command strings, expected checksum)
+    """
+    prefix = f"BOARD:{board};CMD:"
+    rows = recipe.board_rows(board)
+    commands = [f"{prefix}RECIPE_BEGIN:{recipe.name}\n"]
+    first, chunk = 0, []
+    for step, row in enumerate(rows):
+        text = ','.join(str(value) for value in row)
+        if chunk and len(f"{prefix}RECIPE_ROWS:{first}:") + len('|'.join(chunk + [text])) + 1 > packet_bytes:
+            commands.append(f"{prefix}RECIPE_ROWS:{first}:{'|'.join(chunk)}\n")
+            first, chunk = step, []
+        chunk.append(text)
+    commands.append(f"{prefix}RECIPE_ROWS:{first}:{'|'.join(chunk)}\n")
+    checksum = recipe_checksum(rows)
+    commands.append(f"{prefix}RECIPE_COMMIT:{checksum}\n")
+    return commands, checksum
+
+def upload_recipe(recipe, boards=(1, 2)):
+    """
+    Validate a recipe and start its upload to the given boards.
+
+    The I/O scheduler drives each board's transaction until the board
+    confirms it (state.recipe_upload_status 'confirmed', state.recipe_status
+    updated) or RECIPE_UPLOAD_ATTEMPTS runs failed ('failed'); see
+    recipe_confirmed().
+
+    Returns:
+        dict: board -> expected checksum
+
+    Raises:
+        ValueError: The recipe failed validation (message lists every error)
+    """
+    errors = validate_recipe(recipe)
+    if errors:
+        raise ValueError(f"Recipe {recipe.name!r} is invalid: " + '; '.join(errors))
+    checksums = {}
+    for board in boards:
+        commands, checksums[board] = recipe_commands(recipe, board)
+        phases = [commands[:1], commands[1:-1], commands[-1:]]   # BEGIN, ROWS, COMMIT
+        runtime.recipe_upload.begin(board, recipe.name, checksums[board], phases, runtime.queue_command)
+    print(f"Debug: Uploading recipe {recipe.name} to boards {', '.join(str(board) for board in boards)}")
+    return checksums
+
+def recipe_confirmed(name, checksums):
+    """True once every board in checksums reports the recipe as active."""
+    return all(recipe_status[board] == (name, checksum) for board, checksum in checksums.items())
+
+# ============================================================================
+#                         COMMAND LINE
+# ============================================================================
+
+def main(argv=None):
+    """
+    List, check or create recipe files (uploads go through the daemon or GUI).
+
+    Returns:
+        int: Process exit status (1 if a checked recipe is invalid)
+    """
+    parser = argparse.ArgumentParser(description="Manage motion recipes")
+    parser.add_argument('--dir', default=RECIPE_DIR, help=f"recipe directory (default {RECIPE_DIR})")
+    commands = parser.add_subparsers(dest='command', required=True)
+    commands.add_parser('list', help="list stored recipes")
+    check = commands.add_parser('check', help="validate recipes against the axis limits")
+    check.add_argument('names', nargs='+')
+    new = commands.add_parser('new', help="write a template recipe (all axes at their lower position limit)")
+    new.add_argument('name')
+    args = parser.parse_args(argv)
+
+    if args.command == 'list':
+        for name in list_recipes(args.dir):
+            print(name)
+        return 0
+    if args.command == 'new':
+        positions = [[POSITION_LIMITS[axis][0] for axis in range(1, AXIS_COUNT + 1)] for _ in range(RECIPE_STEPS)]
+        velocities = [[1000] * AXIS_COUNT for _ in range(RECIPE_STEPS)]
+        accelerations = [[2000] * AXIS_COUNT for _ in range(RECIPE_STEPS)]
+        recipe = Recipe(args.name, positions, velocities, accelerations)
+        errors = validate_recipe(recipe)
+        if errors:
+            print('\n'.join(errors))
+            return 1
+        save_recipe(recipe, args.dir)
+        print(f"Wrote {recipe_path(args.name, args.dir)}")
+        return 0
+    status = 0
+    for name in args.names:
+        try:
+            errors = validate_recipe(load_recipe(name, args.dir))
+        except (OSError, ValueError) as e:
+            errors = [str(e)]
+        print(f"{name}: {'OK' if not errors else 'INVALID'}")
+        for error in errors:
+            print(f"    {error}")
+        status = status or (1 if errors else 0)
+    return status
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,352 @@
+"""
+Telemetry recorder: append-only columnar binary files fed from the transport.
+
+Every received VALUES frame, every STATE_ENGINE report and every command
+sent is recorded. Capturing on the transport and sending threads only
+appends a tuple to an in-memory batch; the recorder thread writes the batch
+every RECORD_FLUSH_INTERVAL with one slice assignment per column into
+preallocated, memory-mapped segment files. Hours of 500 Hz recording cost
+almost no CPU and no per-frame system calls.
+
+FILE LAYOUT (<session>/<stream>-<segment>.screc):
+    bytes 0-7       magic b'SCREC001'
+    bytes 8-15      uint64 LE number of valid rows (written after the rows)
+    bytes 16-19     uint32 LE length of the JSON header that follows
+    JSON header     stream, capacity, columns [{name, dtype, offset}],
+                    time_origin {wall, monotonic}, segment
+    columns         each column one contiguous little-endian block of
+                    capacity items at its offset (64-byte aligned)
+
+    A segment is rotated when any stream fills up or after
+    RECORD_SEGMENT_SECONDS. "time" columns are host time.monotonic();
+    wall time = time_origin.wall + (time - time_origin.monotonic).
+
+STREAMS:
+    frames      time, board, sequence, board_ms, velocity_1, acceleration_1,
+                position_1 ... position_4   (servo n of board b = axis (b-1)*4+n)
+    steps       time, board, step
+    commands    time, board, command (first RECORD_COMMAND_BYTES bytes)
+
+LOADING:
+    load_segment(path) returns {column: numpy array} (zero-copy memmap views)
+    when NumPy is installed, otherwise {column: array/list};
+    load_session(directory) concatenates all segments per stream.
+"""
+
+import glob                                # Segment discovery when loading
+import json                                # Self-describing segment header
+import mmap                                # Memory-mapped segment files
+import os                                  # Preallocation and directories
+import struct                              # Header fields
+import sys                                 # Byte order check
+import threading                           # Recorder thread and batch lock
+import time                                # Timestamps and rotation
+from array import array                    # Column batches without NumPy
+
+from .config import (RECORD_COMMAND_BYTES, RECORD_EVENT_ROWS, RECORD_FLUSH_INTERVAL,
+                     RECORD_SEGMENT_ROWS, RECORD_SEGMENT_SECONDS)
+from .protocol import ValuesFrame, parse_values_text, strip_board_prefix
+
+try:
+    import numpy                           # Optional - zero-copy loading
+except ImportError:
+    numpy = None
+
+# ============================================================================
+#                         SEGMENT FILE FORMAT
+# ============================================================================
+
+SEGMENT_MAGIC = b'SCREC001'
+SEGMENT_HEADER_SIZE = 4096                              # Magic, row count and JSON header
+SEGMENT_ALIGN = 64                                      # Column start alignment (bytes)
+SEGMENT_ROWS_FIELD = struct.Struct('<Q')                # Valid row count at byte 8
+SEGMENT_JSON_LENGTH = struct.Struct('<I')               # JSON header length at byte 16
+
+# Little-endian dtype (NumPy spelling) -> array typecode; 'S<n>' is fixed-width bytes
+DTYPE_TYPECODES = {'<f8': 'd', '<u4': 'I', '<i4': 'i', '<u1': 'B'}
+
+# Column layout per stream: [(name, dtype)]
+RECORD_STREAMS = {
+    'frames': [('time', '<f8'), ('board', '<u1'), ('sequence', '<u4'), ('board_ms', '<u4')]
+              + [(f'{field}_{servo}', '<i4') for servo in range(1, 5)
+                 for field in ('velocity', 'acceleration', 'position')],
+    'steps': [('time', '<f8'), ('board', '<u1'), ('step', '<i4')],
+    'commands': [('time', '<f8'), ('board', '<u1'), ('command', f'S{RECORD_COMMAND_BYTES}')],
+}
+
+def dtype_size(dtype):
+    return int(dtype[1:]) if dtype.startswith('S') else array(DTYPE_TYPECODES[dtype]).itemsize
+
+class ColumnSegment:
+    """
+    One preallocated, memory-mapped segment file of a single stream.
+
+    Args:
+        path (str): File to create
+        stream (str): Stream name (key of RECORD_STREAMS)
+        capacity (int): Rows the file can hold
+        segment (int): Segment number within the session
+    """
+
+    def __init__(self, path, stream, capacity, segment):
+        self.path = path
+        self.columns = []                               # (name, dtype, offset, itemsize)
+        offset = SEGMENT_HEADER_SIZE
+        for name, dtype in RECORD_STREAMS[stream]:
+            size = dtype_size(dtype)
+            self.columns.append((name, dtype, offset, size))
+            offset += -(-capacity * size // SEGMENT_ALIGN) * SEGMENT_ALIGN
+        self.capacity = capacity
+        self.rows = 0
+        self.created = time.monotonic()
+        header = json.dumps({
+            'stream': stream,
+            'segment': segment,
+            'capacity': capacity,
+            'columns': [{'name': name, 'dtype': dtype, 'offset': column_offset}
+                        for name, dtype, column_offset, _ in self.columns],
+            'time_origin': {'wall': time.time(), 'monotonic': self.created},
+        }).encode()
+        with open(path, 'wb') as f:
+            f.truncate(offset)
+            if hasattr(os, 'posix_fallocate'):
+                os.posix_fallocate(f.fileno(), 0, offset)   # Reserve blocks now, not per write
+        self.file = open(path, 'r+b')
+        self.map = mmap.mmap(self.file.fileno(), offset)
+        self.map[0:8] = SEGMENT_MAGIC
+        self.map[8:16] = SEGMENT_ROWS_FIELD.pack(0)
+        self.map[16:20] = SEGMENT_JSON_LENGTH.pack(len(header))
+        self.map[20:20 + len(header)] = header
+
+    def free(self):
+        return self.capacity - self.rows
+
+    def append(self, rows):
+        """
+        Write a batch of row tuples (at most free() rows) column by column.
+        """
+        for index, (name, dtype, offset, size) in enumerate(self.columns):
+            values = [row[index] for row in rows]
+            if dtype.startswith('S'):
+                data = b''.join(value[:size].ljust(size, b'\0') for value in values)
+            else:
+                data = array(DTYPE_TYPECODES[dtype], values).tobytes()
+            start = offset + self.rows * size
+            self.map[start:start + len(data)] = data
+        self.rows += len(rows)
+        self.map[8:16] = SEGMENT_ROWS_FIELD.pack(self.rows)  # Publish only complete rows
+
+    def close(self):
+        self.map.flush()
+        self.map.close()
+        self.file.close()
+
+# ============================================================================
+#                         RECORDER
+# ============================================================================
+
+def create_session_directory(directory):
+    """
+    Create a new, empty session directory named after the current time.
+
+    Another recorder started in the same second (e.g. the GUI and
+    "daemon --record" sharing RECORD_DIR) would otherwise open the same
+    segment files and truncate them, so an existing name gets a -2, -3, ...
+    suffix instead of being reused.
+
+    Args:
+        directory (str): Parent directory, created if missing
+
+    Returns:
+        str: Path of the created session directory
+    """
+    os.makedirs(directory, exist_ok=True)
+    base = os.path.join(directory, time.strftime('%Y%m%d-%H%M%S'))
+    session, suffix = base, 1
+    while True:
+        try:
+            os.mkdir(session)                           # Atomic - fails if another recorder got there first
+            return session
+        except FileExistsError:
+            suffix += 1
+            session = f'{base}-{suffix}'
+
+class TelemetryRecorder(threading.Thread):
+    """
+    Background recorder attached to a UDPTransportEngine.
+
+    on_frame() and on_command() run on the transport and sending threads and
+    only append to the pending batch; the recorder thread swaps the batch
+    out and writes it, rotating all streams to a new segment together.
+
+    Args:
+        directory (str): Parent directory; a new timestamped session directory is created in it
+        transport: UDPTransportEngine to record (subscribe and subscribe_sends)
+    """
+
+    def __init__(self, directory, transport):
+        threading.Thread.__init__(self, name="Telemetry-Recorder", daemon=True)
+        if sys.byteorder != 'little':
+            raise RuntimeError("Telemetry recorder writes little-endian columns only")
+        self.session = create_session_directory(directory)
+        self.lock = threading.Lock()
+        self.pending = {stream: [] for stream in RECORD_STREAMS}
+        self.segments = {}                              # stream -> open ColumnSegment
+        self.segment_number = 0
+        self.recorded = {stream: 0 for stream in RECORD_STREAMS}
+        self.stopped = threading.Event()
+        transport.subscribe(self.on_frame)
+        transport.subscribe_sends(self.on_command)
+
+    def on_frame(self, board, frame):
+        # Transport loop thread - keep this to one tuple append
+        if isinstance(frame, ValuesFrame):
+            row = (frame.arrival, board, frame.sequence, frame.timestamp) + tuple(frame.values[:12])
+            stream = 'frames'
+        else:
+            message = strip_board_prefix(frame)
+            if message.startswith('VALUES:'):
+                values = parse_values_text(message)
+                if values is None:
+                    return
+                row = (time.monotonic(), board, 0, 0) + tuple(values[:12])
+                stream = 'frames'
+            elif message.startswith('STATE_ENGINE:'):
+                try:
+                    step = int(message.split(':')[1].split(',')[0])
+                except ValueError:
+                    return
+                row = (time.monotonic(), board, step)
+                stream = 'steps'
+            else:
+                return
+        with self.lock:
+            self.pending[stream].append(row)
+
+    def on_command(self, board, cmd):
+        row = (time.monotonic(), board, cmd.strip().encode('utf-8', 'replace'))
+        with self.lock:
+            self.pending['commands'].append(row)
+
+    def open_segments(self):
+        self.segment_number += 1
+        for stream in RECORD_STREAMS:
+            capacity = RECORD_SEGMENT_ROWS if stream == 'frames' else RECORD_EVENT_ROWS
+            path = os.path.join(self.session, f'{stream}-{self.segment_number:04d}.screc')
+            self.segments[stream] = ColumnSegment(path, stream, capacity, self.segment_number)
+
+    def close_segments(self):
+        for segment in self.segments.values():
+            segment.close()
+        self.segments = {}
+
+    def flush(self):
+        """Write everything pending (recorder thread, or the caller after stop)."""
+        with self.lock:
+            batches, self.pending = self.pending, {stream: [] for stream in RECORD_STREAMS}
+        if not any(batches.values()):
+            return
+        if not self.segments or time.monotonic() - self.segments['frames'].created >= RECORD_SEGMENT_SECONDS:
+            self.close_segments()
+            self.open_segments()
+        for stream, rows in batches.items():
+            self.recorded[stream] += len(rows)
+            while rows:
+                segment = self.segments[stream]
+                if not segment.free():
+                    self.close_segments()
+                    self.open_segments()
+                    continue
+                count = min(len(rows), segment.free())
+                segment.append(rows[:count])
+                rows = rows[count:]
+
+    def run(self):
+        while not self.stopped.wait(RECORD_FLUSH_INTERVAL):
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"Debug: Telemetry recorder flush failed: {e}")
+
+    def stop(self):
+        """Stop the thread, write what is pending and close the segment files."""
+        self.stopped.set()
+        if self.is_alive():
+            self.join()
+        self.flush()
+        self.close_segments()
+        print(f"Debug: Recorded {self.recorded['frames']} frames, {self.recorded['steps']} steps, "
+              f"{self.recorded['commands']} commands to {self.session}")
+
+# ============================================================================
+#                         LOADING
+# ============================================================================
+
+def read_segment_header(path):
+    """
+    Read a segment's header.
+
+    Returns:
+        tuple: (header dict, valid row count)
+    """
+    with open(path, 'rb') as f:
+        head = f.read(SEGMENT_HEADER_SIZE)
+    if head[0:8] != SEGMENT_MAGIC:
+        raise ValueError(f"{path} is not a telemetry recording segment")
+    rows = SEGMENT_ROWS_FIELD.unpack_from(head, 8)[0]
+    length = SEGMENT_JSON_LENGTH.unpack_from(head, 16)[0]
+    return json.loads(head[20:20 + length]), rows
+
+def load_segment(path):
+    """
+    Load one segment's valid rows.
+
+    Returns:
+        dict: column name -> numpy array (read-only memmap view) when NumPy is
+              installed, else array (numeric) or list of bytes (text columns)
+    """
+    header, rows = read_segment_header(path)
+    columns = {}
+    if numpy is not None:
+        data = numpy.memmap(path, mode='r')
+        for column in header['columns']:
+            size = dtype_size(column['dtype'])
+            raw = data[column['offset']:column['offset'] + rows * size]
+            columns[column['name']] = raw.view(numpy.dtype(column['dtype']))
+        return columns
+    with open(path, 'rb') as f:
+        for column in header['columns']:
+            size = dtype_size(column['dtype'])
+            f.seek(column['offset'])
+            raw = f.read(rows * size)
+            if column['dtype'].startswith('S'):
+                columns[column['name']] = [raw[i:i + size].rstrip(b'\0') for i in range(0, len(raw), size)]
+            else:
+                values = array(DTYPE_TYPECODES[column['dtype']])
+                values.frombytes(raw)
+                columns[column['name']] = values
+    return columns
+
+def load_session(directory):
+    """
+    Load every segment of a recording session.
+
+    Returns:
+        dict: stream -> {column: values concatenated over segments in order}
+    """
+    session = {}
+    for stream in RECORD_STREAMS:
+        paths = sorted(glob.glob(os.path.join(directory, f'{stream}-*.screc')))
+        parts = [load_segment(path) for path in paths]
+        if not parts:
+            continue
+        if numpy is not None:
+            session[stream] = {name: numpy.concatenate([part[name] for part in parts]) for name in parts[0]}
+            continue
+        session[stream] = {}
+        for name, first in parts[0].items():
+            merged = [] if isinstance(first, list) else array(first.typecode)
+            for part in parts:
+                merged.extend(part[name])
+            session[stream][name] = merged
+    return session
@@ -0,0 +1,131 @@
+"""
+GUI update path shared by the I/O scheduler and the GUI thread.
+
+GuiUpdateBatch collects element updates off the GUI thread; GuiRenderer
+applies them on the GUI thread with dirty checking and a frame rate cap.
+Works with any window object offering AllKeysDict/refresh()/
+write_event_value(), so it does not import FreeSimpleGUI.
+"""
+
+import threading                           # GuiUpdateBatch lock
+import time                                # Frame pacing
+
+from .config import RENDER_FPS
+
+# ============================================================================
+#                         GUI UPDATE BATCHING & RENDERING
+# ============================================================================
+
+IO_UPDATE_EVENT = '-IO_UPDATE-'                        # window event carrying pending GUI updates
+
+class GuiUpdateBatch:
+    """
+    Pending GUI element updates produced off the GUI thread.
+    
+    Message handlers write into a batch instead of the window (update_element()
+    records here when given a batch). Repeated updates to the same element
+    collapse to the newest value; the GUI thread takes the whole batch and
+    renders it in one pass when it receives IO_UPDATE_EVENT.
+    """
+    
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.pending = {}                               # key -> (args, kwargs), newest wins
+        self.posted = False                             # True while an IO_UPDATE_EVENT is in flight
+
+    def record(self, key, args, kwargs):
+        """Record an element update (called from the I/O scheduler thread)."""
+        with self.lock:
+            old = self.pending.get(key)
+            if old is not None:
+                merged = dict(old[1])
+                merged.update(kwargs)
+                kwargs = merged
+                args = args or old[0]
+            self.pending[key] = (args, kwargs)
+
+    def refresh(self):
+        """No-op - the GUI thread redraws after applying the batch."""
+        pass
+
+    def needs_post(self):
+        """True once per batch: caller must post IO_UPDATE_EVENT."""
+        with self.lock:
+            if self.posted or not self.pending:
+                return False
+            self.posted = True
+            return True
+
+    def take(self):
+        """Remove and return all pending updates as {key: (args, kwargs)} (GUI thread)."""
+        with self.lock:
+            pending, self.pending = self.pending, {}
+            self.posted = False
+        return pending
+
+class GuiRenderer:
+    """
+    Dirty-checked, frame-rate-governed rendering stage (GUI thread only).
+    
+    Remembers what every element currently shows and skips updates that
+    would not change it, so steady telemetry (e.g. a servo holding position)
+    costs no Tk work at all. Changed elements are updated immediately but
+    window.refresh() runs at most once per frame, capped at RENDER_FPS.
+    All data-driven and button-state updates go through here so the cache
+    always matches the screen.
+    """
+    
+    def __init__(self, window, fps=RENDER_FPS):
+        self.window = window
+        self.frame_interval = 1.0 / fps                 # Minimum seconds between refreshes
+        self.displayed = {}                             # key -> (args, kwargs) currently shown
+        self.dirty = False                              # Element changed since last refresh
+        self.last_frame = 0.0
+        self.skipped = 0                                # Updates suppressed by the dirty check
+
+    def update(self, key, *args, **kwargs):
+        """Update an element only if the new content differs from what is displayed."""
+        state = (args, kwargs)
+        if self.displayed.get(key) == state:
+            self.skipped += 1
+            return
+        element = self.window.AllKeysDict.get(key)
+        if element is None:
+            return
+        element.update(*args, **kwargs)
+        self.displayed[key] = state
+        self.dirty = True
+
+    def record(self, key, args, kwargs):
+        """update_element() entry point."""
+        self.update(key, *args, **kwargs)
+
+    def apply(self, pending):
+        """Render a batch taken from GuiUpdateBatch.take()."""
+        for key, (args, kwargs) in pending.items():
+            self.update(key, *args, **kwargs)
+
+    def frame(self):
+        """Refresh the window if anything changed and a frame is due."""
+        now = time.monotonic()
+        if self.dirty and now - self.last_frame >= self.frame_interval:
+            self.window.refresh()
+            self.dirty = False
+            self.last_frame = now
+
+def update_element(window, key, *args, **kwargs):
+    """
+    Update a GUI element if the layout contains it.
+    
+    Board panels do not carry every control the firmware reports on
+    (e.g. Mode/Repeat/Start), so message handlers skip missing keys
+    instead of raising. Given a GuiUpdateBatch instead of a window, the
+    update is recorded for the GUI thread to render; given the GuiRenderer
+    it is dirty-checked.
+    """
+    if isinstance(window, (GuiUpdateBatch, GuiRenderer)):
+        window.record(key, args, kwargs)                # Batched or dirty-checked rendering
+        return
+    element = window.AllKeysDict.get(key)
+    if element is not None:
+        element.update(*args, **kwargs)
@@ -0,0 +1,183 @@
+"""
+Session replay: recorded telemetry fed back through the normal parsing and
+rendering path.
+
+ReplaySource stands where the UDP transport sits. It offers the same
+subscribe(callback, board=None) frame API, so the GUI (or any consumer)
+receives recorded (board, frame) pairs exactly as if they came off the
+wire - VALUES frames as ValuesFrame records, state engine steps as
+"STATE_ENGINE:<step>" text. send() drops commands, so buttons pressed
+during a replay never reach the controllers.
+
+Speed 1.0 replays in real time, N replays N times faster and 0 replays as
+fast as possible. seek(seconds) jumps anywhere in the session through the
+time index (binary search over the recorded arrival times).
+
+Deterministic benchmark use: events() yields every recorded frame in
+order without pacing or threads (see Servo_Benchmark.py --replay).
+"""
+
+import threading                           # Playback thread
+import time                                # Pacing
+from bisect import bisect_left             # Time index lookup
+
+from .protocol import ValuesFrame
+from .recorder import RECORD_STREAMS, load_session
+
+REPLAY_MAX_WAIT = 0.1                                   # Longest sleep between seek/speed checks (seconds)
+
+class ReplaySource(threading.Thread):
+    """
+    Recorded session as a frame source in place of the UDP transport.
+
+    The loaded columns are used in place (memory-mapped with NumPy); frames
+    are built one at a time as they are delivered, so hour-long sessions
+    need no per-frame objects up front. The frames and steps streams are
+    each in time order and are merged on the fly.
+
+    Args:
+        session (str): Session directory written by TelemetryRecorder
+        speed (float): Playback speed factor, 0 = as fast as possible
+    """
+
+    def __init__(self, session, speed=1.0):
+        threading.Thread.__init__(self, name="Replay", daemon=True)
+        self.session = session
+        data = load_session(session)
+        empty = {'time': []}
+        self.frames = data.get('frames', empty)
+        self.steps = data.get('steps', empty)
+        self.value_columns = [self.frames[name] for name, _ in RECORD_STREAMS['frames'][4:]] \
+            if 'board' in self.frames else []
+        starts = [column['time'][0] for column in (self.frames, self.steps) if len(column['time'])]
+        ends = [column['time'][-1] for column in (self.frames, self.steps) if len(column['time'])]
+        self.start_time = float(min(starts)) if starts else 0.0
+        self.end_time = float(max(ends)) if ends else 0.0
+        self.handlers = {}                              # board (or None = all) -> frame callbacks
+        self.lock = threading.Lock()
+        self.wake = threading.Event()
+        self.cursor = [0, 0]                            # Next frames row, next steps row
+        self.speed = speed
+        self.origin = None                              # (record time, monotonic) pacing reference
+        self.delivered = 0
+        self.running = True
+        self.finished = threading.Event()
+
+    def duration(self):
+        """Length of the session in seconds."""
+        return self.end_time - self.start_time
+
+    def subscribe(self, callback, board=None):
+        """Register callback(board, frame), called on the replay thread (UDPTransportEngine API)."""
+        self.handlers.setdefault(board, []).append(callback)
+
+    def send(self, board, cmd):
+        """Commands are dropped - a replay never drives the controllers."""
+        pass
+
+    def locate(self, seconds):
+        """Cursor of the first frame and step at or after seconds from the session start."""
+        t = self.start_time + seconds
+        return [bisect_left(self.frames['time'], t), bisect_left(self.steps['time'], t)]
+
+    def seek(self, seconds):
+        """Continue playback from this offset (seconds from the session start; thread-safe)."""
+        with self.lock:
+            self.cursor = self.locate(seconds)
+            self.origin = None
+        self.wake.set()
+
+    def set_speed(self, speed):
+        """Change the playback speed factor (0 = as fast as possible; thread-safe)."""
+        with self.lock:
+            self.speed = speed
+            self.origin = None
+        self.wake.set()
+
+    def next_time(self, cursor):
+        """
+        Time of the next record and its stream (0 = frames, 1 = steps).
+
+        Returns:
+            tuple: (time, stream), or (None, None) at the end of the session
+        """
+        frame_row, step_row = cursor
+        frame_time = self.frames['time'][frame_row] if frame_row < len(self.frames['time']) else None
+        step_time = self.steps['time'][step_row] if step_row < len(self.steps['time']) else None
+        if frame_time is None and step_time is None:
+            return None, None
+        if step_time is None or (frame_time is not None and frame_time <= step_time):
+            return float(frame_time), 0
+        return float(step_time), 1
+
+    def record(self, stream, row):
+        """Build the (board, frame) pair of one recorded row."""
+        if stream == 0:
+            frames = self.frames
+            board = int(frames['board'][row])
+            values = tuple(int(column[row]) for column in self.value_columns)
+            return board, ValuesFrame(board, int(frames['sequence'][row]), int(frames['board_ms'][row]),
+                                      values, float(frames['time'][row]))
+        return int(self.steps['board'][row]), f"STATE_ENGINE:{int(self.steps['step'][row])}"
+
+    def position(self):
+        """Current playback offset in seconds from the session start."""
+        with self.lock:
+            t, _ = self.next_time(self.cursor)
+        return (self.end_time if t is None else t) - self.start_time
+
+    def events(self, start=0.0, stop=None):
+        """
+        Every recorded (board, frame) from start to stop seconds, unpaced.
+
+        Yields:
+            tuple: (board, frame) in recorded order
+        """
+        cursor = self.locate(start)
+        end = None if stop is None else self.start_time + stop
+        while True:
+            t, stream = self.next_time(cursor)
+            if t is None or (end is not None and t >= end):
+                return
+            yield self.record(stream, cursor[stream])
+            cursor[stream] += 1
+
+    def deliver(self, board, frame):
+        if isinstance(frame, ValuesFrame):
+            frame = frame._replace(arrival=time.monotonic())  # Arrival as seen by this run
+        for callback in self.handlers.get(board, ()):
+            callback(board, frame)
+        for callback in self.handlers.get(None, ()):
+            callback(board, frame)
+        self.delivered += 1
+
+    def run(self):
+        while self.running:
+            with self.lock:
+                t, stream = self.next_time(self.cursor)
+                if t is None:
+                    break
+                if self.speed > 0:
+                    now = time.monotonic()
+                    if self.origin is None:
+                        self.origin = (t, now)
+                    delay = self.origin[1] + (t - self.origin[0]) / self.speed - now
+                else:
+                    delay = 0.0
+                if delay <= 0:
+                    row = self.cursor[stream]
+                    self.cursor[stream] += 1
+            if delay > 0:
+                self.wake.wait(min(delay, REPLAY_MAX_WAIT))
+                self.wake.clear()
+                continue
+            self.deliver(*self.record(stream, row))
+        self.finished.set()
+        print(f"Debug: Replay of {self.session} finished ({self.delivered} frames)")
+
+    def stop(self):
+        """Stop playback."""
+        self.running = False
+        self.wake.set()
+        if self.is_alive():
+            self.join()
@@ -0,0 +1,325 @@
+"""
+Process-wide controller I/O singletons and command functions.
+
+Creating the objects here is free of side effects: the transport engine is
+configured but not started, so importing this module binds no port. Call
+start_transport() before sending, and stop_transport() on exit. The GUI (or
+a headless tool) installs its IOScheduler and GuiRenderer in io_scheduler /
+gui_renderer; other modules must read these as runtime.<name>.
+"""
+
+import queue                               # Startup error hand-off to the GUI loop
+import time                                # Probe timing
+
+from . import config
+from .config import (CLEARCORE1_IP, CLEARCORE1_PORT, LOCAL_PORT1,
+                     CLEARCORE2_IP, CLEARCORE2_PORT, LOCAL_PORT2, PROBE_DEADLINE)
+from .protocol import PRIORITY_MOTION
+from .state import (AXES_PER_BOARD, axis_state, board_axis, command_acks, estop_latency,
+                    telemetry_formats)
+from .telemetry_rate import TelemetryRateController
+from .transport import (BoardMailbox, CommandTracker, ControllerProbe, EmergencyStop, LinkStatistics,
+                        UDPTransportEngine)
+from .uploads import RecipeUpload, SetpointUpload
+
+# ============================================================================
+#                         LINK QUALITY STATISTICS
+# ============================================================================
+
+# One statistics object per ClearCore board
+link_statistics = {1: LinkStatistics(1), 2: LinkStatistics(2)}
+
+def format_link_statistics():
+    """Format both boards' link statistics for the GUI status line."""
+    parts = []
+    for board, stats in link_statistics.items():
+        snap = stats.snapshot()
+        if snap['received']:
+            parts.append(f"B{board}: {snap['rate_hz']:.0f} Hz loss {snap['loss_rate'] * 100:.1f}% "
+                         f"jit {snap['jitter_ms']:.1f} ms")
+        else:
+            parts.append(f"B{board}: no data")
+    return ' | '.join(parts)
+
+def log_link_statistics():
+    """Print a detailed link report for both boards to the console log."""
+    for board, stats in link_statistics.items():
+        snap = stats.snapshot()
+        print(f"Link: Board {board} rx={snap['received']} lost={snap['lost']} "
+              f"({snap['loss_rate'] * 100:.2f}%) dup={snap['duplicates']} reord={snap['reordered']} "
+              f"rate={snap['rate_hz']:.1f} Hz jitter={snap['jitter_ms']:.2f} ms "
+              f"delay={snap['delay_ms']:.2f} ms drift={snap['drift_ppm']:.0f} ppm")
+    commands = command_tracker.snapshot()
+    print(f"Link: Commands sent={commands['sent']} in_flight={commands['in_flight']} "
+          f"retransmits={commands['retransmits']} ({commands['retry_rate'] * 100:.2f}%) "
+          f"acked={commands['acked']} nacked={commands['nacked']} lost={commands['expired']} "
+          f"ack={commands['ack_ms']:.1f} ms")
+    if config.TELEMETRY_ADAPTIVE:
+        rate = telemetry_rate.statistics()
+        spent = ' '.join(f"{hz}Hz={seconds:.0f}s" for hz, seconds in rate['seconds_at_rate'].items())
+        print(f"Link: Telemetry rate={rate['rate_hz']} Hz ({rate['reason']}) changes={rate['changes']} {spent}")
+    stops = estop.snapshot()
+    if stops['count']:
+        last = ' '.join(f"B{board}={'%.1f ms' % ms if ms is not None else 'unconfirmed'}"
+                        for board, ms in sorted(stops['last_ms'].items()))
+        print(f"Link: E-stop count={stops['count']} last {last} mean={stops['mean_ms']:.1f} ms "
+              f"max={stops['max_ms']:.1f} ms unconfirmed={stops['failures']}")
+
+# ============================================================================
+#                         TRANSPORT INITIALIZATION & COMMAND FUNCTIONS
+# ============================================================================
+
+# Mailbox for thread-safe communication between the UDP transport and GUI thread
+message_queue = BoardMailbox()                         # Incoming ClearCore messages
+
+# One engine, one event loop thread, one endpoint per controller
+transport_engine = UDPTransportEngine(link_statistics)
+transport_engine.add_controller(1, CLEARCORE1_IP, CLEARCORE1_PORT, LOCAL_PORT1)
+transport_engine.add_controller(2, CLEARCORE2_IP, CLEARCORE2_PORT, LOCAL_PORT2)
+transport_engine.subscribe(message_queue.put)          # (board, frame) into the GUI mailbox
+
+# Request ids, ACK/NAK and retransmission for state-changing commands (I/O scheduler)
+command_tracker = CommandTracker(transport_engine, command_acks)
+
+# Emergency stop datagrams sent around the command queue, latency per board
+estop = EmergencyStop(transport_engine, estop_latency)
+
+# VALUES rate chosen from axis motion and state engine steps (evaluated by the I/O scheduler)
+telemetry_rate = TelemetryRateController()
+
+def start_transport():
+    """Open the controller endpoints and start the transport thread (idempotent)."""
+    if transport_engine.thread is None:
+        transport_engine.start()                       # Begin listening for messages
+
+def stop_transport():
+    """Stop recording, close the endpoints and stop the transport thread."""
+    stop_recorder()
+    transport_engine.stop()
+
+recorder = None                                        # TelemetryRecorder while recording
+
+def start_recorder(directory):
+    """
+    Record frames, state engine steps and commands to a new session under directory.
+    
+    Args:
+        directory (str): Parent directory for the session (see servo_control.recorder)
+    """
+    global recorder
+    from .recorder import TelemetryRecorder            # Only recording sessions probe for NumPy
+    if recorder is None:
+        recorder = TelemetryRecorder(directory, transport_engine)
+        recorder.start()
+        print(f"Debug: Recording telemetry to {recorder.session}")
+
+def stop_recorder():
+    """Flush and close the recording, if any."""
+    global recorder
+    if recorder is not None:
+        recorder.stop()
+        recorder = None
+
+def send_udp_command1(cmd):
+    """
+    Send command to ClearCore Controller 1 (Board 1) via the I/O scheduler.
+    
+    Args:
+        cmd (str): Command string to send to ClearCore 1
+    """
+    queue_command(1, cmd)
+
+def send_udp_command2(cmd):
+    """
+    Send command to ClearCore Controller 2 (Board 2) via the I/O scheduler.
+    
+    Args:
+        cmd (str): Command string to send to ClearCore 2  
+    """
+    queue_command(2, cmd)
+
+setpoint_upload = SetpointUpload()                     # Readback-verified setpoint transactions
+recipe_upload = RecipeUpload(command_acks, command_tracker)  # Phase-by-phase acknowledged recipe transactions
+
+def upload_setpoints(axes):
+    """
+    Upload the store's setpoints of the given axes and verify them by readback.
+    
+    Whole boards go out as one ALL_Parameters datagram, single servos as
+    S{n}_Parameters; the I/O scheduler re-sends mismatched axes until the
+    SETPOINTS readback confirms them (see servo_control.uploads).
+    
+    Args:
+        axes (iterable): Global axis numbers (1-8)
+    """
+    targets = {axis: axis_state.setpoints(axis) for axis in axes}
+    setpoint_upload.begin(targets, queue_command)
+
+def send_all_parameters(boards=(1, 2)):
+    """
+    Send every servo's setpoints to the given boards, one datagram per board.
+    
+    The firmware applies all four servos of a board in the same loop pass,
+    and both boards' commands are queued back to back so the I/O scheduler
+    sends them in one cycle - the axes pick up their new parameters
+    near-simultaneously instead of one OK button at a time.
+    
+    Args:
+        boards (tuple): Board numbers to update
+    """
+    upload_setpoints([board_axis(board, servo) for board in boards
+                      for servo in range(1, AXES_PER_BOARD + 1)])
+
+def emergency_stop():
+    """
+    Stop every board immediately (any thread).
+    
+    The stop datagrams leave first, ESTOP_REPEATS copies per board sent
+    straight to the transport - nothing queued on the I/O scheduler is
+    ahead of them. Afterwards queued motion commands are dropped and
+    in-flight ones are no longer retransmitted, so a Start or ENABLE
+    issued just before the stop cannot arrive after it. The boards stay
+    latched until reset_emergency_stop(); confirmation and latency are
+    tracked by estop (see transport.EmergencyStop). Setpoint and recipe
+    uploads still running are failed, so none of their retries follow the
+    stop.
+    
+    Returns:
+        str: Token the boards echo in "ESTOP:ACTIVE:<token>"
+    """
+    token = estop.trigger()
+    dropped = command_tracker.cancel(PRIORITY_MOTION)
+    if io_scheduler is not None:
+        dropped += io_scheduler.commands.discard(PRIORITY_MOTION)
+    cancelled = setpoint_upload.cancel() + recipe_upload.cancel()
+    print(f"Debug: E-stop {token} sent to every board ({dropped} pending motion commands dropped, "
+          f"{cancelled} uploads cancelled)")
+    return token
+
+def reset_emergency_stop():
+    """Release the E-stop latch on every board (queued as a tracked motion command)."""
+    for board in sorted(transport_engine.controllers):
+        queue_command(board, f"BOARD:{board};CMD:ESTOP_RESET\n")
+
+gui_renderer = None                                    # Created once the main window exists
+
+io_scheduler = None                                    # Created once the main window exists
+
+init_error_queue = queue.Queue()                       # Startup errors for the GUI loop to show
+
+def queue_command(board, cmd):
+    """
+    Route a command through the I/O scheduler, or send directly before it runs.
+    
+    Args:
+        board (int): Destination board number
+        cmd (str): Command string
+    """
+    if io_scheduler is not None and io_scheduler.is_alive():
+        io_scheduler.submit(board, cmd)
+    else:
+        transport_engine.send(board, cmd)
+
+# ============================================================================
+#                         TELEMETRY SUBSCRIPTION (PUSH MODE)
+# ============================================================================
+
+def negotiate_telemetry_format(fmt):
+    """
+    Ask boards that have not yet confirmed it to switch to the given VALUES format.
+    
+    Called at startup and with every keepalive, so a rebooted board (which
+    comes back in text mode) is switched again. Text frames are always
+    accepted, so an older firmware that ignores the request keeps working.
+    
+    Args:
+        fmt (str): 'binary' or 'text'
+    """
+    wanted = fmt.upper()
+    if telemetry_formats[1] != wanted:
+        send_udp_command1(f"BOARD:1;CMD:VALUES_FORMAT:{wanted}\n")
+    if telemetry_formats[2] != wanted:
+        send_udp_command2(f"BOARD:2;CMD:VALUES_FORMAT:{wanted}\n")
+
+def negotiate_command_acks():
+    """
+    Ask boards that have not confirmed it whether they acknowledge tracked commands.
+    
+    Sent with every keepalive until the board answers "COMMAND_ACKS:ON";
+    older firmware ignores the query and keeps getting untagged commands.
+    """
+    for board in (1, 2):
+        if not command_acks[board]:
+            queue_command(board, f"BOARD:{board};CMD:COMMAND_ACKS\n")
+
+def subscribe_telemetry(rate_hz):
+    """
+    Request or renew push-mode VALUES streaming from both ClearCore controllers.
+    
+    The firmware grants the subscription as a short lease, so this doubles as
+    the keepalive and must be re-sent every SUBSCRIPTION_KEEPALIVE_INTERVAL.
+    Pushed frames use the normal "BOARD:n;VALUES:" format and are handled by
+    process_values_response() exactly like polled replies.
+    
+    Args:
+        rate_hz (int): Requested frames per second per board, 0 cancels streaming
+    """
+    if rate_hz > 0:
+        send_udp_command1(f"BOARD:1;CMD:SUBSCRIBE_VALUES:{rate_hz}\n")
+        send_udp_command2(f"BOARD:2;CMD:SUBSCRIBE_VALUES:{rate_hz}\n")
+    else:
+        send_udp_command1("BOARD:1;CMD:UNSUBSCRIBE_VALUES\n")
+        send_udp_command2("BOARD:2;CMD:UNSUBSCRIBE_VALUES\n")
+
+# ============================================================================
+#                         NETWORK CONNECTIVITY TESTING
+# ============================================================================
+
+controller_probe = ControllerProbe(transport_engine)
+controller_rtts = {}                                    # Last probe result: {board: RTT seconds or None}
+
+def check_network_connectivity():
+    """
+    Test reachability of all ClearCore controllers with a concurrent PING/PONG probe.
+    
+    Every configured controller is probed at the same time over the UDP
+    transport, so the check takes at most PROBE_DEADLINE seconds no matter
+    how many controllers are down. Success requires at least one controller
+    to answer, allowing partial operation when only one is available.
+    
+    Returns:
+        tuple: (success_bool, message_string)
+            - success_bool: True if at least one controller answered
+            - message_string: Per-controller round-trip time or "no reply",
+              shown in the network warning dialog
+            
+    Failure Scenarios:
+    - No controller answers within PROBE_DEADLINE
+    - Network interface down
+    - Subnet routing issues
+    - Controller power/network failures or firmware without PING support
+    """
+    global controller_rtts
+    try:
+        start = time.monotonic()
+        controller_rtts = controller_probe.probe()
+        print(f"Debug: Controller probe finished in {(time.monotonic() - start) * 1000:.0f} ms")
+    except Exception as e:
+        # Unexpected error during network testing (e.g. transport not running)
+        return False, f"Network check error: {str(e)}"
+    
+    lines = []
+    for board, rtt in sorted(controller_rtts.items()):
+        ip, port, _ = transport_engine.controllers[board]
+        status = f"{rtt * 1000:.1f} ms" if rtt is not None else f"no reply within {PROBE_DEADLINE:.1f} s"
+        lines.append(f"Board {board} ({ip}:{port}): {status}")
+        print(f"Debug: {lines[-1]}")
+    
+    # Success criteria: At least one controller must respond
+    reachable = [board for board, rtt in controller_rtts.items() if rtt is not None]
+    if not reachable:
+        return False, "Cannot reach any ClearCore controllers.\n" + "\n".join(lines)
+    if len(reachable) < len(controller_rtts):
+        # Partial connectivity - some controllers unavailable
+        return True, "Network connectivity OK (partial).\n" + "\n".join(lines)
+    return True, "Network connectivity OK. All controllers reachable.\n" + "\n".join(lines)
@@ -0,0 +1,409 @@
+"""
+Background controller I/O: the IOScheduler thread, its prioritised outgoing
+command queue (CommandQueue) and the concurrent startup handshake it runs
+(StartupSync).
+"""
+
+import threading                           # Scheduler thread, wake event and queue lock
+import time                                # Task deadlines and token buckets
+from collections import deque              # Per-class command FIFOs
+
+from . import config, runtime
+from .config import (DEBUG_LOW_PRIORITY, ESTOP_RETRY_INTERVAL, IO_PARSE_INTERVAL,
+                     MEDIUM_PRIORITY_UPDATE_INTERVAL, POLL_BURST, POLL_RATE_LIMIT_HZ, RENDER_FPS,
+                     SUBSCRIPTION_KEEPALIVE_INTERVAL)
+from .handlers import handle_board_message
+from .protocol import COMMAND_PRIORITIES, PRIORITY_POLLING, command_priority, strip_board_prefix
+from .render import IO_UPDATE_EVENT, GuiUpdateBatch, update_element
+from .runtime import (format_link_statistics, log_link_statistics, negotiate_command_acks,
+                      negotiate_telemetry_format, send_udp_command1, send_udp_command2,
+                      subscribe_telemetry)
+from .state import telemetry_subscriptions
+from .transport import LINK_STATS_LOG_INTERVAL, LINK_STATS_UPDATE_INTERVAL
+
+# ============================================================================
+#                         PRIORITISED COMMAND QUEUE
+# ============================================================================
+
+class CommandQueue:
+    """
+    Outgoing commands ordered by priority class, polls rate limited per board.
+    
+    put() files each command under its class (protocol.command_priority);
+    take() hands out everything that may be sent now, emergency stop first,
+    then motion/enable, configuration and polling, in submission order
+    within a class. Polling commands spend a token from their board's
+    bucket (refilled at rate per second, holding at most burst); without a
+    token they stay queued for a later take(), and a poll identical to one
+    already waiting is not queued twice, so background queries can neither
+    crowd out commands nor pile up behind a busy link. Thread-safe.
+    
+    Args:
+        rate (float): Polling commands per second per board
+        burst (int): Polling commands a board may receive back to back
+    """
+    
+    def __init__(self, rate=POLL_RATE_LIMIT_HZ, burst=POLL_BURST):
+        self.rate = rate
+        self.burst = burst
+        self.lock = threading.Lock()
+        self.classes = {priority: deque() for priority in COMMAND_PRIORITIES}  # priority -> (board, cmd)
+        self.buckets = {}                               # board -> [tokens, time of last refill]
+        self.deferred = 0                               # Times a poll was held back by the rate limit
+        self.coalesced = 0                              # Polls dropped as duplicates of a waiting one
+
+    def put(self, board, cmd):
+        """Queue a command under its priority class."""
+        priority = command_priority(cmd)
+        with self.lock:
+            pending = self.classes[priority]
+            if priority == PRIORITY_POLLING and (board, cmd) in pending:
+                self.coalesced += 1
+                return
+            pending.append((board, cmd))
+
+    def spend(self, board, now):
+        """Take one token from a board's polling bucket (lock held)."""
+        bucket = self.buckets.get(board)
+        if bucket is None:
+            bucket = self.buckets[board] = [float(self.burst), now]
+        bucket[0] = min(float(self.burst), bucket[0] + (now - bucket[1]) * self.rate)
+        bucket[1] = now
+        if bucket[0] < 1.0:
+            return False
+        bucket[0] -= 1.0
+        return True
+
+    def take(self, now):
+        """
+        Remove and return the commands that may be sent now.
+        
+        Args:
+            now (float): time.monotonic()
+        
+        Returns:
+            tuple: ([(board, cmd), ...] most urgent first,
+                    time the next held-back poll may go or None)
+        """
+        ready = []
+        release = None
+        with self.lock:
+            for priority in COMMAND_PRIORITIES:
+                pending = self.classes[priority]
+                if priority != PRIORITY_POLLING:
+                    ready.extend(pending)
+                    pending.clear()
+                    continue
+                waiting = deque()
+                while pending:
+                    board, cmd = pending.popleft()
+                    if self.spend(board, now):
+                        ready.append((board, cmd))
+                    else:
+                        waiting.append((board, cmd))
+                self.deferred += len(waiting)
+                self.classes[priority] = waiting
+                if waiting:
+                    release = now + 1.0 / self.rate
+        return ready, release
+
+    def discard(self, priority):
+        """
+        Drop every queued command of one priority class.
+        
+        Returns:
+            int: Number of commands dropped
+        """
+        with self.lock:
+            dropped = len(self.classes[priority])
+            self.classes[priority].clear()
+        return dropped
+
+    def statistics(self):
+        """Counters for monitoring: {'queued': {priority: n}, 'deferred', 'coalesced'}."""
+        with self.lock:
+            return {'queued': {priority: len(pending) for priority, pending in self.classes.items()},
+                    'deferred': self.deferred, 'coalesced': self.coalesced}
+
+# ============================================================================
+#                         I/O SCHEDULER (TELEMETRY & COMMANDS)
+# ============================================================================
+
+class IOScheduler(threading.Thread):
+    """
+    Background thread owning all periodic controller I/O.
+    
+    Runs independently of the GUI event loop, so a modal keypad or
+    confirmation popup no longer pauses telemetry:
+    
+    - Command transmission: commands queued by send_udp_command1/2 are sent
+      as soon as they are submitted (the thread is woken immediately), most
+      urgent priority class first, polls paced per board (CommandQueue);
+      state-changing commands get a request id and are re-sent until the
+      board acknowledges them (runtime.command_tracker)
+    - Emergency stop: runtime.emergency_stop() sends its datagrams around
+      the queue; this thread only re-sends them to boards that have not
+      confirmed (runtime.estop)
+    - Startup sync: concurrent REQUEST_* handshake with every board
+      (StartupSync), missing replies re-requested per round
+    - Keepalives: format negotiation and subscription lease renewal every
+      SUBSCRIPTION_KEEPALIVE_INTERVAL
+    - Adaptive rate: runtime.telemetry_rate is re-evaluated every
+      IO_PARSE_INTERVAL; a new rate is subscribed at once and re-paces
+      polling (config.TELEMETRY_ADAPTIVE, else TELEMETRY_RATE_HZ is pinned)
+    - Polling: REQUEST_VALUES for boards that are not streaming, at the
+      adaptive rate up to POLL_RATE_LIMIT_HZ (every
+      MEDIUM_PRIORITY_UPDATE_INTERVAL when not adaptive)
+    - Parsing: drains the mailbox every IO_PARSE_INTERVAL, updates the
+      state dictionaries and records GUI changes in a GuiUpdateBatch
+    - Setpoint uploads: SETPOINTS readbacks of uploads in progress go to
+      runtime.setpoint_upload, which re-sends mismatched axes and reports
+      each axis verified or failed
+    - Recipe uploads: runtime.recipe_upload sees RECIPE/RECIPE_ERROR replies
+      and re-runs transactions that stalled past their deadline
+    - Link statistics: status line and console report
+    - Rendering cadence: posts pending GUI changes every 1/RENDER_FPS
+    
+    GUI changes reach the window through window.write_event_value(); at
+    most one IO_UPDATE_EVENT is outstanding at a time.
+    """
+    
+    def __init__(self, window, mailbox, transport, startup_sync=None):
+        threading.Thread.__init__(self, name="IO-Scheduler", daemon=True)
+        self.window = window                            # Target of write_event_value()
+        self.mailbox = mailbox                          # BoardMailbox fed by the transport
+        self.transport = transport                      # UDPTransportEngine for sends
+        self.startup_sync = startup_sync                # StartupSync handshake, None = skip
+        self.commands = CommandQueue()                  # Outgoing (board, cmd) by priority class
+        self.release = None                             # When rate-limited polls may go, None = none waiting
+        self.poll_task = None                           # Polling task entry, re-paced with the telemetry rate
+        self.updates = GuiUpdateBatch()
+        self.wake = threading.Event()
+        self.running = True
+
+    def submit(self, board, cmd):
+        """Queue a command for transmission (thread-safe)."""
+        self.commands.put(board, cmd)
+        self.wake.set()
+
+    def transmit_pending(self):
+        """Send queued commands, most urgent class first; polls over their rate limit wait."""
+        ready, self.release = self.commands.take(time.monotonic())
+        for board, cmd in ready:
+            self.transport.send(board, runtime.command_tracker.tag(board, cmd))
+
+    def run(self):
+        now = time.monotonic()
+        self.poll_task = [now + MEDIUM_PRIORITY_UPDATE_INTERVAL, MEDIUM_PRIORITY_UPDATE_INTERVAL, self.poll]
+        # Each task: [next deadline, interval, function]; sync and keepalive run immediately
+        tasks = [
+            [now, IO_PARSE_INTERVAL, self.synchronize],
+            [now, SUBSCRIPTION_KEEPALIVE_INTERVAL, self.keepalive],
+            self.poll_task,
+            [now + IO_PARSE_INTERVAL, IO_PARSE_INTERVAL, self.parse],
+            [now + IO_PARSE_INTERVAL, IO_PARSE_INTERVAL, self.adapt_rate],
+            [now + IO_PARSE_INTERVAL, IO_PARSE_INTERVAL, self.verify_setpoints],
+            [now + IO_PARSE_INTERVAL, IO_PARSE_INTERVAL, self.verify_recipes],
+            [now + IO_PARSE_INTERVAL, IO_PARSE_INTERVAL, self.retransmit_commands],
+            [now + ESTOP_RETRY_INTERVAL, ESTOP_RETRY_INTERVAL, self.confirm_estop],
+            [now + LINK_STATS_UPDATE_INTERVAL, LINK_STATS_UPDATE_INTERVAL, self.update_link_statistics],
+            [now + LINK_STATS_LOG_INTERVAL, LINK_STATS_LOG_INTERVAL, log_link_statistics],
+            [now + 1.0 / RENDER_FPS, 1.0 / RENDER_FPS, self.post_updates],
+        ]
+        while self.running:
+            deadline = min(task[0] for task in tasks)
+            if self.release is not None:
+                deadline = min(deadline, self.release)  # Rate-limited polls waiting for a token
+            self.wake.wait(max(0.0, deadline - time.monotonic()))
+            self.wake.clear()
+            self.transmit_pending()
+            now = time.monotonic()
+            for task in tasks:
+                if now >= task[0]:
+                    try:
+                        task[2]()
+                    except Exception as e:
+                        print(f"Debug: I/O scheduler task {task[2].__name__} failed: {e}")
+                    task[0] += task[1]
+                    if task[0] <= now:
+                        task[0] = now + task[1]         # Overran - skip missed ticks, keep the rate
+            self.transmit_pending()                     # Commands produced by the tasks above
+
+    def synchronize(self):
+        # Startup handshake rounds until every board has reported its state
+        if self.startup_sync is None:
+            return
+        error = self.startup_sync.step(self.transport.send)
+        if error is not None:
+            print(f"Debug: {error}")
+            runtime.init_error_queue.put(error)                 # Shown by the GUI loop
+        if self.startup_sync.finished is not None:
+            self.startup_sync = None
+
+    def keepalive(self):
+        # Startup negotiation (repeated until each board confirms the frame format)
+        negotiate_telemetry_format(config.TELEMETRY_FORMAT)
+        negotiate_command_acks()
+        if config.TELEMETRY_MODE == 'subscribe':
+            # Start or renew the push subscription lease on both boards
+            subscribe_telemetry(self.telemetry_rate())
+        self.pace_polling()
+
+    def telemetry_rate(self):
+        """VALUES rate to request: the adaptive controller's, or TELEMETRY_RATE_HZ when pinned."""
+        return runtime.telemetry_rate.rate_hz if config.TELEMETRY_ADAPTIVE else config.TELEMETRY_RATE_HZ
+
+    def pace_polling(self):
+        """Set the polling interval from the telemetry rate; a faster rate applies at once."""
+        if self.poll_task is None:
+            return
+        if config.TELEMETRY_ADAPTIVE:
+            interval = 1.0 / min(self.telemetry_rate(), POLL_RATE_LIMIT_HZ)
+        else:
+            interval = MEDIUM_PRIORITY_UPDATE_INTERVAL
+        self.poll_task[1] = interval
+        self.poll_task[0] = min(self.poll_task[0], time.monotonic() + interval)
+
+    def adapt_rate(self):
+        # Follow the motion state: re-subscribe and re-pace polling when the rate changes
+        if not config.TELEMETRY_ADAPTIVE:
+            return
+        rate = runtime.telemetry_rate.update()
+        if rate is None:
+            return
+        if config.TELEMETRY_MODE == 'subscribe':
+            subscribe_telemetry(rate)
+        self.pace_polling()
+
+    def poll(self):
+        # Poll only boards that are not streaming (poll mode, older firmware or lease lost)
+        if not telemetry_subscriptions[1]:
+            send_udp_command1("BOARD:1;CMD:REQUEST_VALUES\n")
+        if not telemetry_subscriptions[2]:
+            send_udp_command2("BOARD:2;CMD:REQUEST_VALUES\n")
+
+    def parse(self):
+        # Mailbox holds at most the newest VALUES frame per board plus pending events
+        for board_num, message in self.mailbox.drain():
+            if DEBUG_LOW_PRIORITY:
+               print(f"Debug 51 - Processing message from board {board_num}: {message}")
+            runtime.recipe_upload.observe(board_num, message)  # Recipe replies also reach their handler
+            if runtime.setpoint_upload.observe(board_num, message, self.updates):
+                handled = True                          # Readback of a setpoint upload in progress
+            else:
+                handled = handle_board_message(board_num, message, self.updates)
+            if handled and self.startup_sync is not None:
+                self.startup_sync.observe(board_num, message)
+
+    def retransmit_commands(self):
+        # Re-send tracked commands whose ACK/NAK is overdue (same id, bounded attempts)
+        runtime.command_tracker.step(self.transport.send)
+
+    def confirm_estop(self):
+        # Repeat the E-stop burst to boards that have not confirmed it yet
+        runtime.estop.step(self.transport.send)
+
+    def verify_setpoints(self):
+        # Retry mismatched setpoint uploads (queued and tagged like the first send) and fail expired ones
+        runtime.setpoint_upload.step(self.submit, self.updates)
+
+    def verify_recipes(self):
+        # Re-run recipe uploads that stalled (no ACK or RECIPE reply before their deadline)
+        runtime.recipe_upload.step()
+
+    def update_link_statistics(self):
+        update_element(self.updates, 'LINK_STATS', format_link_statistics())
+
+    def post_updates(self):
+        # One frame: wake the GUI thread only if something is pending and not already posted
+        if self.updates.needs_post():
+            self.window.write_event_value(IO_UPDATE_EVENT, None)
+
+    def stop(self):
+        """Stop the thread after sending any commands still queued (e.g. unsubscribe)."""
+        self.running = False
+        self.wake.set()
+        if self.is_alive():
+            self.join()
+        self.transmit_pending()
+
+# ============================================================================
+#                         STARTUP STATE SYNCHRONISATION
+# ============================================================================
+
+# Replies collected by the startup handshake: reply type -> request command
+STARTUP_SYNC_REQUESTS = {
+    'BUTTON_STATES': "CMD:REQUEST_BUTTON_STATES",
+    'SETPOINTS': "CMD:REQUEST_SETPOINTS",
+    'STATE_ENGINE': "CMD:REQUEST_STATE_ENGINE",
+}
+STARTUP_SYNC_DEADLINE = 0.5                             # Seconds per round before re-requesting what is missing
+STARTUP_SYNC_ROUNDS = 6                                 # Request rounds before reporting missing state
+
+class StartupSync:
+    """
+    Concurrent startup state handshake with every board.
+    
+    Sends every REQUEST_* command to every board at once and ticks replies
+    off as the I/O scheduler applies them - each reply updates the GUI as
+    soon as it is parsed, so the display is correct one round trip after
+    startup. When a round's deadline expires only the missing
+    (board, reply) pairs are requested again, up to STARTUP_SYNC_ROUNDS.
+    
+    Replaces the sequential initialize_buttons()/initialize_setpoints()/
+    initialize_state_engine() calls and their fixed sleeps.
+    
+    Args:
+        boards (iterable): Board numbers to synchronise
+    """
+    
+    def __init__(self, boards):
+        self.missing = {(board, reply) for board in boards for reply in STARTUP_SYNC_REQUESTS}
+        self.rounds = 0                                 # Request rounds sent so far
+        self.deadline = 0.0                             # End of the current round
+        self.started = None                             # time.monotonic() of the first round
+        self.finished = None                            # time.monotonic() when complete or abandoned
+
+    def request_missing(self, send):
+        """
+        Start a round: request everything still missing.
+        
+        Args:
+            send: Function(board, cmd) used to transmit each request
+        """
+        now = time.monotonic()
+        if self.started is None:
+            self.started = now
+        for board, reply in sorted(self.missing):
+            send(board, f"BOARD:{board};{STARTUP_SYNC_REQUESTS[reply]}\n")
+        self.rounds += 1
+        self.deadline = now + STARTUP_SYNC_DEADLINE
+
+    def observe(self, board, message):
+        """Tick off a reply the I/O scheduler has just applied."""
+        if not self.missing or not isinstance(message, str):
+            return
+        reply = strip_board_prefix(message).split(":", 1)[0]
+        self.missing.discard((board, reply))
+        if not self.missing and self.finished is None:
+            self.finished = time.monotonic()
+            print(f"Debug: Startup sync complete in {(self.finished - self.started) * 1000:.0f} ms "
+                  f"({self.rounds} round{'s' if self.rounds != 1 else ''})")
+
+    def step(self, send):
+        """
+        Deadline check, called periodically by the I/O scheduler.
+        
+        Returns:
+            str or None: Error message once the handshake is abandoned, else None
+        """
+        if self.finished is not None:
+            return None
+        if self.rounds and time.monotonic() < self.deadline:
+            return None
+        if self.rounds < STARTUP_SYNC_ROUNDS:
+            self.request_missing(send)
+            return None
+        self.finished = time.monotonic()
+        missing = ", ".join(f"board {board} {reply}" for board, reply in sorted(self.missing))
+        return f"Startup synchronisation incomplete - no reply for: {missing}"
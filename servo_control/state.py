@@ -0,0 +1,229 @@
+"""
+Shared servo and controller state: the axis state store, button state
+mirrors and telemetry negotiation results.
+
+Plain data structures only. Scalars that other modules rebind (state engine
+step, received flags) must be accessed as state.<name>, not imported by name.
+"""
+
+import threading                           # AxisStateStore lock
+from array import array                    # Preallocated numeric columns for axis state
+
+# ============================================================================
+#                              GLOBAL STATE VARIABLES
+# ============================================================================
+
+# State machine controller
+state_engine_step = 0                            # Main application state tracker
+state_engine_steps = {1: 0, 2: 0}                # Last reported state engine step per board
+
+# Push rate confirmed by each board via "BOARD:n;SUBSCRIBED:<rate>" (0 = not streaming)
+telemetry_subscriptions = {1: 0, 2: 0}
+# VALUES format confirmed by each board via "BOARD:n;VALUES_FORMAT:<fmt>" (None = not negotiated)
+telemetry_formats = {1: None, 2: None}
+# Acknowledged commands confirmed by each board via "BOARD:n;COMMAND_ACKS:ON"
+command_acks = {1: False, 2: False}
+
+# Active motion recipe reported by each board via "BOARD:n;RECIPE:<name>,<checksum>"
+# ((name, checksum), None = not reported) and the last "RECIPE_ERROR:<reason>" (None = none)
+recipe_status = {1: None, 2: None}
+recipe_errors = {1: None, 2: None}
+# Recipe upload result per board: 'pending', 'confirmed', 'failed' (None = no upload yet)
+recipe_upload_status = {1: None, 2: None}
+
+# Setpoint upload result per global axis: 'pending', 'verified', 'failed' (None = no upload yet)
+setpoint_status = {axis: None for axis in range(1, 9)}
+
+# Emergency stop latch reported by each board ("ESTOP:ACTIVE:<token>" / "ESTOP:CLEAR") and the
+# trigger -> confirmation latency of the latest E-stop in seconds (None = not confirmed)
+estop_active = {1: False, 2: False}
+estop_latency = {1: None, 2: None}
+
+# ============================================================================
+#                         SERVO CONTROL DATA STRUCTURES
+# ============================================================================
+
+# Real-time servo feedback and setpoints for all 8 axes live in one typed store
+# indexed by global axis number (Board 1 = axes 1-4, Board 2 = axes 5-8)
+AXIS_COUNT = 8                                          # Total servo axes across both boards
+AXES_PER_BOARD = 4                                      # Servos per ClearCore controller
+
+class AxisStateStore:
+    """
+    Typed, array-backed state for all servo axes.
+    
+    Each field is a preallocated array('d') column indexed by global axis
+    number (index 0 unused), so axis 6 is column[6] on every field - no
+    per-board dictionaries or key strings in hot paths. Writers hold the
+    lock for a whole frame, readers get consistent copies:
+    
+    - read(field)       - vectorized read: one column for axes 1-8 as a list
+    - snapshot()        - atomic copy of every column plus the store version
+    - subscribe(cb)     - cb(store, field_group, axes) after each change,
+                          shared by GUI, logging and analytics consumers
+    
+    Fields:
+        velocity, acceleration, position           - Actual values (VALUES feedback)
+        velocity_setpoint, acceleration_setpoint,
+        position_setpoint                          - Setpoints (GUI edits / SETPOINTS)
+        following_error                            - position_setpoint - position
+        feedback_time                              - time.monotonic() of last feedback
+    """
+    
+    FIELDS = ('velocity', 'acceleration', 'position',
+              'velocity_setpoint', 'acceleration_setpoint', 'position_setpoint',
+              'following_error', 'feedback_time')
+    SETPOINT_FIELDS = ('velocity_setpoint', 'acceleration_setpoint', 'position_setpoint')
+    
+    def __init__(self, axis_count=AXIS_COUNT):
+        self.axis_count = axis_count
+        self.columns = {name: array('d', bytes(8 * (axis_count + 1))) for name in self.FIELDS}
+        for name in self.FIELDS:
+            setattr(self, name, self.columns[name])     # Direct column access, e.g. store.position[6]
+        self.lock = threading.Lock()
+        self.version = 0                                # Incremented on every change
+        self.listeners = []
+
+    def subscribe(self, callback):
+        """Register callback(store, field_group, axes); field_group is 'feedback' or 'setpoints'."""
+        self.listeners.append(callback)
+
+    def _notify(self, field_group, axes):
+        for callback in self.listeners:
+            callback(self, field_group, axes)
+
+    def update_feedback(self, board, values, timestamp):
+        """
+        Store one board's V/A/P feedback frame.
+        
+        Args:
+            board (int): Board number (1 or 2)
+            values (sequence): 12 numbers, V/A/P for the board's 4 servos
+            timestamp (float): Arrival time (time.monotonic())
+            
+        Returns:
+            tuple: Axes whose position changed
+        """
+        first = (board - 1) * AXES_PER_BOARD + 1
+        changed = []
+        with self.lock:
+            for i in range(AXES_PER_BOARD):
+                axis = first + i
+                position = values[i * 3 + 2]
+                if self.position[axis] != position:
+                    changed.append(axis)
+                self.velocity[axis] = values[i * 3]
+                self.acceleration[axis] = values[i * 3 + 1]
+                self.position[axis] = position
+                self.following_error[axis] = self.position_setpoint[axis] - position
+                self.feedback_time[axis] = timestamp
+            self.version += 1
+        self._notify('feedback', tuple(range(first, first + AXES_PER_BOARD)))
+        return tuple(changed)
+
+    def set_setpoints(self, axis, velocity=None, acceleration=None, position=None):
+        """Set any of an axis' V/A/P setpoints (None leaves a value unchanged)."""
+        with self.lock:
+            if velocity is not None:
+                self.velocity_setpoint[axis] = velocity
+            if acceleration is not None:
+                self.acceleration_setpoint[axis] = acceleration
+            if position is not None:
+                self.position_setpoint[axis] = position
+                self.following_error[axis] = position - self.position[axis]
+            self.version += 1
+        self._notify('setpoints', (axis,))
+
+    def update_setpoints(self, board, values):
+        """Store one board's 12 V/A/P setpoints (SETPOINTS report)."""
+        first = (board - 1) * AXES_PER_BOARD + 1
+        with self.lock:
+            for i in range(AXES_PER_BOARD):
+                axis = first + i
+                self.velocity_setpoint[axis] = values[i * 3]
+                self.acceleration_setpoint[axis] = values[i * 3 + 1]
+                self.position_setpoint[axis] = values[i * 3 + 2]
+                self.following_error[axis] = values[i * 3 + 2] - self.position[axis]
+            self.version += 1
+        self._notify('setpoints', tuple(range(first, first + AXES_PER_BOARD)))
+
+    def setpoints(self, axis):
+        """Return (velocity, acceleration, position) setpoints of one axis as ints."""
+        with self.lock:
+            return (int(self.velocity_setpoint[axis]), int(self.acceleration_setpoint[axis]),
+                    int(self.position_setpoint[axis]))
+
+    def read(self, field, first=1, last=None):
+        """Vectorized read of one field for axes first..last (default all) as a list."""
+        last = self.axis_count if last is None else last
+        with self.lock:
+            return self.columns[field][first:last + 1].tolist()
+
+    def snapshot(self):
+        """
+        Atomic copy of the whole store.
+        
+        Returns:
+            dict: field -> array('d') copy (index = axis), plus 'version'
+        """
+        with self.lock:
+            snap = {name: array('d', column) for name, column in self.columns.items()}
+            snap['version'] = self.version
+        return snap
+
+def board_axis(board, servo):
+    """Global axis number (1-8) for a board-relative servo number (1-4)."""
+    return (board - 1) * AXES_PER_BOARD + servo
+
+# Shared state store; safe starting setpoints (Board 1: 1000, Board 2: 10000 V/A)
+axis_state = AxisStateStore()
+for _axis in range(1, AXIS_COUNT + 1):
+    _default = 1000 if _axis <= AXES_PER_BOARD else 10000
+    axis_state.set_setpoints(_axis, velocity=_default, acceleration=_default, position=0)
+
+# GUI button state tracking for user interface management
+# Tracks pressed/released state of all interactive buttons
+GUI_button_states_1 = {
+    # System control buttons
+    'Mode': False,      # Mode selection button
+    'Repeat': False,    # Repeat mode toggle
+    'Start': False,     # Motion start button
+    
+    # Servo control buttons (2 buttons per servo for bidirectional control)
+    'S1B1': False, 'S1B2': False,      # Servo 1 direction buttons
+    'S2B1': False, 'S2B2': False,      # Servo 2 direction buttons  
+    'S3B1': False, 'S3B2': False,      # Servo 3 direction buttons
+    'S4B1': False, 'S4B2': False       # Servo 4 direction buttons
+}
+GUI_button_states_2 = {
+    # System control buttons
+    'Mode': False,      # Mode selection button
+    'Repeat': False,    # Repeat mode toggle
+    'Start': False,     # Motion start button
+    
+    # Servo control buttons (2 buttons per servo for bidirectional control)
+    'S1B1': False, 'S1B2': False,      # Board 2 Servo 1 (Overall Servo 5) direction buttons
+    'S2B1': False, 'S2B2': False,      # Board 2 Servo 2 (Overall Servo 6) direction buttons  
+    'S3B1': False, 'S3B2': False,      # Board 2 Servo 3 (Overall Servo 7) direction buttons
+    'S4B1': False, 'S4B2': False       # Board 2 Servo 4 (Overall Servo 8) direction buttons
+}
+
+# Controller button state tracking (feedback from ClearCore hardware)
+# Mirrors GUI states but represents actual hardware button status
+CNT_button_states_1 = GUI_button_states_1.copy()      # Hardware state mirror for Board 1
+CNT_button_states_2 = GUI_button_states_2.copy()      # Hardware state mirror for Board 2
+
+# Per-board lookup tables - messages arrive already attributed to their board
+# by the transport, so handlers select their state with a single dict lookup
+board_gui_states = {1: GUI_button_states_1, 2: GUI_button_states_2}
+board_cnt_states = {1: CNT_button_states_1, 2: CNT_button_states_2}
+board_prefixes = {1: 'B1_', 2: 'B2_'}                 # GUI element key prefix per board
+
+# ============================================================================
+#                         COMMUNICATION STATE TRACKING
+# ============================================================================
+
+# Synchronization flags for ClearCore communication
+values_received = False                                 # Servo feedback values received
+states_received = False                                 # Button states received  
+setpoints_received = False                              # Setpoint values received
@@ -0,0 +1,115 @@
+"""
+Adaptive telemetry rate driven by the motion state.
+
+The I/O scheduler asks TelemetryRateController for a VALUES rate every
+IO_PARSE_INTERVAL. The rate is raised to TELEMETRY_MOTION_RATE_HZ while any
+axis moves (|velocity| above MOTION_VELOCITY_THRESHOLD, or - in Manual mode -
+position further than MOTION_POSITION_TOLERANCE from its setpoint), to the
+TELEMETRY_STEP_RATES_HZ entry of any board's current state engine step, and
+otherwise falls back to TELEMETRY_IDLE_RATE_HZ. Raises apply at once; a drop
+waits until the lower demand has held for TELEMETRY_IDLE_HOLD seconds, so
+short pauses between moves do not make the rate flap.
+
+One rate covers both boards: it is sent as the push subscription rate and
+paces REQUEST_VALUES polling of boards that are not streaming.
+"""
+
+import threading                           # Evaluated by the scheduler, read by daemon/GUI threads
+import time                                # Idle hold timing and time spent at each rate
+
+from .config import (MOTION_POSITION_TOLERANCE, MOTION_VELOCITY_THRESHOLD, TELEMETRY_IDLE_HOLD,
+                     TELEMETRY_IDLE_RATE_HZ, TELEMETRY_MOTION_RATE_HZ, TELEMETRY_STEP_RATES_HZ)
+from .state import AXES_PER_BOARD, axis_state, board_gui_states, state_engine_steps
+
+class TelemetryRateController:
+    """
+    Chooses the telemetry rate from axis motion and state engine steps.
+
+    demand() reads the shared state and returns the rate it calls for;
+    update() applies the idle hold and returns the new rate when it
+    changes. Thread-safe.
+
+    Args:
+        idle_rate (int): Rate while nothing moves (Hz)
+        motion_rate (int): Rate while any axis moves (Hz)
+        step_rates (dict): State engine step -> rate (Hz); unlisted steps add no demand
+        hold (float): Seconds a lower demand must last before the rate drops
+    """
+
+    def __init__(self, idle_rate=TELEMETRY_IDLE_RATE_HZ, motion_rate=TELEMETRY_MOTION_RATE_HZ,
+                 step_rates=TELEMETRY_STEP_RATES_HZ, hold=TELEMETRY_IDLE_HOLD):
+        self.idle_rate = idle_rate
+        self.motion_rate = motion_rate
+        self.step_rates = dict(step_rates)
+        self.hold = hold
+        self.lock = threading.Lock()
+        self.rate_hz = idle_rate                        # Rate currently requested
+        self.reason = 'idle'                            # Why the current rate was chosen
+        self.lower_since = None                         # time.monotonic() the demand fell below rate_hz
+        self.changes = 0                                # Rate changes so far
+        self.time_at_rate = {}                          # rate -> seconds spent requesting it
+        self.last_update = None                         # time.monotonic() of the previous update()
+
+    def demand(self):
+        """
+        Rate the current motion state calls for.
+
+        Returns:
+            tuple: (rate_hz, reason)
+        """
+        rate, reason = self.idle_rate, 'idle'
+        for board, step in state_engine_steps.items():
+            step_rate = self.step_rates.get(step)
+            if step_rate is not None and step_rate > rate:
+                rate, reason = step_rate, f"board {board} step {step}"
+        if self.motion_rate <= rate:
+            return rate, reason
+        velocity = axis_state.read('velocity')
+        following_error = axis_state.read('following_error')
+        for axis in range(1, axis_state.axis_count + 1):
+            if abs(velocity[axis - 1]) > MOTION_VELOCITY_THRESHOLD:
+                return self.motion_rate, f"axis {axis} moving"
+            board = (axis - 1) // AXES_PER_BOARD + 1
+            # Auto mode runs the firmware step tables, so host setpoints say nothing about motion there
+            if not board_gui_states[board]['Mode'] and abs(following_error[axis - 1]) > MOTION_POSITION_TOLERANCE:
+                return self.motion_rate, f"axis {axis} away from setpoint"
+        return rate, reason
+
+    def update(self, now=None):
+        """
+        Re-evaluate the demand, called periodically by the I/O scheduler.
+
+        Args:
+            now (float): time.monotonic(), default the current time
+
+        Returns:
+            int or None: The new rate when it changed, else None
+        """
+        now = time.monotonic() if now is None else now
+        rate, reason = self.demand()
+        with self.lock:
+            if self.last_update is not None:
+                self.time_at_rate[self.rate_hz] = self.time_at_rate.get(self.rate_hz, 0.0) + now - self.last_update
+            self.last_update = now
+            if rate > self.rate_hz:
+                self.lower_since = None                 # Dense data needed now - raise at once
+            elif rate < self.rate_hz:
+                if self.lower_since is None:
+                    self.lower_since = now
+                if now - self.lower_since < self.hold:
+                    return None
+                self.lower_since = None
+            else:
+                self.lower_since = None
+                self.reason = reason
+                return None
+            previous, self.rate_hz, self.reason = self.rate_hz, rate, reason
+            self.changes += 1
+        print(f"Debug: Telemetry rate {previous} -> {rate} Hz ({reason})")
+        return rate
+
+    def statistics(self):
+        """Counters for monitoring: {'rate_hz', 'reason', 'changes', 'seconds_at_rate': {rate: s}}."""
+        with self.lock:
+            return {'rate_hz': self.rate_hz, 'reason': self.reason, 'changes': self.changes,
+                    'seconds_at_rate': {rate: round(seconds, 1) for rate, seconds in sorted(self.time_at_rate.items())}}
@@ -0,0 +1,919 @@
+"""
+Network transport: asyncio UDP engine, per-board mailbox, link statistics,
+acknowledged command tracking, the emergency-stop fast path and the startup
+reachability probe.
+
+Only classes live here - nothing is created or bound at import. The running
+instances (one engine, one mailbox) are owned by servo_control.runtime and
+started explicitly with runtime.start_transport().
+"""
+
+import asyncio                             # Datagram transport engine (UDP endpoints)
+import itertools                           # Unique PING tokens for the reachability probe
+import queue                               # queue.Empty for BoardMailbox.get()
+import random                              # Command id starting point
+import socket                              # UDP sockets for the transport endpoints
+import threading                           # Background transport event loop thread
+import time                                # Arrival stamps and probe round-trip times
+from collections import deque              # Bounded mailbox slots
+
+from .config import (COMMAND_ACK_TIMEOUT, COMMAND_MAX_RETRIES, ESTOP_DEADLINE, ESTOP_LATENCY_HISTORY,
+                     ESTOP_REPEATS, ESTOP_RETRY_INTERVAL, PROBE_DEADLINE, PROBE_RETRY_INTERVAL)
+from .protocol import (VALUES_FRAME_MAGIC, ValuesFrame, command_priority, decode_values_frame,
+                       split_frame_trailer, strip_board_prefix)
+
+# ============================================================================
+#                         LINK QUALITY STATISTICS
+# ============================================================================
+
+LINK_STATS_UPDATE_INTERVAL = 1.0                        # GUI link status refresh (seconds)
+LINK_STATS_LOG_INTERVAL = 30.0                          # Console link report interval (seconds)
+LINK_DRIFT_WINDOW = 10.0                                # Minimum-delay window for drift estimate (seconds)
+LINK_RESTART_GAP = 1000                                 # Backwards sequence jump treated as board reboot
+
+class LinkStatistics:
+    """
+    Per-board telemetry link quality derived from frame sequence numbers,
+    board millis() timestamps and host arrival times.
+    
+    Tracks:
+    - Loss: sequence numbers never received (gaps in the stream)
+    - Duplicates and reordering: repeated or late sequence numbers
+    - Jitter: RFC 3550 interarrival jitter of (arrival - board timestamp)
+    - Delay: one-way delay relative to the best (minimum) delay seen, since
+      the board and host clocks have an unknown offset
+    - Drift: how fast that minimum delay moves, i.e. board/host clock skew (ppm)
+    
+    observe() runs on the receiver thread, snapshot() on the GUI thread.
+    """
+    
+    def __init__(self, board):
+        self.board = board
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Forget the stream history (startup or board reboot)."""
+        self.first_sequence = None
+        self.highest_sequence = None
+        self.received = 0                               # Unique frames received
+        self.duplicates = 0
+        self.reordered = 0
+        self.recent = set()                             # Recently seen sequence numbers
+        self.jitter = 0.0                               # Seconds
+        self.last_transit = None
+        self.last_arrival = None
+        self.interarrival = 0.0                         # Smoothed seconds between frames
+        self.delay = 0.0                                # Seconds above the baseline minimum
+        self.base_transit = None                        # Baseline minimum transit
+        self.base_time = None
+        self.window_min = None                          # Minimum transit in the current drift window
+        self.window_start = None
+        self.drift_ppm = 0.0
+
+    def observe(self, sequence, board_millis, arrival):
+        """
+        Record one received frame.
+        
+        Args:
+            sequence (int): Frame sequence number from the board
+            board_millis (int): Board millis() when the frame was sent
+            arrival (float): Host time.monotonic() when the frame arrived
+        """
+        with self.lock:
+            if self.highest_sequence is not None and self.highest_sequence - sequence > LINK_RESTART_GAP:
+                self.reset()                            # Counter went backwards - board restarted
+            if sequence in self.recent:
+                self.duplicates += 1
+                return
+            self.recent.add(sequence)
+            if len(self.recent) > 256:
+                self.recent = {n for n in self.recent if n > sequence - 128}
+            if self.first_sequence is None:
+                self.first_sequence = self.highest_sequence = sequence
+            elif sequence > self.highest_sequence:
+                self.highest_sequence = sequence
+            else:
+                self.reordered += 1                     # Late frame filling an earlier gap
+            self.received += 1
+
+            # Interarrival jitter per RFC 3550 on transit = arrival - send time
+            transit = arrival - board_millis / 1000.0
+            if self.last_transit is not None:
+                self.jitter += (abs(transit - self.last_transit) - self.jitter) / 16.0
+            self.last_transit = transit
+            if self.last_arrival is not None:
+                self.interarrival += (arrival - self.last_arrival - self.interarrival) / 16.0
+            self.last_arrival = arrival
+
+            # Relative one-way delay and clock drift from windowed minimum transit
+            if self.window_min is None or transit < self.window_min:
+                self.window_min = transit
+            if self.window_start is None:
+                self.window_start = arrival
+            elif arrival - self.window_start >= LINK_DRIFT_WINDOW:
+                if self.base_transit is None:
+                    self.base_transit, self.base_time = self.window_min, arrival
+                elif arrival > self.base_time:
+                    self.drift_ppm = (self.window_min - self.base_transit) / (arrival - self.base_time) * 1e6
+                self.window_min, self.window_start = transit, arrival
+            baseline = self.base_transit if self.base_transit is not None else self.window_min
+            self.delay = transit - min(baseline, transit)
+
+    def snapshot(self):
+        """
+        Return a consistent copy of the current statistics.
+        
+        Returns:
+            dict: received, lost, loss_rate, duplicates, reordered, rate_hz,
+                  jitter_ms, delay_ms, drift_ppm
+        """
+        with self.lock:
+            expected = 0 if self.first_sequence is None else self.highest_sequence - self.first_sequence + 1
+            lost = max(0, expected - self.received)
+            return {
+                'received': self.received,
+                'lost': lost,
+                'loss_rate': lost / expected if expected else 0.0,
+                'duplicates': self.duplicates,
+                'reordered': self.reordered,
+                'rate_hz': 1.0 / self.interarrival if self.interarrival > 0 else 0.0,
+                'jitter_ms': self.jitter * 1000.0,
+                'delay_ms': self.delay * 1000.0,
+                'drift_ppm': self.drift_ppm,
+            }
+
+# ============================================================================
+#                         THREAD-SAFE MESSAGE MAILBOX
+# ============================================================================
+
+MAILBOX_EVENT_DEPTH = 64                               # Max queued events per board per message type
+COALESCED_MESSAGE_TYPES = ('VALUES',)                  # Only the newest frame of these types is kept
+
+class BoardMailbox:
+    """
+    Bounded per-board, per-message-type mailbox between transport and GUI thread.
+    
+    Telemetry (VALUES) is coalesced into a single latest-value slot per board,
+    so a GUI thread blocked in a modal dialog comes back to at most one frame
+    per board instead of a backlog. Every other message type (BUTTON_STATES,
+    SETPOINTS, STATE_ENGINE, ...) is delivered in full through a bounded deque
+    per board and type. Items come out in arrival order across all slots.
+    
+    Memory is bounded by boards × message types × MAILBOX_EVENT_DEPTH.
+    """
+    
+    def __init__(self, event_depth=MAILBOX_EVENT_DEPTH):
+        self.event_depth = event_depth
+        self.slots = {}                                 # (board, type) -> deque of (arrival_no, frame)
+        self.arrivals = 0                               # Monotonic arrival number for ordering
+        self.coalesced = 0                              # VALUES frames replaced before being read
+        self.overflowed = 0                             # Events dropped because a deque was full
+        self.condition = threading.Condition()
+
+    @staticmethod
+    def message_type(frame):
+        """Message type of a frame: 'VALUES' for binary frames, else the text before ':'."""
+        if isinstance(frame, ValuesFrame):
+            return 'VALUES'
+        return strip_board_prefix(frame).split(":", 1)[0]
+
+    def put(self, board, frame):
+        """Store one frame (called on the transport thread)."""
+        kind = self.message_type(frame)
+        with self.condition:
+            slot = self.slots.get((board, kind))
+            if slot is None:
+                depth = 1 if kind in COALESCED_MESSAGE_TYPES else self.event_depth
+                slot = self.slots[(board, kind)] = deque(maxlen=depth)
+            if len(slot) == slot.maxlen:
+                if slot.maxlen == 1:
+                    self.coalesced += 1
+                else:
+                    self.overflowed += 1
+            slot.append((self.arrivals, frame))         # Full deque discards its oldest entry
+            self.arrivals += 1
+            self.condition.notify()
+
+    def _pop_oldest(self):
+        """Remove and return the oldest (board, frame) across all slots, or None."""
+        oldest = None
+        for key, slot in self.slots.items():
+            if slot and (oldest is None or slot[0][0] < self.slots[oldest][0][0]):
+                oldest = key
+        if oldest is None:
+            return None
+        return oldest[0], self.slots[oldest].popleft()[1]
+
+    def get(self, timeout=None):
+        """
+        Return the oldest (board, frame), waiting up to timeout seconds.
+        
+        Raises:
+            queue.Empty: If nothing arrived within the timeout
+        """
+        with self.condition:
+            item = self._pop_oldest()
+            if item is None and self.condition.wait_for(lambda: any(self.slots.values()), timeout):
+                item = self._pop_oldest()
+        if item is None:
+            raise queue.Empty
+        return item
+
+    def drain(self):
+        """
+        Remove and return everything pending as a list of (board, frame) in arrival order.
+        
+        Returns:
+            list: At most one VALUES frame per board plus all pending events
+        """
+        with self.condition:
+            pending = [(arrival, key[0], frame)
+                       for key, slot in self.slots.items() for arrival, frame in slot]
+            for slot in self.slots.values():
+                slot.clear()
+        pending.sort(key=lambda item: item[0])
+        return [(board, frame) for _, board, frame in pending]
+
+    def qsize(self):
+        """Number of pending frames."""
+        with self.condition:
+            return sum(len(slot) for slot in self.slots.values())
+
+# ============================================================================
+#                         ASYNCIO UDP TRANSPORT ENGINE
+# ============================================================================
+
+STREAM_QUEUE_SIZE = 1024                               # Per-stream backlog before oldest frames drop
+TRANSPORT_START_TIMEOUT = 5.0                          # Seconds to wait for endpoints to open
+
+class ControllerProtocol(asyncio.DatagramProtocol):
+    """
+    asyncio datagram endpoint for one controller (or a shared local port).
+    
+    Datagrams are handed straight to the owning UDPTransportEngine on the
+    event loop thread - there is no receive timeout or polling involved.
+    A connected endpoint knows its board up front; a shared endpoint
+    (board=None) leaves routing to the engine's source-address table.
+    """
+    
+    def __init__(self, engine, local_port, board=None):
+        self.engine = engine                            # Owning transport engine
+        self.local_port = local_port                    # Local port this endpoint is bound to
+        self.board = board                              # Board for connected endpoints, None if shared
+        self.transport = None
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data, addr):
+        self.engine.dispatch_datagram(data, addr, self.board)
+
+    def error_received(self, exc):
+        # ICMP errors (e.g. controller unreachable) - log and keep the endpoint open
+        print(f"UDP error on port {self.local_port} (board {self.board}): {exc}")
+
+class UDPTransportEngine:
+    """
+    UDP transport layer for all ClearCore controllers, built on asyncio.
+    
+    One asyncio event loop runs on a single background thread and owns one
+    connected UDP socket per controller: the kernel filters datagrams by
+    peer address, so every frame arrives already attributed to its board
+    and sends skip per-call address handling. Where connected sockets
+    cannot share a local port (no SO_REUSEPORT), the controllers on that
+    port fall back to one shared socket routed by source IP.
+    
+    Received datagrams are stamped, decoded and handed to consumers as
+    (board, frame) pairs through two APIs:
+    
+    - Callbacks: subscribe(callback, board=None) - callback(board, frame)
+      runs on the loop thread for every frame from that board (or all
+      boards), frame being a ValuesFrame or a text message string
+    - Streams: "async for board, frame in engine.frames()" inside a
+      coroutine scheduled with run_coroutine()
+    
+    subscribe_sends(callback) observes outgoing commands (e.g. the recorder).
+    
+    send() may be called from any thread.
+    """
+    
+    def __init__(self, link_statistics):
+        self.link_statistics = link_statistics          # Per-board LinkStatistics
+        self.controllers = {}                           # board -> (ip, port, local_port)
+        self.endpoints = {}                             # board -> asyncio transport
+        self.connected = {}                             # board -> True if endpoint is connected to the board
+        self.peers = {}                                 # (ip, port) or ip -> board (shared endpoint routing)
+        self.handlers = {}                              # board (or None = all) -> frame callbacks
+        self.send_handlers = []                         # callback(board, cmd) for every command sent
+        self.streams = []                               # asyncio.Queue per active frames() stream
+        self.loop = None
+        self.thread = None
+        self.ready = threading.Event()
+        self.start_error = None
+
+    def add_controller(self, board, ip, port, local_port):
+        """
+        Register a controller endpoint. Must be called before start().
+        
+        Args:
+            board (int): Board number used in "BOARD:n;" commands
+            ip (str): Controller IP address
+            port (int): Controller UDP port (also its source port for replies)
+            local_port (int): Local port the controller replies to
+        """
+        self.controllers[board] = (ip, port, local_port)
+        self.peers[(ip, port)] = board                  # Boards reply from their listening port
+        self.peers.setdefault(ip, board)
+
+    def subscribe(self, callback, board=None):
+        """
+        Register callback(board, frame), called on the loop thread.
+        
+        Args:
+            callback: Function receiving (board, frame)
+            board (int): Only deliver frames from this board (None = all boards)
+        """
+        self.handlers.setdefault(board, []).append(callback)
+
+    def subscribe_sends(self, callback):
+        """Register callback(board, cmd), called on the sending thread for every command sent."""
+        self.send_handlers.append(callback)
+
+    def start(self):
+        """Start the event loop thread and open all endpoints."""
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self._run, name="UDP-Transport", daemon=True)
+        self.thread.start()
+        self.ready.wait(TRANSPORT_START_TIMEOUT)
+        if self.start_error is not None:
+            raise self.start_error
+
+    def _run(self):
+        """Event loop thread body."""
+        asyncio.set_event_loop(self.loop)
+        try:
+            self.loop.run_until_complete(self._open_endpoints())
+        except Exception as e:
+            self.start_error = e
+            self.ready.set()
+            self.loop.close()
+            return
+        self.ready.set()
+        self.loop.run_forever()
+        for transport in set(self.endpoints.values()):
+            transport.close()
+        self.loop.run_until_complete(asyncio.sleep(0))  # Let close callbacks run
+        self.loop.close()
+
+    def _bind_socket(self, local_port, reuse_port):
+        """Create a non-blocking UDP socket bound to local_port."""
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        # Socket reuse allows rapid application restart without "address in use" errors
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        if reuse_port:
+            # Lets one connected socket per controller share the common reply port
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        sock.bind(('', local_port))
+        sock.setblocking(False)
+        return sock
+
+    async def _open_endpoints(self):
+        """Open a connected endpoint per controller, or a shared one per local port as fallback."""
+        by_port = {}
+        for board, (ip, port, local_port) in sorted(self.controllers.items()):
+            by_port.setdefault(local_port, []).append(board)
+        reuse_port = hasattr(socket, 'SO_REUSEPORT')
+        
+        for local_port, boards in by_port.items():
+            if len(boards) == 1 or reuse_port:
+                opened = []
+                try:
+                    for board in boards:
+                        ip, port, _ = self.controllers[board]
+                        sock = self._bind_socket(local_port, len(boards) > 1)
+                        try:
+                            sock.connect((ip, port))    # Kernel now only delivers this peer's datagrams
+                        except OSError:
+                            sock.close()
+                            raise
+                        transport, _ = await self.loop.create_datagram_endpoint(
+                            lambda b=board: ControllerProtocol(self, local_port, b), sock=sock)
+                        opened.append(transport)
+                        self.endpoints[board] = transport
+                        self.connected[board] = True
+                    continue
+                except OSError as e:
+                    print(f"Debug: connected sockets unavailable on port {local_port} ({e}), using shared socket")
+                    for transport in opened:
+                        transport.close()
+            
+            # Fallback: one unconnected socket for every controller on this port
+            sock = self._bind_socket(local_port, False)
+            transport, _ = await self.loop.create_datagram_endpoint(
+                lambda: ControllerProtocol(self, local_port), sock=sock)
+            for board in boards:
+                self.endpoints[board] = transport
+                self.connected[board] = False
+
+    def dispatch_datagram(self, data, addr, board=None):
+        """
+        Stamp, decode and deliver one datagram (runs on the loop thread).
+        
+        The board comes from the receiving endpoint (connected sockets) or the
+        source IP (shared socket) - never from the payload. Binary VALUES frames
+        become ValuesFrame records, text frames have their ";SEQ:;T:" trailer
+        removed; both update the board's link statistics.
+        """
+        arrival = time.monotonic()                      # Stamp before any parsing
+        if board is None:
+            board = self.peers.get(addr[:2], self.peers.get(addr[0]))
+            if board is None:
+                return                                  # Not one of our controllers
+        stats = self.link_statistics.get(board)
+        if data and data[0] == VALUES_FRAME_MAGIC:
+            # Binary VALUES frame - decode once here, no text parsing downstream
+            frame = decode_values_frame(data, arrival)
+            if frame is None:
+                return
+            if stats is not None:
+                stats.observe(frame.sequence, frame.timestamp, arrival)
+        else:
+            try:
+                frame = data.decode('utf-8').strip()
+            except UnicodeDecodeError:
+                return
+            frame, sequence, board_millis = split_frame_trailer(frame)
+            if not frame:
+                return
+            if sequence is not None and stats is not None:
+                stats.observe(sequence, board_millis, arrival)
+        for callback in self.handlers.get(board, ()):
+            callback(board, frame)
+        for callback in self.handlers.get(None, ()):
+            callback(board, frame)
+        for stream in self.streams:
+            if stream.full():
+                stream.get_nowait()                     # Slow consumer - drop the oldest frame
+            stream.put_nowait((board, frame))
+
+    async def frames(self):
+        """
+        Async stream of received frames, for coroutines running on this engine's loop.
+        
+        Yields:
+            tuple: (board, frame) for each received frame in arrival order
+        """
+        stream = asyncio.Queue(maxsize=STREAM_QUEUE_SIZE)
+        self.streams.append(stream)
+        try:
+            while True:
+                yield await stream.get()
+        finally:
+            self.streams.remove(stream)
+
+    def run_coroutine(self, coro):
+        """Schedule a coroutine on the transport loop from any thread (returns a concurrent Future)."""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def send(self, board, cmd):
+        """
+        Queue a command for transmission to a controller (thread-safe, non-blocking).
+        
+        Args:
+            board (int): Destination board number
+            cmd (str): Command string
+        """
+        transport = self.endpoints.get(board)
+        if transport is None or self.loop is None or self.loop.is_closed():
+            return
+        for callback in self.send_handlers:
+            callback(board, cmd)
+        data = cmd.encode('utf-8')
+        if self.connected[board]:
+            self.loop.call_soon_threadsafe(transport.sendto, data)
+        else:
+            ip, port, _ = self.controllers[board]
+            self.loop.call_soon_threadsafe(transport.sendto, data, (ip, port))
+
+    def stop(self):
+        """Close all endpoints and stop the event loop thread."""
+        if self.loop is not None and not self.loop.is_closed():
+            self.loop.call_soon_threadsafe(self.loop.stop)
+        if self.thread is not None:
+            self.thread.join()
+
+# ============================================================================
+#                         ACKNOWLEDGED COMMANDS
+# ============================================================================
+
+# Commands sent without an id: queries and keepalives answered by their own
+# reply and re-sent by their own schedule (polls, startup sync, lease renewal)
+UNTRACKED_COMMANDS = ('REQUEST_', 'SUBSCRIBE_VALUES', 'UNSUBSCRIBE_VALUES', 'VALUES_FORMAT',
+                      'PING:', 'COMMAND_ACKS', 'ESTOP:')
+
+class CommandTracker:
+    """
+    Request ids, acknowledgement and bounded retransmission for commands.
+    
+    tag() appends ";ID:<id>" to every state-changing command for a board
+    that has confirmed COMMAND_ACKS and records it as in flight. The board
+    answers "ACK:<id>" (executed) or "NAK:<id>" (rejected); a command not
+    answered within COMMAND_ACK_TIMEOUT is sent again with the same id, up
+    to COMMAND_MAX_RETRIES times. The board remembers recent ids, so a
+    retransmission whose original did arrive is acknowledged again but not
+    executed twice. Ids start at a random value so a restarted host does
+    not collide with ids the boards still remember.
+    
+    subscribe(cb) reports how each tracked command settled:
+    cb(board, cmd, result) with the untagged command and result 'ack',
+    'nak' or 'expired' (multi-datagram transactions pace themselves on it).
+    
+    tag() and step() run on the I/O scheduler thread, on_frame() on the
+    transport loop thread, snapshot() anywhere; callbacks run on the thread
+    that settled the command.
+    
+    Args:
+        engine: UDPTransportEngine delivering the ACK/NAK frames
+        capable (dict): {board: True once the board confirmed COMMAND_ACKS}
+    """
+    
+    def __init__(self, engine, capable):
+        self.capable = capable
+        self.lock = threading.Lock()
+        self.next_id = random.randrange(1, 1 << 31)
+        self.in_flight = {}                             # (board, id) -> [tagged cmd, first sent, last sent,
+                                                        #                 attempts, untagged cmd]
+        self.listeners = []                             # cb(board, cmd, result) on ACK / NAK / expiry
+        self.sent = 0                                   # Tracked commands sent (first transmissions)
+        self.retransmits = 0
+        self.acked = 0
+        self.nacked = 0
+        self.expired = 0                                # Never answered after all retries
+        self.ack_time = 0.0                             # Smoothed send -> ACK time (seconds)
+        engine.subscribe(self.on_frame)
+
+    def subscribe(self, callback):
+        """Register callback(board, cmd, result); result is 'ack', 'nak' or 'expired'."""
+        self.listeners.append(callback)
+
+    def _notify(self, board, cmd, result):
+        for callback in self.listeners:
+            callback(board, cmd, result)
+
+    def tag(self, board, cmd):
+        """
+        Return the command to transmit: tagged and tracked, or unchanged.
+        
+        Only commands addressed with the destination board's "BOARD:n;"
+        prefix are tracked - the firmware drops anything else unanswered.
+        
+        Args:
+            board (int): Destination board
+            cmd (str): "BOARD:n;CMD:...\n" command string
+        """
+        prefix = f"BOARD:{board};"
+        if not self.capable.get(board) or not cmd.startswith(prefix):
+            return cmd
+        body = cmd[len(prefix):]
+        if not body.startswith("CMD:") or body[4:].startswith(UNTRACKED_COMMANDS):
+            return cmd
+        now = time.monotonic()
+        with self.lock:
+            command_id = self.next_id
+            self.next_id = self.next_id % 0xFFFFFFFF + 1  # 32-bit, never 0
+            tagged = f"{cmd.rstrip()};ID:{command_id}\n"
+            self.in_flight[(board, command_id)] = [tagged, now, now, 1, cmd]
+            self.sent += 1
+        return tagged
+
+    def on_frame(self, board, frame):
+        """Transport callback (loop thread): settle the command an ACK/NAK refers to."""
+        if not isinstance(frame, str):
+            return
+        message = strip_board_prefix(frame)
+        kind = message[:4]
+        if kind != "ACK:" and kind != "NAK:":
+            return
+        try:
+            command_id = int(message[4:])
+        except ValueError:
+            return
+        with self.lock:
+            entry = self.in_flight.pop((board, command_id), None)
+            if entry is None:
+                return                                  # Duplicate answer to a retransmission
+            if kind == "ACK:":
+                self.acked += 1
+                elapsed = time.monotonic() - entry[1]
+                self.ack_time = elapsed if self.acked == 1 else self.ack_time + (elapsed - self.ack_time) / 16
+            else:
+                self.nacked += 1
+        if kind == "NAK:":
+            print(f"Debug: Board {board} rejected command {entry[0].strip()}")
+        self._notify(board, entry[4], 'ack' if kind == "ACK:" else 'nak')
+
+    def step(self, send):
+        """
+        Retransmit commands that were not answered in time (I/O scheduler).
+        
+        Args:
+            send: Function(board, cmd) used to transmit
+        """
+        now = time.monotonic()
+        resend = []
+        expired = []
+        with self.lock:
+            for key, entry in list(self.in_flight.items()):
+                if now - entry[2] < COMMAND_ACK_TIMEOUT:
+                    continue
+                if entry[3] > COMMAND_MAX_RETRIES:
+                    del self.in_flight[key]
+                    self.expired += 1
+                    expired.append((key[0], entry[0], entry[4]))
+                    continue
+                entry[2] = now
+                entry[3] += 1
+                self.retransmits += 1
+                resend.append((key[0], entry[0]))
+        for board, cmd in resend:
+            send(board, cmd)
+        for board, cmd, untagged in expired:
+            print(f"Debug: Board {board} never acknowledged {cmd.strip()} "
+                  f"({COMMAND_MAX_RETRIES + 1} attempts)")
+            self._notify(board, untagged, 'expired')
+
+    def cancel(self, priority):
+        """
+        Stop retransmitting in-flight commands of one priority class.
+        
+        Used by the emergency stop, so a motion command whose ACK is still
+        outstanding is not re-sent after the boards have stopped. A late
+        ACK/NAK for a cancelled command is ignored.
+        
+        Args:
+            priority (int): Priority class (servo_control.protocol)
+        
+        Returns:
+            int: Number of commands cancelled
+        """
+        with self.lock:
+            cancelled = [key for key, entry in self.in_flight.items() if command_priority(entry[0]) == priority]
+            for key in cancelled:
+                del self.in_flight[key]
+        return len(cancelled)
+
+    def discard(self, board, commands):
+        """
+        Stop retransmitting in-flight copies of the given commands to one board.
+        
+        Used when a multi-datagram transaction starts over, so its old
+        datagrams cannot arrive in the middle of the new run. A late ACK/NAK
+        for a discarded command is ignored.
+        
+        Args:
+            board (int): Destination board
+            commands (iterable): Untagged command strings as passed to tag()
+        
+        Returns:
+            int: Number of commands discarded
+        """
+        commands = set(commands)
+        with self.lock:
+            discarded = [key for key, entry in self.in_flight.items() if key[0] == board and entry[4] in commands]
+            for key in discarded:
+                del self.in_flight[key]
+        return len(discarded)
+
+    def snapshot(self):
+        """
+        Command reliability counters for monitoring.
+        
+        Returns:
+            dict: in_flight, sent, retransmits, acked, nacked, expired,
+                  retry_rate (retransmits per tracked command), ack_ms
+        """
+        with self.lock:
+            return {
+                'in_flight': len(self.in_flight),
+                'sent': self.sent,
+                'retransmits': self.retransmits,
+                'acked': self.acked,
+                'nacked': self.nacked,
+                'expired': self.expired,
+                'retry_rate': self.retransmits / self.sent if self.sent else 0.0,
+                'ack_ms': self.ack_time * 1000.0,
+            }
+
+# ============================================================================
+#                         EMERGENCY STOP FAST PATH
+# ============================================================================
+
+class EmergencyStop:
+    """
+    Redundant emergency-stop datagrams and their end-to-end latency.
+    
+    trigger() bypasses the I/O scheduler's command queue: it sends
+    ESTOP_REPEATS copies of "BOARD:n;CMD:ESTOP:<token>" to every board
+    straight from the calling thread, interleaved so each board's first copy
+    leaves before any board's second. The boards latch the stop and answer
+    every copy with "ESTOP:ACTIVE:<token>"; the first answer from a board
+    confirms it and records the trigger -> answer latency (measured on the
+    transport thread as the frame arrives). Boards that have not answered
+    get another burst every ESTOP_RETRY_INTERVAL from step() until
+    ESTOP_DEADLINE, after which they are reported unconfirmed.
+    
+    trigger() runs on any thread, on_frame() on the transport loop thread,
+    step() on the I/O scheduler thread.
+    
+    Args:
+        engine: UDPTransportEngine used for the datagrams
+        latencies (dict): {board: seconds or None} updated for the latest E-stop
+    """
+    
+    def __init__(self, engine, latencies):
+        self.engine = engine
+        self.latencies = latencies
+        self.lock = threading.Lock()
+        self.tokens = itertools.count(1)
+        self.token = None                               # Token of the latest E-stop
+        self.triggered = 0.0                            # time.monotonic() of the latest trigger
+        self.unconfirmed = {}                           # board -> time of its last burst
+        self.history = deque(maxlen=ESTOP_LATENCY_HISTORY)  # Confirmed latencies (seconds)
+        self.count = 0                                  # E-stops triggered
+        self.failures = 0                               # Boards that never confirmed
+        engine.subscribe(self.on_frame)
+
+    def trigger(self, boards=None):
+        """
+        Stop every board now (thread-safe, non-blocking).
+        
+        Args:
+            boards (iterable): Board numbers, default every configured controller
+        
+        Returns:
+            str: Token the boards echo in their confirmation
+        """
+        boards = sorted(self.engine.controllers if boards is None else boards)
+        now = time.monotonic()
+        with self.lock:
+            token = str(next(self.tokens))
+            self.token = token
+            self.triggered = now
+            self.unconfirmed = {board: now for board in boards}
+            self.count += 1
+            for board in boards:
+                self.latencies[board] = None
+        self.burst(self.engine.send, boards, token)
+        return token
+
+    def burst(self, send, boards, token):
+        """Send ESTOP_REPEATS copies of the stop datagram to each board."""
+        for _ in range(ESTOP_REPEATS):
+            for board in boards:
+                send(board, f"BOARD:{board};CMD:ESTOP:{token}\n")
+
+    def on_frame(self, board, frame):
+        """Transport callback (loop thread): confirm a board and record its latency."""
+        if not isinstance(frame, str):
+            return
+        message = strip_board_prefix(frame)
+        if not message.startswith("ESTOP:ACTIVE:"):
+            return
+        with self.lock:
+            if message[13:] != self.token or board not in self.unconfirmed:
+                return                                  # Answer to a redundant copy or an older E-stop
+            del self.unconfirmed[board]
+            latency = time.monotonic() - self.triggered
+            self.latencies[board] = latency
+            self.history.append(latency)
+        print(f"Debug: Board {board} confirmed E-stop {self.token} in {latency * 1000:.1f} ms")
+
+    def step(self, send):
+        """
+        Re-send to boards that have not confirmed, report those past the deadline (I/O scheduler).
+        
+        Args:
+            send: Function(board, cmd) used to transmit
+        """
+        now = time.monotonic()
+        resend = []
+        expired = []
+        with self.lock:
+            token = self.token
+            for board, last in list(self.unconfirmed.items()):
+                if now - self.triggered >= ESTOP_DEADLINE:
+                    del self.unconfirmed[board]
+                    self.failures += 1
+                    expired.append(board)
+                elif now - last >= ESTOP_RETRY_INTERVAL:
+                    self.unconfirmed[board] = now
+                    resend.append(board)
+        if resend:
+            self.burst(send, resend, token)
+        for board in expired:
+            print(f"Debug: Board {board} never confirmed E-stop {token} ({ESTOP_DEADLINE:.1f} s)")
+
+    def snapshot(self):
+        """
+        E-stop counters and latency for monitoring.
+        
+        Returns:
+            dict: count, failures, pending (boards not yet confirmed),
+                  last_ms ({board: ms or None} of the latest E-stop),
+                  mean_ms / max_ms over the last ESTOP_LATENCY_HISTORY confirmations
+        """
+        with self.lock:
+            history = list(self.history)
+            return {
+                'count': self.count,
+                'failures': self.failures,
+                'pending': sorted(self.unconfirmed),
+                'last_ms': {board: latency * 1000.0 if latency is not None else None
+                            for board, latency in self.latencies.items()},
+                'mean_ms': sum(history) / len(history) * 1000.0 if history else 0.0,
+                'max_ms': max(history) * 1000.0 if history else 0.0,
+            }
+
+# ============================================================================
+#                         NETWORK CONNECTIVITY TESTING
+# ============================================================================
+
+class ControllerProbe:
+    """
+    Concurrent application-level reachability probe (PING/PONG round trip).
+    
+    Sends "BOARD:n;CMD:PING:<token>" to every controller at once over the
+    running transport engine and waits for the matching "PONG:<token>".
+    Unlike ICMP ping this proves the firmware itself is answering on its
+    UDP port. Silent controllers get a fresh PING every PROBE_RETRY_INTERVAL
+    until the shared deadline, so one lost datagram does not fail the check.
+    """
+    
+    def __init__(self, engine):
+        self.engine = engine                            # UDPTransportEngine (must be started)
+        self.tokens = itertools.count(1)
+        self.pending = {}                               # board -> ({token: send time}, future)
+        engine.subscribe(self.on_frame)
+
+    def on_frame(self, board, frame):
+        """Transport callback (loop thread): resolve a waiting PING with its round-trip time."""
+        if not isinstance(frame, str):
+            return
+        message = strip_board_prefix(frame)
+        if not message.startswith("PONG:"):
+            return
+        entry = self.pending.get(board)
+        if entry is None:
+            return
+        sent, result = entry
+        sent_time = sent.get(message[5:])
+        if sent_time is not None and not result.done():
+            result.set_result(time.monotonic() - sent_time)
+
+    async def ping(self, board, deadline, retry_interval):
+        """
+        PING one controller until it answers or the deadline passes (loop thread).
+        
+        Returns:
+            float or None: Round-trip time in seconds, None if no reply
+        """
+        loop = asyncio.get_running_loop()
+        result = loop.create_future()
+        sent = {}
+        self.pending[board] = (sent, result)
+        end = loop.time() + deadline
+        try:
+            while True:
+                token = str(next(self.tokens))
+                sent[token] = time.monotonic()
+                self.engine.send(board, f"BOARD:{board};CMD:PING:{token}\n")
+                remaining = end - loop.time()
+                if remaining <= 0:
+                    return None
+                try:
+                    return await asyncio.wait_for(asyncio.shield(result), min(retry_interval, remaining))
+                except asyncio.TimeoutError:
+                    if loop.time() >= end:
+                        return None
+        finally:
+            self.pending.pop(board, None)
+
+    async def probe_all(self, deadline, retry_interval):
+        boards = sorted(self.engine.controllers)
+        rtts = await asyncio.gather(*(self.ping(board, deadline, retry_interval) for board in boards))
+        return dict(zip(boards, rtts))
+
+    def probe(self, deadline=PROBE_DEADLINE, retry_interval=PROBE_RETRY_INTERVAL):
+        """
+        Probe every configured controller concurrently (blocking, any thread but the loop).
+        
+        Args:
+            deadline (float): Seconds to wait for all replies
+            retry_interval (float): Seconds between PINGs to a silent controller
+        
+        Returns:
+            dict: {board: round-trip seconds or None if unreachable}
+        """
+        future = self.engine.run_coroutine(self.probe_all(deadline, retry_interval))
+        return future.result(deadline + TRANSPORT_START_TIMEOUT)
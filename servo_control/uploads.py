@@ -0,0 +1,443 @@
+"""
+Verified uploads: setpoints confirmed by readback, recipes by acknowledged
+phases.
+
+An upload sends the new V/A/P setpoints of one or more axes (one
+ALL_Parameters datagram for a whole board, S{n}_Parameters otherwise)
+followed by CMD:REQUEST_SETPOINTS. The board's SETPOINTS reply is diffed
+against what was sent: matching axes are verified, mismatched axes are sent
+again - only those - every SETPOINT_READBACK_INTERVAL until they match or
+SETPOINT_UPLOAD_DEADLINE expires and they are reported failed.
+
+SetpointUpload is thread-safe: begin() is called from the GUI thread or the
+daemon, observe() and step() from the I/O scheduler thread. The per-axis
+result is kept in state.setpoint_status and shown next to each servo row.
+
+RecipeUpload runs each board's RECIPE_BEGIN / RECIPE_ROWS / RECIPE_COMMIT
+transaction one acknowledged phase at a time and re-runs the whole
+transaction when the board rejects or never answers it; the per-board
+result is kept in state.recipe_upload_status.
+"""
+
+import threading                           # Shared between GUI/daemon and scheduler threads
+import time                                # Retry and failure deadlines
+
+from .config import (RECIPE_UPLOAD_ATTEMPTS, RECIPE_UPLOAD_DEADLINE, SETPOINT_READBACK_INTERVAL,
+                     SETPOINT_UPLOAD_DEADLINE)
+from .protocol import strip_board_prefix
+from .render import update_element
+from .state import (AXES_PER_BOARD, axis_state, board_axis, board_prefixes, recipe_errors,
+                    recipe_status, recipe_upload_status, setpoint_status)
+
+# Status text and color shown in each servo row (key B<n>_S<i>_SPT_STATUS)
+SETPOINT_STATUS_DISPLAY = {
+    'pending': ('Pending', 'orange'),
+    'verified': ('Verified', 'green'),
+    'failed': ('Failed', 'red'),
+}
+
+def axis_location(axis):
+    """(board, servo) of a global axis number (1-8)."""
+    return (axis - 1) // AXES_PER_BOARD + 1, (axis - 1) % AXES_PER_BOARD + 1
+
+def setpoint_commands(board, targets):
+    """
+    Commands that upload the given setpoints of one board.
+
+    Args:
+        board (int): Board number (1 or 2)
+        targets (dict): Global axis -> (V, A, P) for axes of that board
+
+    Returns:
+        list: One "ALL_Parameters" command when all servos of the board are
+            included, else one "S{n}_Parameters" command per servo
+    """
+    axes = [board_axis(board, servo) for servo in range(1, AXES_PER_BOARD + 1)]
+    if all(axis in targets for axis in axes):
+        values = ','.join(str(value) for axis in axes for value in targets[axis])
+        return [f"BOARD:{board};CMD:ALL_Parameters:{values}\n"]
+    commands = []
+    for axis in sorted(targets):
+        servo = axis_location(axis)[1]
+        velocity, acceleration, position = targets[axis]
+        commands.append(f"BOARD:{board};CMD:S{servo}_Parameters:{velocity},{acceleration},{position}\n")
+    return commands
+
+# ============================================================================
+#                         UPLOAD TRANSACTIONS
+# ============================================================================
+
+class SetpointUpload:
+    """
+    Per-axis setpoint upload transactions with readback verification.
+
+    A new upload of an axis replaces any unfinished one. While a board has
+    pending axes its SETPOINTS replies are consumed here instead of the
+    regular handler: verified axes take the board's values, pending axes
+    keep the values being uploaded and other axes keep whatever the GUI
+    holds, so a readback never discards an edit that was not sent yet.
+    Failed axes show the values the board reported.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.targets = {}                               # axis -> (V, A, P) awaiting verification
+        self.deadlines = {}                             # axis -> time.monotonic() it fails at
+        self.mismatched = set()                         # Pending axes the last readback contradicted
+        self.next_round = {}                            # board -> time of its next readback / retry
+        self.status_changes = {}                        # axis -> status not yet shown on the GUI
+        self.readbacks = {}                             # axis -> (V, A, P) of its last mismatched readback
+        self.uploads = 0                                # Axes uploaded
+        self.retries = 0                                # Axes sent again after a mismatch
+        self.failures = 0                               # Axes never verified
+
+    def begin(self, targets, send):
+        """
+        Upload setpoints and request their readback.
+
+        Args:
+            targets (dict): Global axis -> (V, A, P)
+            send: Function(board, cmd) used to transmit (runtime.queue_command)
+        """
+        now = time.monotonic()
+        outgoing = []
+        with self.lock:
+            boards = {}
+            for axis, values in targets.items():
+                values = tuple(int(value) for value in values)
+                self.targets[axis] = values
+                self.deadlines[axis] = now + SETPOINT_UPLOAD_DEADLINE
+                self.mismatched.discard(axis)
+                self.set_status(axis, 'pending')
+                boards.setdefault(axis_location(axis)[0], {})[axis] = values
+            for board, board_targets in sorted(boards.items()):
+                outgoing += [(board, cmd) for cmd in setpoint_commands(board, board_targets)]
+                outgoing.append((board, f"BOARD:{board};CMD:REQUEST_SETPOINTS\n"))
+                self.next_round[board] = now + SETPOINT_READBACK_INTERVAL
+            self.uploads += len(targets)
+        for board, cmd in outgoing:
+            send(board, cmd)
+
+    def set_status(self, axis, status):
+        """Record an axis' status for the state and the next render (lock held)."""
+        setpoint_status[axis] = status
+        self.status_changes[axis] = status
+
+    def pending(self, board):
+        """Axes of one board still awaiting verification (lock held)."""
+        return [axis for axis in self.targets if axis_location(axis)[0] == board]
+
+    def observe(self, board, message, window):
+        """
+        Diff a SETPOINTS readback against the uploaded values.
+
+        Args:
+            board (int): Board the message came from
+            message: Received frame (anything but SETPOINTS is ignored)
+            window: GUI window or GuiUpdateBatch for the status display
+
+        Returns:
+            bool: True if the message was a readback consumed by an upload
+        """
+        if not isinstance(message, str):
+            return False
+        message = strip_board_prefix(message)
+        if not message.startswith("SETPOINTS:"):
+            return False
+        with self.lock:
+            axes = self.pending(board)
+            if not axes:
+                return False                            # No upload running - regular handler applies it
+            try:
+                values = [int(p) for p in message.split(":")[1].split(",")[:3 * AXES_PER_BOARD]]
+            except ValueError:
+                values = []
+            if len(values) == 3 * AXES_PER_BOARD:
+                for axis in axes:
+                    servo = axis_location(axis)[1]
+                    reported = tuple(values[(servo - 1) * 3:servo * 3])
+                    if reported == self.targets[axis]:
+                        del self.targets[axis], self.deadlines[axis]
+                        self.mismatched.discard(axis)
+                        self.readbacks.pop(axis, None)
+                        self.set_status(axis, 'verified')
+                    else:
+                        self.mismatched.add(axis)
+                        self.readbacks[axis] = reported
+        self.render(window)
+        return True
+
+    def step(self, send, window):
+        """
+        Deadline check, called periodically by the I/O scheduler.
+
+        Sends mismatched axes again and re-requests the readback once per
+        SETPOINT_READBACK_INTERVAL per board; axes past their deadline fail.
+
+        Args:
+            send: Function(board, cmd) used to transmit (runtime.queue_command)
+            window: GUI window or GuiUpdateBatch for the status display
+        """
+        now = time.monotonic()
+        outgoing = []
+        with self.lock:
+            for axis in [axis for axis, deadline in self.deadlines.items() if now >= deadline]:
+                reported = self.readbacks.pop(axis, None)
+                if reported is not None:
+                    axis_state.set_setpoints(axis, *reported)  # Show what the board actually holds
+                    self.show_setpoints(axis, reported, window)
+                print(f"Debug: Setpoint upload of axis {axis} not verified (sent {self.targets[axis]}, "
+                      f"{'board reports ' + str(reported) if reported else 'no readback'})")
+                del self.targets[axis], self.deadlines[axis]
+                self.mismatched.discard(axis)
+                self.set_status(axis, 'failed')
+                self.failures += 1
+            for board in sorted(self.next_round):
+                if now < self.next_round[board]:
+                    continue
+                if not self.pending(board):
+                    del self.next_round[board]
+                    continue
+                retry = {axis: self.targets[axis] for axis in self.mismatched
+                         if axis_location(axis)[0] == board}
+                outgoing += [(board, cmd) for cmd in setpoint_commands(board, retry)]
+                outgoing.append((board, f"BOARD:{board};CMD:REQUEST_SETPOINTS\n"))
+                self.mismatched.difference_update(retry)
+                self.retries += len(retry)
+                self.next_round[board] = now + SETPOINT_READBACK_INTERVAL
+        for board, cmd in outgoing:
+            send(board, cmd)
+        self.render(window)
+
+    def cancel(self):
+        """
+        Fail every pending axis without sending anything more (emergency stop).
+
+        The status display is updated by the next step().
+
+        Returns:
+            int: Number of axes cancelled
+        """
+        with self.lock:
+            axes = list(self.targets)
+            for axis in axes:
+                self.set_status(axis, 'failed')
+            self.targets.clear()
+            self.deadlines.clear()
+            self.mismatched.clear()
+            self.readbacks.clear()
+            self.next_round.clear()
+            self.failures += len(axes)
+        return len(axes)
+
+    def show_setpoints(self, axis, values, window):
+        """Put an axis' setpoint values on its V/A/P buttons."""
+        board, servo = axis_location(axis)
+        prefix = board_prefixes[board]
+        for field, value in zip('VAP', values):
+            update_element(window, prefix + f'S{servo}{field}_SPT_btn', text=f'{value}')
+
+    def render(self, window):
+        """Show status changes since the last call next to the servo rows."""
+        with self.lock:
+            changes, self.status_changes = self.status_changes, {}
+        for axis, status in changes.items():
+            board, servo = axis_location(axis)
+            text, color = SETPOINT_STATUS_DISPLAY[status]
+            update_element(window, board_prefixes[board] + f'S{servo}_SPT_STATUS', text, text_color=color)
+
+    def statistics(self):
+        """Counters for monitoring: {'uploads', 'retries', 'failures', 'pending'}."""
+        with self.lock:
+            return {'uploads': self.uploads, 'retries': self.retries,
+                    'failures': self.failures, 'pending': len(self.targets)}
+
+# ============================================================================
+#                         RECIPE UPLOAD TRANSACTIONS
+# ============================================================================
+
+class RecipeUpload:
+    """
+    Per-board recipe upload transactions, re-run until confirmed.
+
+    A transaction is three phases - RECIPE_BEGIN, every RECIPE_ROWS, then
+    RECIPE_COMMIT - and on a board with acknowledged commands a phase is
+    sent only once the board has ACKed all of the previous one, so a
+    retransmitted BEGIN or ROWS can never arrive after the COMMIT. The
+    COMMIT's ACK (the board NAKs a failed commit) or a matching
+    RECIPE:<name>,<checksum> reply confirms the board. A NAK, a command the
+    tracker gave up on or RECIPE_UPLOAD_DEADLINE without progress re-runs
+    the whole transaction from BEGIN - after the tracker has dropped the old
+    run's retransmissions - up to RECIPE_UPLOAD_ATTEMPTS runs before the
+    board is reported failed. Boards without acknowledged commands get all
+    phases at once; the RECIPE reply confirms them and a RECIPE_ERROR
+    re-runs them (with ACKs the NAK already says so, and a RECIPE_ERROR
+    cannot be told apart from one caused by an older run).
+
+    begin() is called from the GUI thread or the daemon, on_settled() from
+    the transport or I/O scheduler thread (CommandTracker callback),
+    observe() and step() from the I/O scheduler thread.
+
+    Args:
+        capable (dict): {board: True once the board confirmed COMMAND_ACKS}
+        tracker: CommandTracker that tags the commands and reports them settled
+    """
+
+    def __init__(self, capable, tracker):
+        self.capable = capable
+        self.tracker = tracker
+        tracker.subscribe(self.on_settled)
+        self.lock = threading.Lock()
+        self.send = None                                # Function(board, cmd) of the latest begin()
+        self.transactions = {}                          # board -> transaction dict (see begin())
+        self.uploads = 0                                # Board uploads started
+        self.reruns = 0                                 # Transactions started again from BEGIN
+        self.failures = 0                               # Boards never confirmed
+
+    def begin(self, board, name, checksum, phases, send):
+        """
+        Upload a recipe to one board, replacing any unfinished upload there.
+
+        Args:
+            board (int): Board number (1 or 2)
+            name (str): Recipe name the board will report
+            checksum (int): Checksum the board will report
+            phases (list): [[BEGIN command], [ROWS commands], [COMMIT command]]
+            send: Function(board, cmd) used to transmit (runtime.queue_command)
+        """
+        with self.lock:
+            self.send = send
+            if board in self.transactions:
+                self.discard(board)
+            self.transactions[board] = {'name': name, 'checksum': checksum, 'phases': phases, 'acked': False,
+                                        'phase': 0, 'waiting': set(), 'attempt': 0, 'deadline': 0.0}
+            recipe_upload_status[board] = 'pending'
+            self.uploads += 1
+            outgoing = self.start(board)
+        self.transmit(outgoing)
+
+    def start(self, board):
+        """Send a transaction from its BEGIN again (lock held); returns the commands to send."""
+        transaction = self.transactions[board]
+        transaction['attempt'] += 1
+        recipe_errors[board] = None
+        transaction['acked'] = bool(self.capable.get(board))
+        if transaction['acked']:
+            transaction['phase'] = 0
+            return self.enter_phase(board)
+        transaction['phase'] = len(transaction['phases']) - 1  # No ACKs - everything at once
+        transaction['waiting'] = set()
+        transaction['deadline'] = time.monotonic() + RECIPE_UPLOAD_DEADLINE
+        return [(board, cmd) for phase in transaction['phases'] for cmd in phase]
+
+    def enter_phase(self, board):
+        """Send the current phase and wait for its ACKs (lock held)."""
+        transaction = self.transactions[board]
+        commands = transaction['phases'][transaction['phase']]
+        transaction['waiting'] = set(commands)
+        transaction['deadline'] = time.monotonic() + RECIPE_UPLOAD_DEADLINE
+        return [(board, cmd) for cmd in commands]
+
+    def discard(self, board):
+        """Stop the tracker retransmitting any command of a board's transaction (lock held)."""
+        self.tracker.discard(board, [cmd for phase in self.transactions[board]['phases'] for cmd in phase])
+
+    def rerun(self, board, reason):
+        """Start the transaction again, or fail it after RECIPE_UPLOAD_ATTEMPTS runs (lock held)."""
+        self.discard(board)
+        transaction = self.transactions[board]
+        if transaction['attempt'] >= RECIPE_UPLOAD_ATTEMPTS:
+            print(f"Debug: Recipe {transaction['name']} not confirmed by board {board} "
+                  f"after {transaction['attempt']} attempts ({reason})")
+            del self.transactions[board]
+            recipe_upload_status[board] = 'failed'
+            self.failures += 1
+            return []
+        print(f"Debug: Re-sending recipe {transaction['name']} to board {board} ({reason})")
+        self.reruns += 1
+        return self.start(board)
+
+    def confirm(self, board):
+        """The board activated the recipe (lock held)."""
+        transaction = self.transactions.pop(board)
+        recipe_status[board] = (transaction['name'], transaction['checksum'])
+        recipe_errors[board] = None
+        recipe_upload_status[board] = 'confirmed'
+
+    def on_settled(self, board, cmd, result):
+        """CommandTracker callback: advance, confirm or re-run on an ACK, NAK or expiry."""
+        outgoing = []
+        with self.lock:
+            transaction = self.transactions.get(board)
+            if transaction is None or cmd not in transaction['waiting']:
+                return                                  # Not part of a running phase (or a stale answer)
+            if result != 'ack':
+                outgoing = self.rerun(board, f"{strip_board_prefix(cmd).strip()} {result}")
+            else:
+                transaction['waiting'].discard(cmd)
+                if not transaction['waiting']:
+                    if transaction['phase'] == len(transaction['phases']) - 1:
+                        self.confirm(board)             # COMMIT ACKed - the board activated the table
+                    else:
+                        transaction['phase'] += 1
+                        outgoing = self.enter_phase(board)
+        self.transmit(outgoing)
+
+    def observe(self, board, message):
+        """
+        Watch RECIPE / RECIPE_ERROR replies of a board whose COMMIT was sent.
+
+        The regular handler still applies the reply to the state afterwards.
+        """
+        if not isinstance(message, str):
+            return
+        message = strip_board_prefix(message)
+        if not message.startswith("RECIPE"):
+            return
+        outgoing = []
+        with self.lock:
+            transaction = self.transactions.get(board)
+            if transaction is None or transaction['phase'] != len(transaction['phases']) - 1:
+                return                                  # No upload, or the reply predates this COMMIT
+            if message.startswith("RECIPE_ERROR:"):
+                if not transaction['acked']:
+                    outgoing = self.rerun(board, message)   # With ACKs the COMMIT's NAK re-runs it
+            elif message == f"RECIPE:{transaction['name']},{transaction['checksum']}":
+                self.confirm(board)
+        self.transmit(outgoing)
+
+    def step(self):
+        """Deadline check, called periodically by the I/O scheduler: re-run stalled transactions."""
+        now = time.monotonic()
+        outgoing = []
+        with self.lock:
+            for board in [board for board, transaction in self.transactions.items()
+                          if now >= transaction['deadline']]:
+                outgoing += self.rerun(board, "no answer")
+        self.transmit(outgoing)
+
+    def cancel(self):
+        """
+        Fail every running transaction and drop its retransmissions (emergency stop).
+
+        Returns:
+            int: Number of boards whose upload was cancelled
+        """
+        with self.lock:
+            boards = list(self.transactions)
+            for board in boards:
+                self.discard(board)
+                recipe_upload_status[board] = 'failed'
+            self.transactions.clear()
+            self.failures += len(boards)
+        return len(boards)
+
+    def transmit(self, outgoing):
+        for board, cmd in outgoing:
+            self.send(board, cmd)
+
+    def statistics(self):
+        """Counters for monitoring: {'uploads', 'reruns', 'failures', 'pending'}."""
+        with self.lock:
+            return {'uploads': self.uploads, 'reruns': self.reruns,
+                    'failures': self.failures, 'pending': len(self.transactions)}
@@ -0,0 +1,9 @@
+"""
+Shared test setup: make the repository root importable (servo_control
+package and ClearCore_Simulator.py) however pytest is started.
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
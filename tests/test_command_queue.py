@@ -0,0 +1,69 @@
+"""
+CommandQueue: priority order, poll coalescing and the per-board token bucket.
+"""
+
+from servo_control.protocol import (PRIORITY_CONFIGURATION, PRIORITY_ESTOP, PRIORITY_MOTION,
+                                    PRIORITY_POLLING, command_priority)
+from servo_control.scheduler import CommandQueue
+
+POLL = "BOARD:1;CMD:REQUEST_VALUES\n"
+
+def test_command_priorities():
+    assert command_priority("BOARD:1;CMD:ESTOP:3\n") == PRIORITY_ESTOP
+    assert command_priority("BOARD:1;CMD:Mode AUTO\n") == PRIORITY_MOTION
+    assert command_priority("BOARD:1;CMD:S2B1 ENABLE\n") == PRIORITY_MOTION
+    assert command_priority("BOARD:1;CMD:S2_ClearPosition\n") == PRIORITY_MOTION
+    assert command_priority("BOARD:1;CMD:S2_Parameters:1,2,3\n") == PRIORITY_CONFIGURATION
+    assert command_priority("BOARD:1;CMD:SUBSCRIBE_VALUES:100\n") == PRIORITY_CONFIGURATION
+    assert command_priority(POLL) == PRIORITY_POLLING
+
+def test_take_orders_by_priority_then_submission():
+    queue = CommandQueue(rate=50, burst=10)
+    commands = [POLL, "BOARD:1;CMD:S1_Parameters:1,2,3\n", "BOARD:2;CMD:Start ENABLE\n",
+                "BOARD:1;CMD:ESTOP:1\n", "BOARD:1;CMD:Mode AUTO\n", "BOARD:2;CMD:RECIPE_CLEAR\n"]
+    for cmd in commands:
+        queue.put(int(cmd[6]), cmd)
+    ready, release = queue.take(0.0)
+    assert [cmd for _, cmd in ready] == [
+        "BOARD:1;CMD:ESTOP:1\n",
+        "BOARD:2;CMD:Start ENABLE\n", "BOARD:1;CMD:Mode AUTO\n",
+        "BOARD:1;CMD:S1_Parameters:1,2,3\n", "BOARD:2;CMD:RECIPE_CLEAR\n",
+        POLL,
+    ]
+    assert release is None
+    assert queue.take(0.0) == ([], None)
+
+def test_duplicate_polls_are_coalesced():
+    queue = CommandQueue(rate=50, burst=10)
+    queue.put(1, POLL)
+    queue.put(1, POLL)
+    queue.put(2, "BOARD:2;CMD:REQUEST_VALUES\n")                # Other board is not a duplicate
+    queue.put(1, "BOARD:1;CMD:Mode AUTO\n")
+    queue.put(1, "BOARD:1;CMD:Mode AUTO\n")                     # Commands are never coalesced
+    ready, _ = queue.take(0.0)
+    assert len(ready) == 4
+    assert queue.statistics()['coalesced'] == 1
+
+def test_token_bucket_limits_polls_per_board():
+    queue = CommandQueue(rate=8, burst=2)                       # 1/8 s refill - exact in binary
+    for request in ("VALUES", "SETPOINTS", "STATE_ENGINE"):
+        queue.put(1, f"BOARD:1;CMD:REQUEST_{request}\n")
+    queue.put(2, "BOARD:2;CMD:REQUEST_VALUES\n")
+    queue.put(1, "BOARD:1;CMD:Mode AUTO\n")
+    ready, release = queue.take(100.0)
+    assert [cmd for _, cmd in ready] == ["BOARD:1;CMD:Mode AUTO\n", "BOARD:1;CMD:REQUEST_VALUES\n",
+                                         "BOARD:1;CMD:REQUEST_SETPOINTS\n", "BOARD:2;CMD:REQUEST_VALUES\n"]
+    assert release == 100.125                                   # Burst spent - third poll waits
+    assert queue.statistics()['queued'][PRIORITY_POLLING] == 1
+    assert queue.take(100.0625) == ([], 100.1875)               # Half a token is not enough
+    ready, release = queue.take(100.125)
+    assert ready == [(1, "BOARD:1;CMD:REQUEST_STATE_ENGINE\n")] and release is None
+    assert queue.statistics()['deferred'] == 2
+
+def test_discard_drops_one_class():
+    queue = CommandQueue()
+    queue.put(1, "BOARD:1;CMD:Mode AUTO\n")
+    queue.put(1, "BOARD:1;CMD:S1_Parameters:1,2,3\n")
+    assert queue.discard(PRIORITY_MOTION) == 1
+    ready, _ = queue.take(0.0)
+    assert ready == [(1, "BOARD:1;CMD:S1_Parameters:1,2,3\n")]
@@ -0,0 +1,116 @@
+"""
+CommandTracker: request id tagging, ACK/NAK settlement and retransmission.
+"""
+
+import pytest
+
+from servo_control import transport
+from servo_control.config import COMMAND_ACK_TIMEOUT, COMMAND_MAX_RETRIES
+from servo_control.transport import CommandTracker
+
+OVERDUE = COMMAND_ACK_TIMEOUT * 1.1                      # Clock step past the ACK timeout
+
+class FakeEngine:
+    """Stands in for UDPTransportEngine: only the frame subscription is used."""
+
+    def __init__(self):
+        self.callbacks = []
+
+    def subscribe(self, callback):
+        self.callbacks.append(callback)
+
+    def deliver(self, board, frame):
+        for callback in self.callbacks:
+            callback(board, frame)
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(transport.time, 'monotonic', lambda: now[0])
+    return now
+
+@pytest.fixture
+def engine():
+    return FakeEngine()
+
+@pytest.fixture
+def tracker(engine):
+    return CommandTracker(engine, {1: True, 2: False})
+
+def command_id(tagged):
+    return int(tagged.rstrip().rsplit(";ID:", 1)[1])
+
+def test_tag_adds_id_to_state_changing_command(tracker):
+    tagged = tracker.tag(1, "BOARD:1;CMD:Mode AUTO\n")
+    assert tagged.startswith("BOARD:1;CMD:Mode AUTO;ID:")
+    assert tagged.endswith("\n")
+    assert tracker.snapshot()['in_flight'] == 1
+
+def test_ids_are_unique(tracker):
+    first = command_id(tracker.tag(1, "BOARD:1;CMD:Mode AUTO\n"))
+    second = command_id(tracker.tag(1, "BOARD:1;CMD:Mode AUTO\n"))
+    assert first != second
+
+@pytest.mark.parametrize('board, cmd', [
+    (1, "BOARD:1;CMD:REQUEST_VALUES\n"),        # Poll - answered by its own reply
+    (1, "BOARD:1;CMD:SUBSCRIBE_VALUES:100\n"),  # Keepalive
+    (1, "BOARD:1;CMD:ESTOP:7\n"),               # E-stop fast path
+    (1, "CMD:B1_S1B1 ENABLE\n"),                # No board prefix - the firmware drops it
+    (1, "BOARD:2;CMD:Mode AUTO\n"),             # Prefix of another board
+    (2, "BOARD:2;CMD:Mode AUTO\n"),             # Board without COMMAND_ACKS
+])
+def test_untracked_commands_pass_unchanged(tracker, board, cmd):
+    assert tracker.tag(board, cmd) == cmd
+    assert tracker.snapshot()['in_flight'] == 0
+
+def test_ack_settles_command(tracker, engine):
+    settled = []
+    tracker.subscribe(lambda board, cmd, result: settled.append((board, cmd, result)))
+    tagged = tracker.tag(1, "BOARD:1;CMD:Mode AUTO\n")
+    engine.deliver(1, f"BOARD:1;ACK:{command_id(tagged)}")
+    snap = tracker.snapshot()
+    assert snap['in_flight'] == 0 and snap['acked'] == 1
+    assert settled == [(1, "BOARD:1;CMD:Mode AUTO\n", 'ack')]
+
+def test_nak_and_duplicate_answers(tracker, engine):
+    settled = []
+    tracker.subscribe(lambda board, cmd, result: settled.append(result))
+    tagged = tracker.tag(1, "BOARD:1;CMD:Mode AUTO\n")
+    engine.deliver(1, f"BOARD:1;NAK:{command_id(tagged)}")
+    engine.deliver(1, f"BOARD:1;NAK:{command_id(tagged)}")   # Answer to a retransmission
+    engine.deliver(2, f"BOARD:2;ACK:{command_id(tagged)}")   # Same id from another board
+    assert tracker.snapshot()['nacked'] == 1
+    assert settled == ['nak']
+
+def test_retransmits_with_same_id_then_expires(tracker, clock):
+    settled = []
+    tracker.subscribe(lambda board, cmd, result: settled.append(result))
+    tagged = tracker.tag(1, "BOARD:1;CMD:Mode AUTO\n")
+    sent = []
+    send = lambda board, cmd: sent.append((board, cmd))
+    tracker.step(send)
+    assert sent == []                                       # Not overdue yet
+    for _ in range(COMMAND_MAX_RETRIES):
+        clock[0] += OVERDUE
+        tracker.step(send)
+    assert sent == [(1, tagged)] * COMMAND_MAX_RETRIES
+    clock[0] += OVERDUE
+    tracker.step(send)
+    snap = tracker.snapshot()
+    assert len(sent) == COMMAND_MAX_RETRIES
+    assert snap['expired'] == 1 and snap['in_flight'] == 0
+    assert snap['retry_rate'] == COMMAND_MAX_RETRIES
+    assert settled == ['expired']
+
+def test_discard_stops_retransmission(tracker, engine, clock):
+    settled = []
+    tracker.subscribe(lambda board, cmd, result: settled.append(result))
+    tagged = tracker.tag(1, "BOARD:1;CMD:RECIPE_BEGIN:a\n")
+    tracker.tag(1, "BOARD:1;CMD:Mode AUTO\n")
+    assert tracker.discard(1, ["BOARD:1;CMD:RECIPE_BEGIN:a\n"]) == 1
+    clock[0] += OVERDUE
+    sent = []
+    tracker.step(lambda board, cmd: sent.append(cmd))
+    assert [cmd for cmd in sent if 'RECIPE' in cmd] == []
+    engine.deliver(1, f"BOARD:1;ACK:{command_id(tagged)}")  # Late answer is ignored
+    assert settled == []
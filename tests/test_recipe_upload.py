@@ -0,0 +1,124 @@
+"""
+RecipeUpload: acknowledged BEGIN/ROWS/COMMIT phases and whole-transaction reruns.
+"""
+
+import pytest
+
+from servo_control import uploads
+from servo_control.config import RECIPE_UPLOAD_ATTEMPTS, RECIPE_UPLOAD_DEADLINE
+from servo_control.state import recipe_status, recipe_upload_status
+from servo_control.uploads import RecipeUpload
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(uploads.time, 'monotonic', lambda: now[0])
+    return now
+
+@pytest.fixture
+def sent():
+    return []
+
+def send_to(sent):
+    return lambda board, cmd: sent.append((board, cmd))
+
+BEGIN = "BOARD:1;CMD:RECIPE_BEGIN:swing\n"
+ROWS = ["BOARD:1;CMD:RECIPE_ROWS:0:1|2\n", "BOARD:1;CMD:RECIPE_ROWS:2:3\n"]
+COMMIT = "BOARD:1;CMD:RECIPE_COMMIT:42\n"
+PHASES = [[BEGIN], ROWS, [COMMIT]]
+
+class FakeTracker:
+    """Stands in for CommandTracker: records discards, settlements are injected."""
+
+    def __init__(self):
+        self.callbacks = []
+        self.discarded = []
+
+    def subscribe(self, callback):
+        self.callbacks.append(callback)
+
+    def discard(self, board, commands):
+        self.discarded.append((board, list(commands)))
+
+@pytest.fixture
+def tracker():
+    return FakeTracker()
+
+def settle(upload, cmd, result='ack'):
+    upload.on_settled(1, cmd, result)
+
+def test_recipe_phases_wait_for_acks(tracker, sent):
+    upload = RecipeUpload({1: True}, tracker)
+    assert tracker.callbacks == [upload.on_settled]
+    upload.begin(1, 'swing', 42, PHASES, send_to(sent))
+    assert sent == [(1, BEGIN)] and recipe_upload_status[1] == 'pending'
+    settle(upload, BEGIN)
+    assert sent[1:] == [(1, cmd) for cmd in ROWS]
+    settle(upload, ROWS[1])
+    assert len(sent) == 3                                    # COMMIT waits for every row
+    settle(upload, ROWS[0])
+    assert sent[3:] == [(1, COMMIT)]
+    settle(upload, COMMIT)
+    assert recipe_upload_status[1] == 'confirmed'
+    assert recipe_status[1] == ('swing', 42)
+    assert upload.statistics() == {'uploads': 1, 'reruns': 0, 'failures': 0, 'pending': 0}
+
+def test_recipe_nak_reruns_from_begin(tracker, sent):
+    upload = RecipeUpload({1: True}, tracker)
+    upload.begin(1, 'swing', 42, PHASES, send_to(sent))
+    settle(upload, BEGIN)
+    for cmd in ROWS:
+        settle(upload, cmd)
+    del sent[:]
+    settle(upload, COMMIT, 'nak')
+    assert sent == [(1, BEGIN)]
+    assert tracker.discarded[-1] == (1, [BEGIN] + ROWS + [COMMIT])  # Old run's retransmissions dropped
+    upload.observe(1, "BOARD:1;RECIPE_ERROR:MISSING_ROWS")   # Already handled by the NAK
+    assert sent == [(1, BEGIN)] and upload.statistics()['reruns'] == 1
+
+def test_recipe_stale_answers_are_ignored(tracker, sent):
+    upload = RecipeUpload({1: True}, tracker)
+    upload.begin(1, 'swing', 42, PHASES, send_to(sent))
+    settle(upload, COMMIT, 'nak')                            # Not part of the running phase
+    settle(upload, ROWS[0], 'expired')
+    assert sent == [(1, BEGIN)] and upload.statistics()['reruns'] == 0
+
+def test_recipe_fails_after_attempts(tracker, sent):
+    upload = RecipeUpload({1: True}, tracker)
+    upload.begin(1, 'swing', 42, PHASES, send_to(sent))
+    for _ in range(RECIPE_UPLOAD_ATTEMPTS):
+        settle(upload, BEGIN, 'expired')
+    assert sent == [(1, BEGIN)] * RECIPE_UPLOAD_ATTEMPTS
+    assert recipe_upload_status[1] == 'failed'
+    assert upload.statistics() == {'uploads': 1, 'reruns': RECIPE_UPLOAD_ATTEMPTS - 1, 'failures': 1, 'pending': 0}
+
+def test_recipe_deadline_reruns(tracker, sent, clock):
+    upload = RecipeUpload({1: True}, tracker)
+    upload.begin(1, 'swing', 42, PHASES, send_to(sent))
+    upload.step()
+    assert sent == [(1, BEGIN)]
+    clock[0] += RECIPE_UPLOAD_DEADLINE
+    upload.step()
+    assert sent == [(1, BEGIN), (1, BEGIN)]
+
+def test_recipe_without_acks_confirmed_by_reply(tracker, sent):
+    upload = RecipeUpload({1: False}, tracker)
+    upload.begin(1, 'swing', 42, PHASES, send_to(sent))
+    assert sent == [(1, cmd) for cmd in [BEGIN] + ROWS + [COMMIT]]  # All phases at once
+    upload.observe(1, "BOARD:1;RECIPE_ERROR:CHECKSUM")
+    assert len(sent) == 8                                    # Whole transaction sent again
+    upload.observe(1, "BOARD:1;RECIPE:other,7")              # Not this upload
+    assert recipe_upload_status[1] == 'pending'
+    upload.observe(1, "BOARD:1;RECIPE:swing,42")
+    assert recipe_upload_status[1] == 'confirmed'
+
+def test_recipe_cancel_stops_transaction(tracker, sent, clock):
+    upload = RecipeUpload({1: True}, tracker)
+    upload.begin(1, 'swing', 42, PHASES, send_to(sent))
+    assert upload.cancel() == 1
+    assert recipe_upload_status[1] == 'failed'
+    assert tracker.discarded[-1] == (1, [BEGIN] + ROWS + [COMMIT])
+    settle(upload, BEGIN)                                    # Late ACK starts no further phase
+    clock[0] += RECIPE_UPLOAD_DEADLINE
+    upload.step()
+    assert sent == [(1, BEGIN)]
@@ -0,0 +1,83 @@
+"""
+Recipe checksum and upload datagrams, checked against the simulated firmware.
+"""
+
+import pytest
+
+import ClearCore_Simulator
+from servo_control.config import RECIPE_PACKET_BYTES
+from servo_control.recipes import RECIPE_STEPS, Recipe, recipe_checksum, recipe_commands
+from servo_control.state import AXIS_COUNT
+
+class FakeSocket:
+    """Collects the simulated board's outgoing frames."""
+
+    def __init__(self):
+        self.frames = []
+
+    def sendto(self, data, address):
+        self.frames.append(data.decode('utf-8').split(";SEQ:")[0])
+
+def make_recipe(name='test-swing'):
+    positions = [[step * 10 + axis for axis in range(AXIS_COUNT)] for step in range(RECIPE_STEPS)]
+    velocities = [[1000 + step * 100 + axis for axis in range(AXIS_COUNT)] for step in range(RECIPE_STEPS)]
+    accelerations = [[2000 + step * 100 + axis for axis in range(AXIS_COUNT)] for step in range(RECIPE_STEPS)]
+    return Recipe(name, positions, velocities, accelerations)
+
+def make_board(board):
+    sock = FakeSocket()
+    return ClearCore_Simulator.SimulatedClearCore(board, sock, ('127.0.0.1', 0)), sock
+
+def test_checksum_matches_firmware_formula():
+    assert recipe_checksum([]) == 0
+    assert recipe_checksum([[1, 2]]) == 1 * 31 + 2
+    assert recipe_checksum([[1], [2]]) == recipe_checksum([[1, 2]])  # Row breaks do not matter
+    assert recipe_checksum([[2, 1]]) != recipe_checksum([[1, 2]])    # Order does
+    assert recipe_checksum([[-1]]) == 0xFFFFFFFF                     # int32 reinterpreted as uint32
+    assert recipe_checksum([[0xFFFFFFFF, 5]]) == (0xFFFFFFFF * 31 + 5) & 0xFFFFFFFF
+
+def test_commands_shape():
+    recipe = make_recipe()
+    commands, checksum = recipe_commands(recipe, 1)
+    assert commands[0] == "BOARD:1;CMD:RECIPE_BEGIN:test-swing\n"
+    assert commands[-1] == f"BOARD:1;CMD:RECIPE_COMMIT:{checksum}\n"
+    assert checksum == recipe_checksum(recipe.board_rows(1))
+    assert all(cmd.startswith("BOARD:1;CMD:RECIPE_ROWS:") for cmd in commands[1:-1])
+    assert all(len(cmd) <= RECIPE_PACKET_BYTES for cmd in commands)
+
+@pytest.mark.parametrize('packet_bytes', [RECIPE_PACKET_BYTES, 200, 120])
+def test_rows_split_into_contiguous_packets(packet_bytes):
+    recipe = make_recipe()
+    commands, _ = recipe_commands(recipe, 2, packet_bytes)
+    rows = []
+    for cmd in commands[1:-1]:
+        assert len(cmd) <= packet_bytes
+        first, _, data = cmd.strip()[len("BOARD:2;CMD:RECIPE_ROWS:"):].partition(":")
+        assert int(first) == len(rows)                          # Each packet continues where the last ended
+        rows += [[int(value) for value in row.split(",")] for row in data.split("|")]
+    assert rows == recipe.board_rows(2)
+    if packet_bytes < RECIPE_PACKET_BYTES:
+        assert len(commands) > 4                                # Small packets force more datagrams
+
+@pytest.mark.parametrize('board', [1, 2])
+def test_board_activates_uploaded_recipe(board):
+    recipe = make_recipe()
+    simulated, sock = make_board(board)
+    commands, checksum = recipe_commands(recipe, board, 200)
+    for cmd in commands:
+        simulated.receive(cmd.encode('utf-8'))
+    assert sock.frames[-1] == f"BOARD:{board};RECIPE:test-swing,{checksum}"
+    rows = recipe.board_rows(board)
+    assert simulated.recipe == [[rows[step][servo * 3:servo * 3 + 3] for servo in range(4)]
+                                for step in range(RECIPE_STEPS)]
+
+def test_board_rejects_commit_without_begin_or_rows():
+    recipe = make_recipe()
+    simulated, sock = make_board(1)
+    commands, _ = recipe_commands(recipe, 1)
+    simulated.receive((commands[-1].rstrip() + ";ID:1\n").encode('utf-8'))
+    assert sock.frames[-2:] == ["BOARD:1;RECIPE_ERROR:NO_BEGIN", "BOARD:1;NAK:1"]
+    simulated.receive((commands[0].rstrip() + ";ID:2\n").encode('utf-8'))
+    simulated.receive((commands[-1].rstrip() + ";ID:3\n").encode('utf-8'))   # Rows never sent
+    assert sock.frames[-2:] == ["BOARD:1;RECIPE_ERROR:MISSING_ROWS", "BOARD:1;NAK:3"]
+    assert simulated.recipe is None
@@ -0,0 +1,16 @@
+"""
+TelemetryRecorder session directories.
+"""
+
+import os
+
+from servo_control import recorder
+from servo_control.recorder import create_session_directory
+
+def test_sessions_started_in_the_same_second_get_their_own_directory(tmp_path, monkeypatch):
+    monkeypatch.setattr(recorder.time, 'strftime', lambda fmt: '20261017-120000')
+    parent = str(tmp_path / 'recordings')
+    sessions = [create_session_directory(parent) for _ in range(3)]
+    assert [os.path.basename(session) for session in sessions] == [
+        '20261017-120000', '20261017-120000-2', '20261017-120000-3']
+    assert all(os.path.isdir(session) and not os.listdir(session) for session in sessions)
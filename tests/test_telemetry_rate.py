@@ -0,0 +1,83 @@
+"""
+TelemetryRateController: demand from motion and steps, immediate raise, held drop.
+"""
+
+import pytest
+
+from servo_control import state
+from servo_control.state import axis_state
+from servo_control.telemetry_rate import TelemetryRateController
+
+STEP_RATES = {6: 500, 8: 500, 10: 200}
+
+@pytest.fixture
+def idle_state():
+    """All axes at rest on their setpoints, both boards in Manual mode at step 0."""
+    for axis in range(1, axis_state.axis_count + 1):
+        axis_state.set_setpoints(axis, position=0)
+    for board in (1, 2):
+        axis_state.update_feedback(board, [0] * 12, 0.0)
+        state.state_engine_steps[board] = 0
+        state.board_gui_states[board]['Mode'] = False
+    yield
+    for board in (1, 2):
+        axis_state.update_feedback(board, [0] * 12, 0.0)
+        state.state_engine_steps[board] = 0
+        state.board_gui_states[board]['Mode'] = False
+
+@pytest.fixture
+def controller(idle_state):
+    return TelemetryRateController(idle_rate=10, motion_rate=200, step_rates=STEP_RATES, hold=1.0)
+
+def move_axis(board, servo, velocity, position=0):
+    values = [0] * 12
+    values[(servo - 1) * 3] = velocity
+    values[(servo - 1) * 3 + 2] = position
+    axis_state.update_feedback(board, values, 0.0)
+
+def test_idle_demand(controller):
+    assert controller.demand() == (10, 'idle')
+
+def test_moving_axis_raises_demand(controller):
+    move_axis(2, 3, velocity=-250)
+    assert controller.demand() == (200, 'axis 7 moving')
+
+def test_following_error_counts_only_in_manual_mode(controller):
+    move_axis(1, 2, velocity=0, position=40)                    # Stopped away from setpoint 0
+    assert controller.demand() == (200, 'axis 2 away from setpoint')
+    state.board_gui_states[1]['Mode'] = True                    # Auto - firmware tables drive the axes
+    assert controller.demand() == (10, 'idle')
+
+def test_step_rates(controller):
+    state.state_engine_steps[2] = 8
+    assert controller.demand() == (500, 'board 2 step 8')
+    state.state_engine_steps[2] = 3                             # Unlisted step adds no demand
+    assert controller.demand() == (10, 'idle')
+    state.state_engine_steps[1] = 10
+    move_axis(1, 1, velocity=100)
+    assert controller.demand()[0] == 200
+
+def test_raise_is_immediate_drop_is_held(controller):
+    assert controller.update(0.0) is None
+    move_axis(1, 1, velocity=100)
+    assert controller.update(0.1) == 200                        # Raised on the first update
+    move_axis(1, 1, velocity=0)
+    assert controller.update(0.2) is None                       # Lower demand starts the hold
+    assert controller.update(1.1) is None
+    move_axis(1, 1, velocity=100)
+    assert controller.update(1.15) is None                      # Demand back up - hold cancelled
+    move_axis(1, 1, velocity=0)
+    assert controller.update(1.2) is None
+    assert controller.update(2.1) is None                       # Hold restarted at 1.2
+    assert controller.update(2.2) == 10
+    stats = controller.statistics()
+    assert stats['rate_hz'] == 10 and stats['reason'] == 'idle' and stats['changes'] == 2
+    assert stats['seconds_at_rate'] == {10: 0.1, 200: 2.1}
+
+def test_drop_to_intermediate_rate(controller):
+    state.state_engine_steps[1] = 6
+    assert controller.update(0.0) == 500
+    state.state_engine_steps[1] = 10
+    assert controller.update(0.5) is None
+    assert controller.update(1.5) == 200
+    assert controller.statistics()['reason'] == 'board 1 step 10'
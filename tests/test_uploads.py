@@ -0,0 +1,80 @@
+"""
+SetpointUpload: readback verification, retry and failure.
+"""
+
+import pytest
+
+from servo_control import uploads
+from servo_control.config import SETPOINT_READBACK_INTERVAL, SETPOINT_UPLOAD_DEADLINE
+from servo_control.render import GuiUpdateBatch
+from servo_control.state import axis_state, setpoint_status
+from servo_control.uploads import SetpointUpload
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(uploads.time, 'monotonic', lambda: now[0])
+    return now
+
+@pytest.fixture
+def sent():
+    return []
+
+def send_to(sent):
+    return lambda board, cmd: sent.append((board, cmd))
+
+def setpoints_reply(board, values):
+    """SETPOINTS report of one board: values = 4 (V, A, P) tuples."""
+    return f"BOARD:{board};SETPOINTS:" + ",".join(str(value) for servo in values for value in servo)
+
+def test_single_axis_upload_is_verified(sent):
+    upload = SetpointUpload()
+    upload.begin({2: (100, 200, 30)}, send_to(sent))
+    assert sent == [(1, "BOARD:1;CMD:S2_Parameters:100,200,30\n"), (1, "BOARD:1;CMD:REQUEST_SETPOINTS\n")]
+    assert setpoint_status[2] == 'pending'
+    reply = setpoints_reply(1, [(1, 1, 1), (100, 200, 30), (1, 1, 1), (1, 1, 1)])
+    assert upload.observe(1, reply, GuiUpdateBatch())
+    assert setpoint_status[2] == 'verified'
+    assert upload.statistics() == {'uploads': 1, 'retries': 0, 'failures': 0, 'pending': 0}
+    assert not upload.observe(1, reply, GuiUpdateBatch())    # No upload running - regular handler applies it
+
+def test_whole_board_goes_out_as_one_datagram(sent):
+    upload = SetpointUpload()
+    upload.begin({axis: (10 * axis, 20 * axis, axis) for axis in range(5, 9)}, send_to(sent))
+    assert sent == [(2, "BOARD:2;CMD:ALL_Parameters:50,100,5,60,120,6,70,140,7,80,160,8\n"),
+                    (2, "BOARD:2;CMD:REQUEST_SETPOINTS\n")]
+
+def test_mismatched_axis_is_sent_again(sent, clock):
+    upload = SetpointUpload()
+    upload.begin({1: (100, 200, 30), 2: (110, 210, 40)}, send_to(sent))
+    reply = setpoints_reply(1, [(100, 200, 30), (1, 1, 1), (1, 1, 1), (1, 1, 1)])
+    upload.observe(1, reply, GuiUpdateBatch())
+    assert setpoint_status[1] == 'verified' and setpoint_status[2] == 'pending'
+    del sent[:]
+    upload.step(send_to(sent), GuiUpdateBatch())
+    assert sent == []                                        # Readback interval not over
+    clock[0] += SETPOINT_READBACK_INTERVAL
+    upload.step(send_to(sent), GuiUpdateBatch())
+    assert sent == [(1, "BOARD:1;CMD:S2_Parameters:110,210,40\n"), (1, "BOARD:1;CMD:REQUEST_SETPOINTS\n")]
+    assert upload.statistics()['retries'] == 1
+
+def test_unverified_axis_fails_with_board_values(sent, clock):
+    upload = SetpointUpload()
+    upload.begin({3: (100, 200, 30)}, send_to(sent))
+    upload.observe(1, setpoints_reply(1, [(1, 1, 1), (1, 1, 1), (7, 8, 9), (1, 1, 1)]), GuiUpdateBatch())
+    clock[0] += SETPOINT_UPLOAD_DEADLINE
+    upload.step(send_to(sent), GuiUpdateBatch())
+    assert setpoint_status[3] == 'failed'
+    assert axis_state.setpoints(3) == (7, 8, 9)              # Shows what the board actually holds
+    assert upload.statistics() == {'uploads': 1, 'retries': 0, 'failures': 1, 'pending': 0}
+
+def test_cancel_fails_pending_axes_without_sending(sent, clock):
+    upload = SetpointUpload()
+    upload.begin({5: (100, 200, 30), 6: (110, 210, 40)}, send_to(sent))
+    del sent[:]
+    assert upload.cancel() == 2
+    assert setpoint_status[5] == setpoint_status[6] == 'failed'
+    clock[0] += SETPOINT_READBACK_INTERVAL
+    upload.step(send_to(sent), GuiUpdateBatch())
+    assert sent == []                                        # No retry follows the E-stop
+    assert upload.statistics() == {'uploads': 2, 'retries': 0, 'failures': 2, 'pending': 0}